@@ -1,7 +1,9 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import uvicorn
 from typing import Union, List, Optional, Dict
+import time
 import uuid
 
 from dto import (
@@ -10,7 +12,16 @@ from dto import (
 )
 from main import ChatbotApp
 from prompt_manager import PromptManager
-from external_apis.bus_arrive_time import get_bus_arrival_info
+from modules.stage_runner import StageRunner
+from modules.streaming import SentenceBuffer, format_sse
+from modules.metrics import get_latency_stats, snapshot_all
+from modules.place_resolver import place_lookup_scope
+from modules.deadline import deadline_scope, current_deadline
+from modules.circuit_breaker import snapshot_breakers
+from modules.config import EMBEDDING
+from modules.embedding_cache import CachedEmbeddings
+from external_apis.bus_arrive_time import KIOSK_NODE_ID
+from external_apis.singleflight import GROUP as singleflight_group
 
 app = FastAPI(title="고흥 AI 챗봇 API")
 
@@ -28,190 +39,370 @@ chatbot = ChatbotApp()
 if not chatbot.initialize_modules():
     raise Exception("챗봇 초기화 실패")
 
-# 현재 활성화된 세션 ID 저장
-active_sessions = set()
+# 블로킹 호출(LLM, 외부 API, MySQL)을 실행할 스레드 풀
+stage_runner = StageRunner()
+
+async def register_session(session_id):
+    """세션의 마지막 사용 시각을 갱신합니다. (오래 쉰 세션은 이때 정리됨, 공유 저장소 작업은 이벤트 루프 밖에서 실행)"""
+    await stage_runner.run("session", chatbot.history_manager.touch, session_id)
+
+async def active_session_ids():
+    """현재 활성화된 키오스크 세션 ID 목록 (공유 저장소를 쓰면 모든 워커 기준, 기본 세션 제외)"""
+    session_ids = await stage_runner.run("session", chatbot.history_manager.active_session_ids)
+    return [session_id for session_id in session_ids if session_id != chatbot.session_id]
 
 @app.post("/sessionStart")
 async def start_session():
     """새로운 세션을 시작합니다. 이미 세션이 있다면 무시합니다."""
-    if active_sessions:
+    if await active_session_ids():
         return
     
     session_id = str(uuid.uuid4())
-    active_sessions.add(session_id)
+    await register_session(session_id)
 
 @app.post("/sessionReset")
-async def reset_session():
-    """현재 세션을 초기화합니다."""
-    # 새로운 세션 ID 생성
-    new_session_id = str(uuid.uuid4())
-    active_sessions.clear()  # 기존 세션 모두 제거
-    active_sessions.add(new_session_id)
-    
-    # 챗봇의 대화 기록 초기화
-    chatbot.history_manager.reset_session(chatbot.session_id)
-    chatbot.session_id = new_session_id
+async def reset_session(session_id: Optional[str] = Query(None)):
+    """호출한 키오스크의 세션을 초기화합니다. session_id가 없으면 session_id 없이 대화하는 기본 세션만 초기화합니다."""
+    # 다른 키오스크(다른 워커 포함)의 대화 기록은 건드리지 않음
+    chatbot.history_manager.reset_session(session_id or chatbot.session_id)
 
-@app.post("/chat", response_model=Union[GeneralResponse, LocationInfo, PathInfo, BusInfo])
-async def chat(request: ChatRequest):
-    try:
-        # 세션 ID 유효성 검증
-        if request.session_id:
-            # 첫 요청이면 세션 ID를 활성 세션 목록에 추가
-            if request.session_id not in active_sessions:
-                active_sessions.add(request.session_id)
-            
-            chatbot.session_id = request.session_id
-            
-        # 의도 처리는 동일하게 진행
-        intent, destination = chatbot.intent_processor.detect_intent_and_extract_destination(request.message)
-        print(f"감지된 의도: {intent}, 목적지: {destination}")
+async def handle_place_intent(intent, destination):
+    """장소 관련 의도(위치 찾기, 길찾기, 버스 노선)를 처리하고 응답 DTO를 반환합니다. 처리할 수 없으면 None을 반환합니다."""
+    # 요청 하나 안에서 같은 목적지는 한 번만 좌표를 조회
+    with place_lookup_scope():
+        return await build_place_response(intent, destination)
+
+async def build_place_response(intent, destination):
+    """의도별로 단계를 실행해 응답 DTO를 만듭니다."""
+    # 위치 찾기
+    if intent == "위치 찾기" and destination:
+        places = await stage_runner.run("place", chatbot.place_searcher.find_places, destination)
+        place_names = [place[0] for place in places[:3]]
+        coordinates = [(float(place[1]), float(place[2])) for place in places[:3]]
         
-        # 일반 대화
-        if not intent:
-            response = chatbot.get_rag_response(request.message)
-            return GeneralResponse(
-                response=response,
-                success=True
-            )
+        conversation = PromptManager.convert_to_conversation(
+            ", ".join(place_names), 
+            "위치"
+        )
+        
+        return LocationInfo(
+            places=place_names,
+            coordinates=coordinates,
+            conversation_response=conversation
+        )
+    
+    # 길찾기
+    elif intent == "길찾기" and destination:
+        # request.message 대신 destination을 사용
+        route_data, place = await stage_runner.run("path", chatbot.path_finder.find_path, destination)
+        formatted_result = await stage_runner.run(
+            "path", chatbot.path_finder.format_path_result, route_data, place or destination
+        )
         
-        # 위치 찾기
-        elif intent == "위치 찾기" and destination:
-            places = chatbot.place_searcher.find_places(destination)
-            place_names = [place[0] for place in places[:3]]
-            coordinates = [(float(place[1]), float(place[2])) for place in places[:3]]
+        conversation = PromptManager.convert_to_conversation(
+            formatted_result["routes_text"],
+            "경로"
+        )
+        
+        return PathInfo(
+            routes_text=formatted_result["routes_text"],
+            coordinates=formatted_result["formatted_coordinates"],
+            conversation_response=conversation
+        )
+    
+    # 버스 노선 (한 줄로 나열)
+    elif intent == "버스 노선" and destination:
+        result = await stage_runner.run("bus", chatbot.bus_route_manager.process_bus_route, destination)
+        
+        if result["status"] == "버스_도착정보_있음":
+            # 도착 정보를 DTO에 맞게 변환
+            processed_arrival_times = []
+            for info in result["arrival_info"]:
+                # 딕셔너리의 각 값을 문자열로 변환
+                processed_info = {
+                    "버스번호": str(info["버스번호"]),
+                    "도착예정시간": str(info["도착예정시간"]),
+                    "도착시간(분)": str(info["도착시간(분)"])
+                }
+                if "이동정류장수" in info:
+                    processed_info["이동정류장수"] = str(info["이동정류장수"])
+                processed_arrival_times.append(processed_info)
             
-            conversation = PromptManager.convert_to_conversation(
-                ", ".join(place_names), 
-                "위치"
-            )
+            conversation = f"{destination}(으)로 가는 버스는 {', '.join(result['match_buses'])}번이 있어요. "
+            conversation += "곧 도착하는 버스를 알려드릴게요:\n"
+            for info in processed_arrival_times:
+                conversation += f"{info['버스번호']}번 버스가 {info['도착예정시간']}에 도착 예정입니다."
+                if "이동정류장수" in info:
+                    conversation += f" {info['이동정류장수']}개 정류장을 가시면 됩니다."
+                conversation += "\n"
             
-            return LocationInfo(
-                places=place_names,
-                coordinates=coordinates,
+            return BusInfo(
+                available_buses=result["match_buses"],
+                arrival_times=processed_arrival_times,
+                stops_to_ride=result.get("stops_to_ride", {}),
+                arrival_age_seconds=result.get("arrival_age_seconds"),
                 conversation_response=conversation
             )
         
-        # 길찾기
-        elif intent == "길찾기" and destination:
-            # request.message 대신 destination을 사용
-            route_data, place_name = chatbot.path_finder.find_path(destination)
-            formatted_result = chatbot.path_finder.format_path_result(route_data, place_name)
-            
-            conversation = PromptManager.convert_to_conversation(
-                formatted_result["routes_text"],
-                "경로"
-            )
+        elif result["status"] == "버스_도착정보_없음":
+            deadline = current_deadline()
+            if deadline is not None and "arrival.live" in deadline.skipped_stages:
+                # 처리 시간이 부족해 실시간 도착 정보를 조회하지 못한 경우
+                conversation = f"{destination}(으)로 가는 버스는 {', '.join(result['match_buses'])}번이 있어요. 지금은 실시간 도착 정보를 확인할 수 없습니다."
+            else:
+                conversation = f"{destination}(으)로 가는 버스는 {', '.join(result['match_buses'])}번이 있지만, 지금은 도착 예정인 버스가 없습니다."
             
-            return PathInfo(
-                routes_text=formatted_result["routes_text"],
-                coordinates=formatted_result["formatted_coordinates"],
+            return BusInfo(
+                available_buses=result["match_buses"],
+                arrival_times=[],
+                stops_to_ride=result.get("stops_to_ride", {}),
                 conversation_response=conversation
             )
-        
-        # 버스 노선 (한 줄로 나열)
-        elif intent == "버스 노선" and destination:
-            result = chatbot.bus_route_manager.process_bus_route(destination)
             
-            if result["status"] == "버스_도착정보_있음":
-                # 도착 정보를 DTO에 맞게 변환
-                processed_arrival_times = []
-                for info in result["arrival_info"]:
-                    # 딕셔너리의 각 값을 문자열로 변환
-                    processed_info = {
-                        "버스번호": str(info["버스번호"]),
-                        "도착예정시간": str(info["도착예정시간"]),
-                        "도착시간(분)": str(info["도착시간(분)"])
-                    }
-                    processed_arrival_times.append(processed_info)
-                
-                conversation = f"{destination}(으)로 가는 버스는 {', '.join(result['match_buses'])}번이 있어요. "
-                conversation += "곧 도착하는 버스를 알려드릴게요:\n"
-                for info in processed_arrival_times:
-                    conversation += f"{info['버스번호']}번 버스가 {info['도착예정시간']}에 도착 예정입니다.\n"
-                
-                return BusInfo(
-                    available_buses=result["match_buses"],
-                    arrival_times=processed_arrival_times,
-                    conversation_response=conversation
-                )
+        elif result["status"] == "길찾기_수행":
+            # 버스가 없는 경우 대체 경로 제공
+            # 먼저 경로를 찾고 포맷팅
+            route_data = result.get("route")
+            place = result.get("place") or destination
             
-            elif result["status"] == "버스_도착정보_없음":
-                conversation = f"{destination}(으)로 가는 버스는 {', '.join(result['match_buses'])}번이 있지만, 지금은 도착 예정인 버스가 없습니다."
-                
-                return BusInfo(
-                    available_buses=result["match_buses"],
-                    arrival_times=[],
-                    conversation_response=conversation
-                )
-                
-            elif result["status"] == "길찾기_수행":
-                # 버스가 없는 경우 대체 경로 제공
-                # 먼저 경로를 찾고 포맷팅
-                route_data = result.get("route")
-                place_name = result.get("place_name", destination)
-                
-                # 경로 데이터가 없거나 처리할 수 없는 형식인 경우
-                if not route_data or isinstance(route_data, str):
-                    formatted_result = {
-                        "routes_text": f"{destination}까지 가는 버스가 없으며, 대체 경로도 찾을 수 없습니다.",
-                        "formatted_coordinates": [[]]  # 빈 좌표 배열
-                    }
-                else:
-                    # 경로 데이터가 있으면 포맷팅
-                    formatted_result = chatbot.path_finder.format_path_result(route_data, place_name)
-                
-                path_info = PathInfo(
-                    routes_text=formatted_result["routes_text"],
-                    coordinates=formatted_result["formatted_coordinates"],
-                    conversation_response=PromptManager.convert_to_conversation(
-                        formatted_result["routes_text"],
-                        "버스_경로"  # 타입을 버스_경로로 변경
-                    )
+            # 경로 데이터가 없거나 처리할 수 없는 형식인 경우
+            if not route_data or isinstance(route_data, str):
+                formatted_result = {
+                    "routes_text": f"{destination}까지 가는 버스가 없으며, 대체 경로도 찾을 수 없습니다.",
+                    "formatted_coordinates": [[]]  # 빈 좌표 배열
+                }
+            else:
+                # 경로 데이터가 있으면 포맷팅
+                formatted_result = await stage_runner.run(
+                    "path", chatbot.path_finder.format_path_result, route_data, place
                 )
-                
-                return BusInfo(
-                    available_buses=[],
-                    arrival_times=[],
-                    alternative_path=path_info,
-                    conversation_response=PromptManager.convert_to_conversation(
-                        formatted_result["routes_text"],
-                        "버스_경로"  # 타입을 버스_경로로 변경
-                    )
+            
+            path_info = PathInfo(
+                routes_text=formatted_result["routes_text"],
+                coordinates=formatted_result["formatted_coordinates"],
+                conversation_response=PromptManager.convert_to_conversation(
+                    formatted_result["routes_text"],
+                    "버스_경로"  # 타입을 버스_경로로 변경
                 )
+            )
             
-            else:
-                # 오류 발생 시
-                return BusInfo(
-                    available_buses=[],
-                    arrival_times=[],
-                    conversation_response=f"{destination}(으)로 가는 버스 정보를 조회하는 중 문제가 발생했습니다: {result.get('error_message', '알 수 없는 오류')}"
+            return BusInfo(
+                available_buses=[],
+                arrival_times=[],
+                alternative_path=path_info,
+                conversation_response=PromptManager.convert_to_conversation(
+                    formatted_result["routes_text"],
+                    "버스_경로"  # 타입을 버스_경로로 변경
                 )
+            )
+        
+        else:
+            # 오류 발생 시
+            return BusInfo(
+                available_buses=[],
+                arrival_times=[],
+                conversation_response=f"{destination}(으)로 가는 버스 정보를 조회하는 중 문제가 발생했습니다: {result.get('error_message', '알 수 없는 오류')}"
+            )
+    
+    return None
+
+@app.post("/chat", response_model=Union[GeneralResponse, LocationInfo, PathInfo, BusInfo])
+async def chat(request: ChatRequest):
+    try:
+        # 세션 ID는 요청마다 따로 전달 (전역 챗봇 인스턴스의 상태를 바꾸지 않음)
+        session_id = request.session_id or chatbot.session_id
+        if request.session_id:
+            # 세션 ID를 활성 세션 목록에 추가하고 마지막 사용 시각 갱신
+            await register_session(request.session_id)
         
-        raise HTTPException(status_code=400, detail="처리할 수 없는 요청입니다.")
+        # 요청 전체에 처리 시간 예산을 적용 (부족하면 각 단계가 캐시/부분 결과로 응답)
+        with deadline_scope() as deadline:
+            response = await process_chat_message(request.message, session_id)
+        response.skipped_stages = list(deadline.skipped_stages)
+        return response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+async def process_chat_message(message, session_id):
+    """의도를 감지하고 의도에 맞는 응답 DTO를 만듭니다."""
+    # 의도 처리는 동일하게 진행
+    intent, destination = await stage_runner.run(
+        "intent", chatbot.intent_processor.detect_intent_and_extract_destination, message
+    )
+    print(f"감지된 의도: {intent}, 목적지: {destination}")
+    
+    # 일반 대화
+    if not intent:
+        response = await stage_runner.run("rag", chatbot.get_rag_response, message, session_id)
+        return GeneralResponse(
+            response=response,
+            success=True
+        )
+    
+    # 장소 관련 의도 (위치 찾기, 길찾기, 버스 노선)
+    result = await handle_place_intent(intent, destination)
+    if result is not None:
+        return result
+    
+    raise HTTPException(status_code=400, detail="처리할 수 없는 요청입니다.")
+    
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, mode: str = Query("sentence", pattern="^(token|sentence)$")):
+    """
+    일반 대화 응답을 Server-Sent Events로 스트리밍합니다.
+    
+    - **mode**: token이면 토큰 조각마다, sentence이면 완성된 문장마다(TTS용) 전송합니다.
+    - 장소 관련 의도는 /chat과 같은 응답을 result 이벤트 하나로 전송합니다.
+    """
+    started_at = time.perf_counter()
+    session_id = request.session_id or chatbot.session_id
+    if request.session_id:
+        await register_session(request.session_id)
+    
+    async def event_stream():
+        try:
+            # 의도 감지와 장소 관련 처리에 처리 시간 예산 적용 (일반 대화 스트리밍은 첫 토큰 지표로 관리)
+            with deadline_scope() as deadline:
+                intent, destination = await stage_runner.run(
+                    "intent", chatbot.intent_processor.detect_intent_and_extract_destination, request.message
+                )
+                print(f"감지된 의도: {intent}, 목적지: {destination}")
+                result = await handle_place_intent(intent, destination) if intent else None
+            
+            # 장소 관련 의도는 한 번에 전송
+            if intent:
+                if result is None:
+                    yield format_sse("error", {"detail": "처리할 수 없는 요청입니다."})
+                    return
+                result.skipped_stages = list(deadline.skipped_stages)
+                yield format_sse("result", result.model_dump())
+                yield format_sse("done", {"total_ms": round((time.perf_counter() - started_at) * 1000, 1)})
+                return
+            
+            # 일반 대화는 토큰/문장 단위로 스트리밍
+            sentence_buffer = SentenceBuffer()
+            response_text = ""
+            first_token_ms = None
+            first_sentence_ms = None
+            
+            # 스트림 준비(대화 기록 읽기, 답변 캐시의 질문 임베딩)도 블로킹이므로 이벤트 루프 밖에서 실행
+            token_stream = await stage_runner.run("rag", chatbot.stream_rag_response, request.message, session_id)
+            async for chunk in stage_runner.iterate("rag", token_stream):
+                if not chunk:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - started_at) * 1000
+                    get_latency_stats("chat_stream.first_token").record(first_token_ms / 1000)
+                response_text += chunk
+                
+                if mode == "token":
+                    yield format_sse("token", {"text": chunk})
+                    continue
+                
+                for sentence in sentence_buffer.feed(chunk):
+                    if first_sentence_ms is None:
+                        first_sentence_ms = (time.perf_counter() - started_at) * 1000
+                        get_latency_stats("chat_stream.first_sentence").record(first_sentence_ms / 1000)
+                    yield format_sse("sentence", {"text": sentence})
+            
+            if mode == "sentence":
+                for sentence in sentence_buffer.flush():
+                    if first_sentence_ms is None:
+                        first_sentence_ms = (time.perf_counter() - started_at) * 1000
+                        get_latency_stats("chat_stream.first_sentence").record(first_sentence_ms / 1000)
+                    yield format_sse("sentence", {"text": sentence})
+            
+            total_seconds = time.perf_counter() - started_at
+            get_latency_stats("chat_stream.total").record(total_seconds)
+            yield format_sse("done", {
+                "response": response_text,
+                "first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+                "first_sentence_ms": round(first_sentence_ms, 1) if first_sentence_ms is not None else None,
+                "total_ms": round(total_seconds * 1000, 1)
+            })
+        
+        except Exception as e:
+            get_latency_stats("chat_stream.total").record(time.perf_counter() - started_at, error=True)
+            yield format_sse("error", {"detail": str(e)})
     
-@app.get("/bus", response_model=List[Dict[str, Union[str, int]]])
-async def get_bus_arrival():
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    """지연 시간 지표(스트리밍 첫 토큰/첫 문장 시간 등)와 단계별 스레드 풀 사용 현황을 반환합니다."""
+    intent_cache = chatbot.intent_processor.intent_cache
+    answer_cache = chatbot.rag_manager.answer_cache
+    return {
+        "latency": snapshot_all(),
+        "stages": stage_runner.stats(),
+        "intent_cache": intent_cache.stats() if intent_cache is not None else None,
+        "sessions": chatbot.history_manager.stats(),
+        "gazetteer": chatbot.gazetteer.stats() if chatbot.gazetteer is not None else None,
+        "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+        "embedding_cache": EMBEDDING.stats() if isinstance(EMBEDDING, CachedEmbeddings) else None
+    }
+    
+@app.get("/status")
+async def get_status():
+    """외부 서비스별 차단기(circuit breaker) 상태, 합쳐진 동시 호출 수, 로컬 대체 데이터 상태를 반환합니다."""
+    arrival_age = None
+    if chatbot.arrival_poller is not None:
+        arrival_age = chatbot.arrival_poller.age_seconds(chatbot.arrival_poller.snapshots.get(KIOSK_NODE_ID))
+    catalog = chatbot.bus_stop_catalog
+    return {
+        "circuits": snapshot_breakers(),
+        "singleflight": singleflight_group.stats(),
+        "fallbacks": {
+            "stop_catalog_version": catalog.version if catalog is not None else None,
+            "arrival_snapshot_age_seconds": arrival_age,
+            "gazetteer_places": chatbot.gazetteer.stats()["places"] if chatbot.gazetteer is not None else None
+        }
+    }
+    
+@app.get("/bus", response_model=List[Dict[str, Union[str, int, None]]])
+async def get_bus_arrival(response: Response):
     """
-    특정 정류장의 버스 도착 정보를 조회합니다.
+    키오스크 정류장의 버스 도착 정보를 조회합니다.
     
-    - **city_code**: 도시 코드 (기본값: 36350)
-    - **node_id**: 정류장 ID (기본값: TSB332000523)
+    백그라운드 폴러가 주기적으로 갱신한 스냅샷을 반환하며, 스냅샷이 조회된 지 몇 초 지났는지
+    각 항목의 age_seconds와 X-Data-Age-Seconds 헤더로 알려줍니다. (스냅샷이 없으면 age_seconds는 null)
     """
     try:
-        # 기본값을 사용하여 버스 도착 정보 가져오기
-        bus_arrivals = get_bus_arrival_info()  # 기본값 사용
+        # 폴러 스냅샷이 없거나 오래되었으면 이 요청에서 직접 조회
+        snapshot = await stage_runner.run("arrival", chatbot.arrival_poller.get)
+        age_seconds = chatbot.arrival_poller.age_seconds(snapshot)
+        if age_seconds is not None:
+            response.headers["X-Data-Age-Seconds"] = str(age_seconds)
         
         # 결과를 반환할 형식으로 변환
-        result = [{"bus_number": bus[0], "arrival_minutes": bus[1], "prev_count": bus[2]} for bus in bus_arrivals]
+        result = [
+            {"bus_number": bus[0], "arrival_minutes": bus[1], "prev_count": bus[2], "age_seconds": age_seconds}
+            for bus in snapshot.arrivals
+        ]
         
         return result
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
 
+@app.on_event("startup")
+async def start_arrival_poller():
+    """서버 시작 시 버스 도착 정보 백그라운드 갱신을 시작합니다."""
+    if chatbot.arrival_poller is not None:
+        chatbot.arrival_poller.start()
+
+@app.on_event("shutdown")
+async def shutdown_stage_runner():
+    """서버 종료 시 스레드 풀을 정리하고 캐시를 저장합니다."""
+    if chatbot.arrival_poller is not None:
+        chatbot.arrival_poller.stop()
+    stage_runner.shutdown()
+    chatbot.shutdown()
+
 if __name__ == "__main__":
     uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
@@ -0,0 +1,120 @@
+# 외부 서비스 장애 차단(circuit breaker) 모듈
+import os
+import threading
+import time
+
+# 🔹 연속 실패 몇 번에 차단할지, 차단 후 몇 초 뒤에 다시 시도할지 (환경 변수로 조정 가능)
+FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+RECOVERY_SECONDS = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
+
+CLOSED = "closed"        # 정상: 모든 호출 허용
+OPEN = "open"            # 차단: 호출하지 않고 바로 대체 결과 사용
+HALF_OPEN = "half_open"  # 시험: 한 번만 호출해 보고 결과에 따라 복구 또는 다시 차단
+
+
+class CircuitOpenError(Exception):
+    """차단된 서비스를 호출하려고 할 때 발생하는 예외"""
+
+
+class CircuitBreaker:
+    """외부 서비스별 연속 실패를 세어, 장애 중에는 호출을 바로 거절하는 클래스"""
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, recovery_seconds=RECOVERY_SECONDS):
+        """차단기 초기화 (처음에는 closed 상태)"""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self._trial_started_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """지금 호출해도 되는지 확인합니다. 차단 후 복구 시간이 지났으면 시험 호출 한 번을 허용합니다."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            now = time.time()
+            if self.state == OPEN and now - self.opened_at >= self.recovery_seconds:
+                self.state = HALF_OPEN
+                self._trial_started_at = now
+                print(f"🔌 '{self.name}' 차단기 시험 호출 (half-open)")
+                return True
+            if self.state == HALF_OPEN and now - self._trial_started_at >= self.recovery_seconds:
+                # 이전 시험 호출의 결과가 오지 않았으면 새 시험 호출 허용
+                self._trial_started_at = now
+                return True
+
+            self.rejected += 1
+            return False
+
+    def is_open(self):
+        """차단 중이고 아직 복구 시간이 지나지 않았는지 확인합니다. (allow()와 달리 시험 호출 기회를 쓰지 않음)"""
+        with self._lock:
+            return self.state == OPEN and time.time() - self.opened_at < self.recovery_seconds
+
+    def record_success(self):
+        """호출 성공을 기록합니다. 시험 호출이 성공하면 차단을 해제합니다."""
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✅ '{self.name}' 차단기 복구 (closed)")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """호출 실패를 기록합니다. 연속 실패가 기준을 넘거나 시험 호출이 실패하면 차단합니다."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"🚫 '{self.name}' 차단기 열림: 연속 실패 {self.consecutive_failures}회")
+                self.state = OPEN
+                self.opened_at = time.time()
+
+    def call(self, func, *args, **kwargs):
+        """차단기를 거쳐 함수를 호출합니다. 차단 중이면 CircuitOpenError를 발생시킵니다."""
+        if not self.allow():
+            raise CircuitOpenError(f"'{self.name}' 서비스가 일시적으로 차단되었습니다.")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self):
+        """현재 상태를 딕셔너리로 반환합니다."""
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, round(self.recovery_seconds - (time.time() - self.opened_at), 1))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "rejected": self.rejected,
+                "retry_in_seconds": retry_in,
+            }
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """이름에 해당하는 차단기를 반환하거나 새로 생성합니다."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = CircuitBreaker(name)
+        return _registry[name]
+
+
+def snapshot_breakers():
+    """등록된 모든 차단기의 상태를 반환합니다."""
+    with _registry_lock:
+        items = list(_registry.items())
+    return {name: breaker.snapshot() for name, breaker in sorted(items)}
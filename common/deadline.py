@@ -0,0 +1,71 @@
+# 요청 단위 처리 시간 예산(deadline) 모듈
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+
+# 🔹 요청 하나에 허용하는 전체 처리 시간(초)과 단계 실행에 필요한 최소 남은 시간(초)
+DEFAULT_BUDGET_SECONDS = float(os.getenv("REQUEST_BUDGET_SECONDS", "3"))
+MIN_STAGE_SECONDS = float(os.getenv("REQUEST_MIN_STAGE_SECONDS", "0.5"))
+
+# 현재 요청의 Deadline (요청 밖에서는 None → 제한 없음)
+_current_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+class Deadline:
+    """요청의 만료 시각과 시간이 부족해 건너뛴 단계를 기록하는 클래스"""
+
+    def __init__(self, seconds=DEFAULT_BUDGET_SECONDS):
+        """지금부터 seconds초 뒤에 만료되는 deadline을 생성합니다."""
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.skipped_stages = []
+
+    def remaining(self):
+        """남은 시간(초)을 반환합니다. (만료되었으면 0)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        """만료되었는지 확인합니다."""
+        return self.remaining() <= 0
+
+    def skip(self, stage):
+        """시간 부족이나 외부 서비스 장애로 건너뛰거나 캐시로 대체한 단계를 기록합니다."""
+        if stage not in self.skipped_stages:
+            self.skipped_stages.append(stage)
+            print(f"⏱️ '{stage}' 단계를 건너뛰고 대체 결과를 사용합니다. (남은 시간 {self.remaining():.2f}초)")
+
+
+@contextmanager
+def deadline_scope(seconds=DEFAULT_BUDGET_SECONDS):
+    """with 문 안의 모든 단계에 같은 deadline을 적용합니다. (StageRunner 작업 스레드에도 전달됨)"""
+    deadline = Deadline(seconds)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline():
+    """현재 요청의 Deadline을 반환합니다. (없으면 None)"""
+    return _current_deadline.get()
+
+
+def remaining_time():
+    """현재 요청의 남은 시간(초)을 반환합니다. (deadline이 없으면 None)"""
+    deadline = _current_deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def has_budget(min_seconds=MIN_STAGE_SECONDS):
+    """다음 단계를 실행할 시간이 min_seconds 이상 남았는지 확인합니다. (deadline이 없으면 항상 True)"""
+    deadline = _current_deadline.get()
+    return deadline is None or deadline.remaining() > min_seconds
+
+
+def skip_stage(stage):
+    """현재 요청에서 건너뛴 단계를 기록합니다. (deadline이 없으면 무시)"""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.skip(stage)
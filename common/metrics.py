@@ -0,0 +1,94 @@
+# 지연 시간 지표 수집 모듈
+import threading
+import time
+from collections import deque
+
+# 지표별로 보관할 최근 측정값 개수
+DEFAULT_WINDOW = 1000
+
+
+def _pick_percentile(sorted_values, pct):
+    """정렬된 값 목록에서 백분위 값을 반환합니다."""
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+class LatencyStats:
+    """최근 측정값을 보관하고 백분위 지연 시간을 계산하는 클래스"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        """측정값 저장소 초기화"""
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, error=False):
+        """측정값(초)을 기록합니다."""
+        with self._lock:
+            self.samples.append(seconds)
+            self.count += 1
+            if error:
+                self.errors += 1
+
+    def percentile(self, pct):
+        """최근 측정값의 백분위 값(초)을 반환합니다."""
+        with self._lock:
+            values = sorted(self.samples)
+        return _pick_percentile(values, pct)
+
+    def snapshot(self):
+        """현재 통계를 밀리초 단위 딕셔너리로 반환합니다."""
+        with self._lock:
+            values = sorted(self.samples)
+            count, errors = self.count, self.errors
+
+        def ms(pct):
+            value = _pick_percentile(values, pct)
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "count": count,
+            "errors": errors,
+            "p50_ms": ms(50),
+            "p90_ms": ms(90),
+            "p99_ms": ms(99),
+            "max_ms": round(values[-1] * 1000, 1) if values else None,
+        }
+
+
+class Timer:
+    """with 문으로 구간 시간을 측정해 LatencyStats에 기록하는 도우미"""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stats.record(time.perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_latency_stats(name):
+    """이름에 해당하는 지표를 반환하거나 새로 생성합니다."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = LatencyStats()
+        return _registry[name]
+
+
+def snapshot_all():
+    """등록된 모든 지표의 통계를 반환합니다."""
+    with _registry_lock:
+        items = list(_registry.items())
+    return {name: stats.snapshot() for name, stats in sorted(items)}
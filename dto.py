@@ -1,4 +1,4 @@
-from typing import List, Optional, Tuple, Any
+from typing import List, Optional, Tuple, Any, Dict
 from pydantic import BaseModel
 
 class ChatRequest(BaseModel):
@@ -44,19 +44,25 @@ class BusRouteResponse(BaseModel):
 class GeneralResponse(BaseModel):
     response: str
     success: bool
+    skipped_stages: List[str] = []  # 처리 시간 부족이나 외부 서비스 장애로 건너뛰거나 캐시로 대체한 단계
 
 class LocationInfo(BaseModel):
     places: List[str]  # 검색된 장소명들
     coordinates: List[Tuple[float, float]]  # 좌표들
     conversation_response: str  # 프롬프트로 생성된 대화형 응답
+    skipped_stages: List[str] = []  # 처리 시간 부족이나 외부 서비스 장애로 건너뛰거나 캐시로 대체한 단계
 
 class PathInfo(BaseModel):
     routes_text: str  # 형식적인 경로 텍스트
     coordinates: List[List[float]]  # 좌표들 배열로 변경
     conversation_response: str  # 프롬프트로 생성된 대화형 응답
+    skipped_stages: List[str] = []  # 처리 시간 부족이나 외부 서비스 장애로 건너뛰거나 캐시로 대체한 단계
 
 class BusInfo(BaseModel):
     available_buses: List[str]  # 이용 가능한 버스 번호들
     arrival_times: List[dict[str, str]]  # 버스별 도착 시간 정보
+    stops_to_ride: Dict[str, int] = {}  # 버스별로 키오스크 정류장에서 목적지 주변 정류장까지 이동하는 정류장 수
+    arrival_age_seconds: Optional[int] = None  # 도착 정보가 조회된 지 몇 초 지났는지
     alternative_path: Optional[PathInfo] = None  # 버스가 없을 경우의 대체 경로
-    conversation_response: str  # 프롬프트로 생성된 대화형 응답 
\ No newline at end of file
+    conversation_response: str  # 프롬프트로 생성된 대화형 응답 
+    skipped_stages: List[str] = []  # 처리 시간 부족이나 외부 서비스 장애로 건너뛰거나 캐시로 대체한 단계
\ No newline at end of file
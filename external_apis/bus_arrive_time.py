@@ -1,4 +1,5 @@
-import requests
+from external_apis.http_client import CLIENT
+from external_apis.singleflight import coalesce
 import xml.etree.ElementTree as ET
 import os
 from dotenv import load_dotenv
@@ -6,7 +7,12 @@ from dotenv import load_dotenv
 load_dotenv()
 SERVICE_KEY = os.getenv("SERVICE_KEY")
 
-def get_bus_arrival_info(city_code='36350', node_id='TSB332000523', page_no='1', num_of_rows='10'):
+# 키오스크가 설치된 정류장 (고흥군 송곡)
+CITY_CODE = os.getenv("KIOSK_CITY_CODE", "36350")
+KIOSK_NODE_ID = os.getenv("KIOSK_NODE_ID", "TSB332000523")
+
+@coalesce("tago.get_bus_arrival_info")
+def get_bus_arrival_info(city_code=CITY_CODE, node_id=KIOSK_NODE_ID, page_no='1', num_of_rows='10'):
     """
     버스 도착 정보를 조회하는 함수
     
@@ -18,6 +24,9 @@ def get_bus_arrival_info(city_code='36350', node_id='TSB332000523', page_no='1',
         
     Returns:
         list: 버스 도착 정보 리스트 (버스번호, 도착예정시간(분))
+    
+    Raises:
+        requests.exceptions.RequestException, xml.etree.ElementTree.ParseError: 조회 실패 시
     """
     
     # API 요청
@@ -31,7 +40,9 @@ def get_bus_arrival_info(city_code='36350', node_id='TSB332000523', page_no='1',
         'nodeId': node_id
     }
     
-    response = requests.get(url, params=params)
+    # 요청 실패(차단기 열림 포함)는 예외로 전달 → 폴러가 이전 도착 정보를 계속 사용
+    response = CLIENT.get(url, "tago.arrival", params=params)
+    response.raise_for_status()
     
     # print(response.text)
 
@@ -57,6 +68,10 @@ def get_bus_arrival_info(city_code='36350', node_id='TSB332000523', page_no='1',
         bus_arrivals.append(("112", 5, 1))
         
         bus_arrivals.sort(key=lambda x: x[1])
+    except ET.ParseError as e:
+        # 빈 결과로 덮어쓰지 않도록 예외로 전달
+        print(f"❌ 버스 도착 정보 응답 파싱 실패: {e}")
+        raise
     except Exception as e:
         print(f"오류 발생: {e}")
     
@@ -0,0 +1,98 @@
+import os
+import queue
+import threading
+import pymysql
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# MySQL 연결 정보 - Docker Compose 환경에 맞게 수정
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "mysql"),  # Docker Compose에서는 서비스 이름으로 접근
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", "12345678"),
+    "database": os.getenv("DB_NAME", "busstop"),
+    "charset": "utf8mb4",
+    "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+    # 쿼리 응답이 멈춰도 요청 처리 스레드가 무한정 기다리지 않도록 읽기/쓰기 대기 시간 제한
+    "read_timeout": int(os.getenv("DB_READ_TIMEOUT", "5")),
+    "write_timeout": int(os.getenv("DB_WRITE_TIMEOUT", "5")),
+    "autocommit": True
+}
+
+# 풀에 보관할 최대 연결 수
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+
+class ConnectionPool:
+    """PyMySQL 연결을 재사용하는 간단한 연결 풀"""
+
+    def __init__(self, config, size=POOL_SIZE):
+        """연결 풀 초기화 (연결은 처음 필요할 때 생성)"""
+        self.config = config
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        """쉬고 있는 연결을 꺼내거나, 한도 안에서 새 연결을 만듭니다."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return pymysql.connect(**self.config)
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            # 한도에 도달했으면 다른 요청이 반납할 때까지 대기
+            conn = self._idle.get(timeout=self.config.get("connect_timeout", 5))
+
+        # 오래 쉬던 연결은 끊겼을 수 있으므로 필요하면 다시 연결
+        try:
+            conn.ping(reconnect=True)
+        except Exception:
+            self._release(conn, broken=True)
+            raise
+        return conn
+
+    def _release(self, conn, broken=False):
+        """연결을 풀에 반납합니다. 오류가 난 연결은 닫고 버립니다."""
+        if broken:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        """with 문으로 연결을 빌려 쓰고 자동으로 반납합니다."""
+        conn = self._acquire()
+        broken = False
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self._release(conn, broken)
+
+    def fetch_all(self, query, params=None):
+        """쿼리를 실행하고 모든 결과 행을 반환합니다."""
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+
+# 프로세스 전체에서 공유하는 연결 풀
+POOL = ConnectionPool(DB_CONFIG)
@@ -1,4 +1,5 @@
 import requests
+from external_apis.http_client import CLIENT
 from dotenv import load_dotenv
 import os
 
@@ -19,7 +20,7 @@ def get_coordinates(address):
     }
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = CLIENT.get(url, "naver.geocode", headers=headers, params=params)
         response.raise_for_status()  # HTTP 에러 발생 시 예외 발생
         
         data = response.json()
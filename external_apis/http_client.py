@@ -0,0 +1,215 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from dotenv import load_dotenv
+
+from common.circuit_breaker import CircuitOpenError, get_breaker
+from common.deadline import remaining_time, skip_stage
+from common.metrics import get_latency_stats
+
+load_dotenv()
+
+# 🔹 외부 API 호출 설정 (환경 변수로 조정 가능)
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))   # 연결 대기 시간(초)
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))        # 응답 대기 시간(초)
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))             # 실패 시 재시도 횟수
+BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF_SECONDS", "0.2")) # 재시도 대기 시간 기준값
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))                # 호스트별 keep-alive 연결 수
+MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "5"))   # 이보다 긴 Retry-After는 기다리지 않음(초)
+
+# 다시 시도하면 성공할 수 있는 응답 코드
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 여러 번 보내도 결과가 같은 메서드 (그 외 메서드는 서버에 요청이 전달되기 전의 연결 실패만 재시도)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """요청 처리 시간 예산이 남지 않아 외부 API를 호출하지 않았을 때 발생하는 예외"""
+
+
+class UpstreamCircuitOpen(CircuitOpenError, requests.exceptions.ConnectionError):
+    """차단기가 열려 외부 API를 호출하지 않았을 때 발생하는 예외 (기존 RequestException 처리로 대체 결과 사용)"""
+
+
+def is_connect_error(error):
+    """서버에 요청이 전달되기 전(연결 단계)에 실패한 오류인지 확인합니다."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def retry_after_seconds(response):
+    """응답의 Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 반환합니다. (없거나 잘못된 값이면 None)"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """호스트별 requests.Session을 재사용하며 타임아웃, 재시도, 지연 시간 기록을 적용하는 HTTP 클라이언트"""
+
+    def __init__(self, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_retries=MAX_RETRIES,
+                 backoff=BACKOFF_SECONDS, pool_size=POOL_SIZE):
+        """클라이언트 초기화 (세션은 호스트별로 처음 요청할 때 생성)"""
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _get_session(self, url):
+        """URL의 호스트에 해당하는 세션을 반환합니다. (호스트마다 연결 풀 분리)"""
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # 재시도는 request()에서 직접 처리
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount(host, adapter)
+                self._sessions[host] = session
+            return session
+
+    def _backoff_seconds(self, attempt):
+        """재시도 전 대기 시간: 지수 백오프에 무작위 지연(full jitter)을 적용합니다."""
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def _budget_timeout(self, timeout, endpoint):
+        """요청 deadline이 있으면 남은 시간을 넘지 않도록 타임아웃을 줄입니다."""
+        remaining = remaining_time()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            skip_stage(f"http.{endpoint}")
+            raise DeadlineExceeded(f"요청 처리 시간 초과로 {endpoint} 호출을 건너뜁니다.")
+        if isinstance(timeout, tuple):
+            return tuple(min(value, remaining) for value in timeout)
+        return min(timeout, remaining)
+
+    def request(self, method, url, endpoint, retries=None, **kwargs):
+        """
+        외부 API를 호출하고 응답을 반환합니다.
+
+        Parameters:
+            method (str): HTTP 메서드 ("GET", "POST")
+            url (str): 요청 URL
+            endpoint (str): 지연 시간 지표 이름 (예: "kakao.keyword" → http.kakao.keyword)
+                            점 앞부분("kakao")이 차단기(circuit breaker) 이름
+            retries (int): 재시도 횟수 (없으면 기본값, GET 외 메서드는 연결 실패만 재시도)
+
+        Returns:
+            requests.Response: 마지막 응답 (재시도 후에도 5xx/429면 그 응답을 그대로 반환)
+
+        Raises:
+            requests.exceptions.RequestException: 재시도 후에도 연결/타임아웃 오류가 계속될 때
+            DeadlineExceeded: 요청 deadline이 이미 지났을 때
+            UpstreamCircuitOpen: 외부 서비스가 장애로 차단되어 있을 때
+        """
+        breaker = get_breaker(endpoint.split(".")[0])
+        if not breaker.allow():
+            skip_stage(f"http.{endpoint}")
+            raise UpstreamCircuitOpen(f"{breaker.name} 서비스 장애로 {endpoint} 호출을 건너뜁니다.")
+
+        try:
+            response = self._request_with_retries(method, url, endpoint, retries, **kwargs)
+        except DeadlineExceeded:
+            # 요청 예산 부족은 외부 서비스 장애가 아님
+            raise
+        except requests.exceptions.RequestException:
+            breaker.record_failure()
+            raise
+
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _request_with_retries(self, method, url, endpoint, retries=None, **kwargs):
+        """
+        타임아웃과 재시도를 적용해 요청을 보냅니다.
+
+        POST처럼 멱등이 아닌 요청은 서버가 이미 처리했을 수 있으므로 연결 실패만 재시도하고,
+        응답에 Retry-After가 있으면 그 시간만큼 기다린 뒤 재시도합니다.
+        """
+        timeout = kwargs.pop("timeout", self.timeout)
+        retries = self.max_retries if retries is None else retries
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        session = self._get_session(url)
+        stats = get_latency_stats(f"http.{endpoint}")
+
+        attempt = 0
+        while True:
+            attempt_timeout = self._budget_timeout(timeout, endpoint)
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, timeout=attempt_timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                stats.record(time.perf_counter() - start, error=True)
+                if attempt >= retries or not (idempotent or is_connect_error(e)):
+                    raise
+                failed_response = None
+                delay = self._backoff_seconds(attempt)
+            else:
+                failed = response.status_code in RETRY_STATUS_CODES
+                stats.record(time.perf_counter() - start, error=failed or response.status_code >= 500)
+                if not failed or not idempotent or attempt >= retries:
+                    return response
+                failed_response = response
+                delay = self._backoff_seconds(attempt)
+                retry_after = retry_after_seconds(response)
+                if retry_after is not None:
+                    if retry_after > MAX_RETRY_AFTER:
+                        # 서버가 오래 기다리라고 하면 재시도하지 않고 그 응답으로 끝냄
+                        return response
+                    delay = max(delay, retry_after)
+
+            # deadline 안에 재시도할 시간이 없으면 마지막 결과로 끝냄
+            remaining = remaining_time()
+            if remaining is not None and remaining <= delay:
+                skip_stage(f"http.{endpoint}.retry")
+                if failed_response is not None:
+                    return failed_response
+                raise DeadlineExceeded(f"요청 처리 시간 초과로 {endpoint} 재시도를 건너뜁니다.")
+            if failed_response is not None:
+                failed_response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url, endpoint, **kwargs):
+        """GET 요청을 보냅니다."""
+        return self.request("GET", url, endpoint, **kwargs)
+
+    def post(self, url, endpoint, **kwargs):
+        """POST 요청을 보냅니다."""
+        return self.request("POST", url, endpoint, **kwargs)
+
+    def close(self):
+        """모든 세션의 연결을 닫습니다."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+# 프로세스 전체에서 공유하는 HTTP 클라이언트
+CLIENT = HttpClient()
@@ -1,4 +1,6 @@
 import requests
+from external_apis.http_client import CLIENT
+from external_apis.singleflight import coalesce
 import json
 import os
 from dotenv import load_dotenv
@@ -7,17 +9,26 @@ load_dotenv()
 
 KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
 
-# 길찾기 검색, 버스 어디가요 시 사용됨 
-def search_keyword_top1(query):
+# 🔹 검색 기준 좌표 (고흥군)
+CENTER_X = 127.289108
+CENTER_Y = 34.608177
+
+# 장소 캐시(gazetteer)에서 사용됨 - 오류를 삼키지 않고 그대로 전달
+@coalesce("kakao.search_keyword")
+def search_keyword(query, size=1, sort=None):
     """
-    Kakao 로컬 검색 API를 사용하여 키워드 검색 결과 중 상위 1개의 place_name, x, y 좌표를 반환합니다.
+    Kakao 로컬 검색 API로 키워드를 검색해 상위 size개의 (place_name, x, y)를 반환합니다.
 
     Parameters:
     query (str): 검색할 키워드
+    size (int): 반환할 최대 결과 수
+    sort (str): 정렬 방식 ("distance" 등, 없으면 정확도순)
 
     Returns:
-    list: [(place_name1, x1, y1), (place_name2, x2, y2), (place_name3, x3, y3)]
-          검색된 장소 이름과 좌표 리스트 (검색 결과 없거나 오류 시 빈 리스트 반환)
+    list: [(place_name, x, y), ...] - 검색 결과가 없으면 빈 리스트
+
+    Raises:
+    requests.exceptions.RequestException, json.JSONDecodeError: API 요청 또는 응답 파싱 실패 시
     """
     url = "https://dapi.kakao.com/v2/local/search/keyword.json"
     
@@ -27,22 +38,37 @@ def search_keyword_top1(query):
     
     params = {
         "query": query,
-        "x": 127.289108,
-        "y": 34.608177
+        "x": CENTER_X,
+        "y": CENTER_Y
     }
+    if sort:
+        params["sort"] = sort
+    
+    response = CLIENT.get(url, "kakao.keyword", headers=headers, params=params)
+    response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
     
+    data = response.json()
+    
+    results = []
+    for doc in data.get("documents", [])[:size]:
+        results.append((doc.get("place_name"), doc.get("x"), doc.get("y")))
+    return results
+
+# 길찾기 검색, 버스 어디가요 시 사용됨 
+def search_keyword_top1(query):
+    """
+    Kakao 로컬 검색 API를 사용하여 키워드 검색 결과 중 상위 1개의 place_name, x, y 좌표를 반환합니다.
+
+    Parameters:
+    query (str): 검색할 키워드
+
+    Returns:
+    tuple: (place_name, x, y) - 검색된 장소 이름과 좌표 (검색 결과 없거나 오류 시 (None, None, None) 반환)
+    """
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
-        
-        data = response.json()
-        
-        if data.get("documents"):
-            top_result = data["documents"][0]
-            place_name = top_result.get("place_name")
-            x = top_result.get("x")
-            y = top_result.get("y")
-            return place_name, x, y  # 튜플로 반환
+        results = search_keyword(query, size=1)
+        if results:
+            return results[0]  # 튜플로 반환
         else:
             return None, None, None  # 검색 결과 없을 경우 None 반환
     
@@ -56,43 +82,17 @@ def search_keyword_top1(query):
 # 장소 검색 시 사용됨
 def search_keyword_top3(query):
     """
-    Kakao 로컬 검색 API를 사용하여 키워드 검색 결과 중 상위 3개의 place_name, x, y 좌표를 반환합니다.
+    Kakao 로컬 검색 API를 사용하여 키워드 검색 결과 중 (거리순) 상위 3개의 place_name, x, y 좌표를 반환합니다.
     
     Parameters:
     query (str): 검색할 키워드
-    KAKAO_REST_API_KEY (str): Kakao REST API 키
     
     Returns:
-    tuple: (place_name, x, y) - 검색된 장소 이름과 좌표 (검색 결과 없거나 오류 시 None 반환)
+    list: [(place_name1, x1, y1), (place_name2, x2, y2), (place_name3, x3, y3)]
+          검색된 장소 이름과 좌표 리스트 (검색 결과 없거나 오류 시 빈 리스트 반환)
     """
-    url = "https://dapi.kakao.com/v2/local/search/keyword.json"
-    
-    headers = {
-        "Authorization": f"KakaoAK {KAKAO_REST_API_KEY}"
-    }
-    
-    params = {
-        "query": query,
-        "x": 127.289108,
-        "y": 34.608177,
-        "sort": "distance"
-    }
-    
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
-        
-        data = response.json()
-        
-        results = []
-        if data.get("documents"):
-            for doc in data ["documents"][:3]:
-                place_name = doc.get("place_name")
-                x = doc.get("x")
-                y = doc.get("y")
-                results.append((place_name, x, y))
-        
-        return results
+        return search_keyword(query, size=3, sort="distance")
     
     except requests.exceptions.RequestException as e:
         print(f"❌ API 요청 실패: {str(e)}")
@@ -1,21 +1,15 @@
 import os
-import requests
+from external_apis.http_client import CLIENT
 import xml.etree.ElementTree as ET
-import pymysql
 from dotenv import load_dotenv
+from external_apis.db_pool import POOL
 
 load_dotenv()
 
 SERVICE_KEY = os.getenv("SERVICE_KEY")
 
-# MySQL 연결 정보 - Docker Compose 환경에 맞게 수정
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST", "mysql"),  # Docker Compose에서는 서비스 이름으로 접근
-    "user": os.getenv("DB_USER", "root"),
-    "password": os.getenv("DB_PASSWORD", "12345678"),
-    "database": os.getenv("DB_NAME", "busstop"),
-    "charset": "utf8mb4"
-}
+# 로컬 정류장 색인에서 주변 정류장을 찾을 반경(m)
+NEARBY_RADIUS_M = float(os.getenv("NEARBY_RADIUS_M", "500"))
 
 def get_bus_arrival_info(gpsLati, gpsLong, page_no='1', num_of_rows='10'):
     """
@@ -41,7 +35,7 @@ def get_bus_arrival_info(gpsLati, gpsLong, page_no='1', num_of_rows='10'):
         'gpsLong': gpsLong
     }
     
-    response = requests.get(url, params=params)
+    response = CLIENT.get(url, "tago.nearby_stops", params=params)
     
     # 결과를 저장할 리스트
     bus_stations = []
@@ -69,51 +63,77 @@ def get_bus_arrival_info(gpsLati, gpsLong, page_no='1', num_of_rows='10'):
     
     return bus_stations
 
-def get_bus_numbers_by_node_id(node_id):
+def get_all_bus_stop_rows():
     """
-    특정 정류장 ID(node_id)를 통해 해당 정류장을 지나는 버스 번호 목록을 조회합니다.
+    bus_stops 테이블의 모든 행을 노선/정류장 순서대로 조회합니다. (메모리 정류장 카탈로그 생성용)
+    
+    Returns:
+        list: (버스 번호, 노선 ID, 정류장 ID, 정류장 이름, 위도, 경도, 정류장 순서) 튜플로 구성된 리스트
+    """
+    query = """
+    SELECT bus_number, route_id, node_id, node_name, latitude, longitude, node_order
+    FROM bus_stops
+    ORDER BY route_id, node_order
+    """
+    return list(POOL.fetch_all(query))
+
+def get_bus_stops_signature():
+    """
+    bus_stops 테이블의 변경 여부를 확인하기 위한 체크섬을 조회합니다.
+    
+    Returns:
+        int: 테이블 체크섬 (내용이 바뀌면 값도 바뀜)
+    """
+    rows = POOL.fetch_all("CHECKSUM TABLE bus_stops")
+    return rows[0][1] if rows else None
+
+def get_bus_numbers_by_node_ids(node_ids):
+    """
+    여러 정류장 ID를 한 번의 쿼리로 조회하여 정류장별로 지나는 버스 번호 목록을 반환합니다.
     
     Args:
-        node_id (str): 조회할 정류장 ID
+        node_ids (list): 조회할 정류장 ID 목록
         
     Returns:
-        list: 해당 정류장을 지나는 버스 번호 목록
+        dict: {정류장 ID: [버스 번호 리스트]}
     """
-    bus_numbers = []
+    node_ids = list(dict.fromkeys(node_ids))
+    bus_numbers = {node_id: [] for node_id in node_ids}
+    if not node_ids:
+        return bus_numbers
     
     try:
-        # MySQL 연결
-        conn = pymysql.connect(**DB_CONFIG)
-        cursor = conn.cursor()
-        
-        # 쿼리 실행
-        query = "SELECT DISTINCT bus_number FROM bus_stops WHERE node_id = %s"
-        cursor.execute(query, (node_id,))
-        
-        # 결과 가져오기
-        results = cursor.fetchall()
-        
-        # 결과 처리
-        if results:
-            bus_numbers = [result[0] for result in results]
-            print(f"✅ 정류장 ID '{node_id}'를 지나는 버스: {', '.join(bus_numbers)}")
-        else:
-            print(f"❌ 정류장 ID '{node_id}'에 해당하는 버스를 찾을 수 없습니다.")
-        
+        placeholders = ", ".join(["%s"] * len(node_ids))
+        query = f"SELECT DISTINCT node_id, bus_number FROM bus_stops WHERE node_id IN ({placeholders})"
+        for node_id, bus_number in POOL.fetch_all(query, node_ids):
+            bus_numbers[node_id].append(bus_number)
+        print(f"✅ 정류장 {len(node_ids)}곳의 버스 번호를 한 번에 조회했습니다.")
+    
     except Exception as e:
         print(f"⚠️ 데이터베이스 조회 중 오류 발생: {e}")
     
-    finally:
-        # 연결 닫기
-        if 'cursor' in locals():
-            cursor.close()
-        if 'conn' in locals():
-            conn.close()
-        print("🔒 DB 연결 종료")
+    return bus_numbers
+
+def get_bus_numbers_by_node_id(node_id):
+    """
+    특정 정류장 ID(node_id)를 통해 해당 정류장을 지나는 버스 번호 목록을 조회합니다.
+    
+    Args:
+        node_id (str): 조회할 정류장 ID
+        
+    Returns:
+        list: 해당 정류장을 지나는 버스 번호 목록
+    """
+    bus_numbers = get_bus_numbers_by_node_ids([node_id])[node_id]
+    
+    if bus_numbers:
+        print(f"✅ 정류장 ID '{node_id}'를 지나는 버스: {', '.join(bus_numbers)}")
+    else:
+        print(f"❌ 정류장 ID '{node_id}'에 해당하는 버스를 찾을 수 없습니다.")
     
     return bus_numbers
 
-def get_nearby_bus_info(gpsLati, gpsLong, page_no='1', num_of_rows='10'):
+def get_nearby_bus_info(gpsLati, gpsLong, page_no='1', num_of_rows='10', catalog=None):
     """
     주어진 GPS 좌표 주변의 버스 정류장 정보와 각 정류장을 지나는 버스 번호를 조회합니다.
     
@@ -122,24 +142,34 @@ def get_nearby_bus_info(gpsLati, gpsLong, page_no='1', num_of_rows='10'):
         gpsLong (float): 경도
         page_no (str): 페이지 번호
         num_of_rows (str): 한 페이지당 결과 수
+        catalog (BusStopCatalog): 메모리 정류장 카탈로그 (없으면 원격 API와 DB 사용)
         
     Returns:
         list: (정류장 이름, 정류장 ID, [버스 번호 리스트]) 튜플로 구성된 리스트
     """
-    # 주변 버스 정류장 정보 가져오기
-    bus_stations = get_bus_arrival_info(gpsLati, gpsLong, page_no, num_of_rows)
-    print(bus_stations)
+    # 주변 버스 정류장 정보 가져오기 (카탈로그가 있으면 API 호출 없이 로컬 색인에서 검색)
+    if catalog is not None and catalog.is_loaded():
+        bus_stations = catalog.stop_index.nearby_stations(float(gpsLati), float(gpsLong), NEARBY_RADIUS_M, int(num_of_rows))
+        print(f"📍 로컬 정류장 색인 검색 결과: {bus_stations}")
+    else:
+        bus_stations = get_bus_arrival_info(gpsLati, gpsLong, page_no, num_of_rows)
+        print(bus_stations)
 
     if not bus_stations:
         return {
             "status" : "주변_정류장_없음",
             "message" : "해당 위치에서 가까운 정류장이 없습니다."
         }
-    # 각 정류장별로 버스 번호 조회
-    result = []
+    # 각 정류장별 버스 번호 조회 (카탈로그가 있으면 메모리에서, 없으면 IN 쿼리 한 번으로 조회)
+    station_ids = [station_id for _, station_id in bus_stations]
+    if catalog is not None and catalog.is_loaded():
+        bus_numbers_by_station = catalog.get_bus_numbers(station_ids)
+    else:
+        bus_numbers_by_station = get_bus_numbers_by_node_ids(station_ids)
     
+    result = []
     for station_name, station_id in bus_stations:
-        bus_numbers = get_bus_numbers_by_node_id(station_id)
+        bus_numbers = bus_numbers_by_station.get(station_id, [])
         result.append({
             "station_name": station_name,
             "station_id": station_id,
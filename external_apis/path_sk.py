@@ -1,4 +1,5 @@
-import requests
+from external_apis.http_client import CLIENT
+from external_apis.singleflight import coalesce
 import json
 from dotenv import load_dotenv
 import os
@@ -13,6 +14,7 @@ SK_OPEN_API = os.getenv("SK_OPEN_API")
 START_X = "127.294395"
 START_Y = "34.620273"
 
+@coalesce("sk.get_transit_route")
 def get_transit_route(end_x, end_y, count=1):
     url = "https://apis.openapi.sk.com/transit/routes"
     headers = {
@@ -30,7 +32,7 @@ def get_transit_route(end_x, end_y, count=1):
         "format": "json"
     }
 
-    response = requests.post(url, headers=headers, json=data)
+    response = CLIENT.post(url, "sk.transit", headers=headers, json=data)
     
     if response.status_code == 200:
         result = response.json()
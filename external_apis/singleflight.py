@@ -0,0 +1,98 @@
+import copy
+import functools
+import inspect
+import threading
+
+from external_apis.http_client import DeadlineExceeded
+from common.deadline import remaining_time, skip_stage
+
+
+class _InFlightCall:
+    """진행 중인 외부 API 호출 하나의 결과를 기다리는 요청들이 공유하는 객체"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """같은 인자로 동시에 들어온 외부 API 호출을 하나로 합쳐, 먼저 온 호출의 결과를 함께 사용하는 클래스"""
+
+    def __init__(self):
+        """진행 중인 호출 목록과 함수별 카운터 초기화"""
+        self._calls = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def do(self, name, key, func, *args, **kwargs):
+        """key가 같은 호출이 이미 진행 중이면 그 결과를 기다리고, 아니면 직접 호출합니다."""
+        with self._lock:
+            counter = self._counters.setdefault(name, {"calls": 0, "deduplicated": 0})
+            counter["calls"] += 1
+
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = _InFlightCall()
+                    self._calls[key] = call
+                else:
+                    counter["deduplicated"] += 1
+            if leader:
+                break
+
+            # 먼저 온 호출을 기다리되, 이 요청의 deadline은 넘기지 않음
+            if not call.event.wait(remaining_time()):
+                skip_stage(f"singleflight.{name}")
+                raise DeadlineExceeded(f"요청 처리 시간 초과로 {name} 결과를 기다리지 않습니다.")
+            if isinstance(call.error, DeadlineExceeded):
+                # 먼저 온 요청의 처리 시간이 부족했던 것이므로 이 요청의 남은 시간으로 다시 호출
+                with self._lock:
+                    counter["deduplicated"] -= 1
+                continue
+            if call.error is not None:
+                # 같은 예외 객체를 여러 스레드에서 다시 발생시키면 traceback이 섞이므로 복사본을 발생
+                raise copy.copy(call.error).with_traceback(None) from call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self):
+        """함수별 전체 호출 수와 합쳐진(중복 제거된) 호출 수를 반환합니다."""
+        with self._lock:
+            return {name: dict(counter) for name, counter in sorted(self._counters.items())}
+
+
+# 프로세스 전체에서 공유하는 호출 병합기
+GROUP = SingleFlight()
+
+
+def coalesce(name):
+    """같은 인자로 동시에 들어온 호출을 하나로 합치는 데코레이터 (기본값을 생략한 호출과 명시한 호출도 같은 호출로 봄)"""
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = (name, tuple(bound.arguments.items()))
+                hash(key)
+            except TypeError:
+                # 인자가 잘못되었거나 해시할 수 없으면 합치지 않고 그대로 호출
+                return func(*args, **kwargs)
+            return GROUP.do(name, key, func, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,13 +1,21 @@
 # main.py - 메인 애플리케이션 파일
-import time
+import os
 
-from modules.config import LLM, DATABASE
-from modules.chat_history import ChatHistoryManager
+from modules.config import LLM, INTENT_LLM, DATABASE, EMBEDDING, LLM_BREAKER
+from modules.chat_history import ChatHistoryManager, MAX_MESSAGES
+from modules.history_backend import create_history_backend
 from modules.intent_processor import IntentProcessor
+from modules.intent_cache import IntentCache
+from modules.local_intent import LocalIntentClassifier
 from modules.path_finder import PathFinder
 from modules.place_searcher import PlaceSearcher
 from modules.bus_matcher import BusRouteManager
+from modules.arrival_poller import ArrivalPoller
+from modules.place_resolver import PlaceResolver, place_lookup_scope
+from modules.gazetteer import PlaceGazetteer
+from modules.bus_stop_catalog import BusStopCatalog
 from modules.rag_chain import RAGChainManager
+from modules.answer_cache import SemanticAnswerCache
 
 
 class ChatbotApp:
@@ -15,24 +23,36 @@ class ChatbotApp:
     
     def __init__(self):
         self.session_id = "abc123"
-        self.last_interaction_time = time.time()
-        self.history_manager = ChatHistoryManager()
+        self.history_manager = ChatHistoryManager(backend=self.load_history_backend())
         self.rag_manager = None
         self.intent_processor = None
         self.path_finder = None
         self.place_searcher = None
         self.bus_route_manager = None
+        self.bus_stop_catalog = None
+        self.arrival_poller = None
+        self.gazetteer = None
     
     def initialize_modules(self):
         """모든 필요한 모듈을 초기화합니다."""
         
         try:
             # 모듈 초기화
-            self.intent_processor = IntentProcessor(LLM)
-            self.path_finder = PathFinder()
-            self.place_searcher = PlaceSearcher()
-            self.bus_route_manager = BusRouteManager(self.path_finder)
-            self.rag_manager = RAGChainManager(LLM, DATABASE, self.history_manager.get_session_history)
+            intent_cache = IntentCache(path=os.getenv("INTENT_CACHE_PATH", "cache/intent_cache.json"))
+            self.intent_processor = IntentProcessor(
+                INTENT_LLM, LocalIntentClassifier(), intent_cache=intent_cache, llm_breaker=LLM_BREAKER
+            )
+            self.bus_stop_catalog = self.load_bus_stop_catalog()
+            self.gazetteer = self.load_gazetteer()
+            resolver = PlaceResolver(self.gazetteer.search_top1) if self.gazetteer is not None else None
+            self.path_finder = PathFinder(self.bus_stop_catalog, resolver)
+            self.place_searcher = PlaceSearcher(self.gazetteer)
+            self.arrival_poller = ArrivalPoller()
+            self.bus_route_manager = BusRouteManager(self.path_finder, self.bus_stop_catalog, self.arrival_poller)
+            self.rag_manager = RAGChainManager(
+                LLM, DATABASE, self.history_manager.get_session_history, llm_breaker=LLM_BREAKER,
+                answer_cache=self.load_answer_cache()
+            )
             
             print("✅ 모든 모듈이 성공적으로 초기화되었습니다.")
             return True
@@ -40,16 +60,53 @@ class ChatbotApp:
             print(f"❌ 모듈 초기화 중 오류 발생: {str(e)}")
             return False
     
-    def reset_if_idle(self, timeout=60):
-        """일정 시간 동안 상호작용이 없으면 세션을 초기화합니다."""
-        if time.time() - self.last_interaction_time > timeout:
-            self.history_manager.reset_session(self.session_id)
-            self.last_interaction_time = time.time()
+    def load_bus_stop_catalog(self):
+        """bus_stops 테이블을 메모리에 올립니다. 실패하면 원격 API와 DB를 사용하도록 None을 반환합니다."""
+        if os.getenv("USE_LOCAL_STOP_INDEX", "true").lower() != "true":
+            return None
+        
+        try:
+            catalog = BusStopCatalog()
+            catalog.load()
+            return catalog
+        except Exception as e:
+            print(f"⚠️ 정류장 카탈로그 생성 실패, 원격 API를 사용합니다: {str(e)}")
+            return None
+    
+    def load_gazetteer(self):
+        """장소 검색 캐시(SQLite)를 열고 정류장 이름으로 채웁니다. 실패하면 카카오 API만 사용하도록 None을 반환합니다."""
+        if os.getenv("USE_PLACE_GAZETTEER", "true").lower() != "true":
+            return None
+        
+        try:
+            gazetteer = PlaceGazetteer()
+            if self.bus_stop_catalog is not None:
+                gazetteer.seed_from_rows(self.bus_stop_catalog.rows)
+            return gazetteer
+        except Exception as e:
+            print(f"⚠️ 장소 gazetteer 생성 실패, 카카오 API를 사용합니다: {str(e)}")
+            return None
+    
+    def load_answer_cache(self):
+        """일반 질문 답변 캐시를 생성합니다. (USE_ANSWER_CACHE=false면 None)"""
+        if os.getenv("USE_ANSWER_CACHE", "true").lower() != "true":
+            return None
+        return SemanticAnswerCache(EMBEDDING.embed_query)
+    
+    def load_history_backend(self):
+        """여러 워커가 공유하는 대화 기록 저장소(CHAT_HISTORY_BACKEND)를 엽니다. 실패하면 프로세스 메모리만 사용하도록 None을 반환합니다."""
+        try:
+            return create_history_backend(max_messages=MAX_MESSAGES)
+        except Exception as e:
+            print(f"⚠️ 대화 기록 저장소 연결 실패, 메모리를 사용합니다: {str(e)}")
+            return None
+    
+    def reset_if_idle(self):
+        """일정 시간(CHAT_SESSION_IDLE_SECONDS) 동안 상호작용이 없던 세션의 대화 기록을 초기화합니다."""
+        self.history_manager.expire_idle()
     
     def process_user_input(self, user_input):
         """사용자 입력을 처리하고 적절한 응답을 반환합니다."""
-        self.last_interaction_time = time.time()
-        
         # 특수 명령어 처리
         if user_input.lower() == "e":
             return "exit"
@@ -77,6 +134,12 @@ class ChatbotApp:
     
     def process_intent(self, intent, destination):
         """감지된 의도에 따라 적절한 기능을 실행합니다."""
+        # 한 번의 입력을 처리하는 동안 같은 목적지는 한 번만 좌표를 조회
+        with place_lookup_scope():
+            return self._process_intent(intent, destination)
+    
+    def _process_intent(self, intent, destination):
+        """의도별 처리 함수를 호출합니다."""
         if intent == "위치 찾기" and destination:
             return self.process_location_search(destination)
         
@@ -104,8 +167,8 @@ class ChatbotApp:
     
     def process_path_finding(self, destination):
         """길찾기 처리를 수행합니다."""
-        route_data, place_name = self.path_finder.find_path(destination)
-        formatted_result = self.path_finder.format_path_result(route_data, place_name or destination)
+        route_data, place = self.path_finder.find_path(destination)
+        formatted_result = self.path_finder.format_path_result(route_data, place or destination)
         
         place = formatted_result.get("place_name", "")
         routes = formatted_result.get("routes_text", "")
@@ -123,7 +186,11 @@ class ChatbotApp:
             arrival_info = result.get("arrival_info")
             
             bus_list = ", ".join([str(bus) for bus in match_buses])
-            arrival_text = "\n".join([f"{info['버스번호']}번 버스: {info['도착예정시간']}" for info in arrival_info])
+            arrival_text = "\n".join([
+                f"{info['버스번호']}번 버스: {info['도착예정시간']}"
+                + (f" ({info['이동정류장수']}개 정류장 이동)" if "이동정류장수" in info else "")
+                for info in arrival_info
+            ])
             
             return f"'{destination}'(으)로 가는 버스: {bus_list}\n\n현재 도착 정보:\n{arrival_text}"
         
@@ -135,9 +202,9 @@ class ChatbotApp:
         
         elif status == "길찾기_수행":
             route_data = result.get("route")
-            place_name = result.get("place_name")
+            place = result.get("place")
             
-            formatted_result = self.path_finder.format_path_result(route_data, place_name or destination)
+            formatted_result = self.path_finder.format_path_result(route_data, place or destination)
             routes = formatted_result.get("routes_text", "")
             coords = formatted_result.get("formatted_coordinates", "")
             
@@ -145,10 +212,13 @@ class ChatbotApp:
         
         return "버스 노선 정보를 처리할 수 없습니다."
     
-    def get_rag_response(self, user_input):
-        """RAG 체인을 사용하여 일반 응답을 생성합니다."""
+    def get_rag_response(self, user_input, session_id=None):
+        """RAG 체인을 사용하여 일반 응답을 생성합니다. (session_id가 없으면 CLI 기본 세션 사용)"""
+        if session_id is None:
+            session_id = self.session_id
+        
         try:
-            ai_response = self.rag_manager.get_ai_response(user_input, self.session_id)
+            ai_response = self.rag_manager.get_ai_response(user_input, session_id)
             response_text = "".join([chunk for chunk in ai_response])
             return response_text
         except Exception as e:
@@ -156,6 +226,21 @@ class ChatbotApp:
             print(f"❌ {error_msg}")
             return error_msg
     
+    def stream_rag_response(self, user_input, session_id=None):
+        """RAG 체인의 응답을 토큰 조각 단위로 반환하는 제너레이터를 생성합니다."""
+        if session_id is None:
+            session_id = self.session_id
+
+        return self.rag_manager.get_ai_response(user_input, session_id)
+
+    def shutdown(self):
+        """종료 전에 캐시 등 유지해야 할 상태를 저장합니다."""
+        if self.intent_processor is not None and self.intent_processor.intent_cache is not None:
+            self.intent_processor.intent_cache.save()
+        if self.gazetteer is not None:
+            self.gazetteer.close()
+        self.history_manager.close()
+    
     def run(self):
         """챗봇 애플리케이션의 메인 실행 루프"""
         print("🚏 고흥 AI 챗봇 🤖 (종료: 'e', 초기화: 'r')")
@@ -171,6 +256,7 @@ class ChatbotApp:
             response = self.process_user_input(user_input)
             
             if response == "exit":
+                self.shutdown()
                 print("👋 챗봇을 종료합니다.")
                 break
             elif response == "reset":
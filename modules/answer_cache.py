@@ -0,0 +1,134 @@
+# 일반 질문 답변 캐시 모듈 (질문 임베딩이 비슷하면 이전 답변을 재사용)
+import os
+import threading
+import time
+
+import numpy as np
+
+from modules.intent_cache import normalize_utterance
+from modules.notice_index import read_index_version
+
+# 🔹 답변 캐시 설정 (환경 변수로 조정 가능)
+SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))  # 코사인 유사도가 이 값 이상이면 같은 질문으로 봄
+ANSWER_TTL = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "600"))          # 답변에 현재 시간이 들어가므로 짧게 유지
+MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "500"))
+
+
+class SemanticAnswerCache:
+    """질문 임베딩을 키로 답변을 저장하는 캐시 (같은 문장은 임베딩 없이, 비슷한 문장은 유사도로 찾음)"""
+
+    def __init__(self, embed_query, threshold=SIMILARITY_THRESHOLD, ttl=ANSWER_TTL, max_entries=MAX_ENTRIES,
+                 index_version=read_index_version):
+        """
+        답변 캐시 초기화
+
+        embed_query(text)는 질문 임베딩을 반환하는 함수이고, index_version()이 바뀌면 캐시를 비웁니다.
+        """
+        self.embed_query = embed_query
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.index_version = index_version
+        self.version = index_version()
+        # 정규화된 질문 → (답변, 정규화된 임베딩, 저장 시각)
+        self.entries = {}
+        self._keys = []
+        self._matrix = None
+        self.counts = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "errors": 0, "invalidations": 0,
+                       "skipped_with_history": 0, "skipped_low_budget": 0}
+        self._lock = threading.Lock()
+
+    def _check_version_locked(self):
+        """공지 인덱스가 바뀌었으면 캐시를 비웁니다. 잠금을 잡은 상태에서 호출합니다."""
+        version = self.index_version()
+        if version != self.version:
+            self.version = version
+            self.entries.clear()
+            self._matrix = None
+            self.counts["invalidations"] += 1
+
+    def _expire_locked(self, now):
+        """만료된 답변을 지웁니다. 잠금을 잡은 상태에서 호출합니다."""
+        expired = [key for key, (_, _, stored_at) in self.entries.items() if now - stored_at > self.ttl]
+        for key in expired:
+            del self.entries[key]
+        if expired:
+            self._matrix = None
+
+    def _embed(self, question):
+        """질문 임베딩을 길이 1로 정규화해 반환합니다."""
+        vector = np.asarray(self.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, question):
+        """
+        캐시된 답변을 찾습니다.
+
+        (답변, 임베딩)을 반환하며, 답변이 없으면 None입니다. 임베딩은 store()에 다시 넘겨 재계산을 피합니다.
+        """
+        key = normalize_utterance(question)
+        now = time.time()
+        with self._lock:
+            self._check_version_locked()
+            self._expire_locked(now)
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.counts["exact_hits"] += 1
+                return entry[0], entry[1]
+
+        try:
+            vector = self._embed(question)
+        except Exception as e:
+            print(f"⚠️ 답변 캐시 임베딩 실패: {str(e)}")
+            with self._lock:
+                self.counts["errors"] += 1
+            return None, None
+
+        with self._lock:
+            if self.entries:
+                if self._matrix is None:
+                    self._keys = list(self.entries)
+                    self._matrix = np.stack([self.entries[k][1] for k in self._keys])
+                scores = self._matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self.counts["semantic_hits"] += 1
+                    return self.entries[self._keys[best]][0], vector
+            self.counts["misses"] += 1
+        return None, vector
+
+    def store(self, question, answer, vector=None):
+        """답변을 저장합니다. (가장 오래된 답변부터 한도까지 정리)"""
+        if vector is None:
+            try:
+                vector = self._embed(question)
+            except Exception:
+                return
+        key = normalize_utterance(question)
+        with self._lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (answer, vector, time.time())
+            while len(self.entries) > self.max_entries:
+                del self.entries[next(iter(self.entries))]
+            self._matrix = None
+
+    def skip(self, reason="with_history"):
+        """캐시를 사용하지 않은 질문을 기록합니다. (with_history: 대화 기록이 있음, low_budget: 처리 시간 부족)"""
+        with self._lock:
+            self.counts[f"skipped_{reason}"] += 1
+
+    def stats(self):
+        """답변 수, 적중/실패 수와 적중률을 반환합니다."""
+        with self._lock:
+            counts = dict(self.counts)
+            entries = len(self.entries)
+            version = self.version
+        hits = counts["exact_hits"] + counts["semantic_hits"]
+        lookups = hits + counts["misses"] + counts["errors"]
+        return {
+            "entries": entries,
+            **counts,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "index_version": version,
+        }
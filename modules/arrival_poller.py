@@ -0,0 +1,101 @@
+# 버스 도착 정보 백그라운드 갱신 모듈
+import os
+import threading
+import time
+from collections import namedtuple
+
+import external_apis.bus_arrive_time as bus_arrive_time
+from modules.deadline import has_budget, skip_stage
+
+# 정류장별 도착 정보 스냅샷: 도착 정보 리스트, 조회 시각(time.time())
+ArrivalSnapshot = namedtuple("ArrivalSnapshot", ["arrivals", "fetched_at"])
+
+# 🔹 갱신 주기(초)와 갱신할 정류장 목록 (쉼표로 구분)
+DEFAULT_INTERVAL = int(os.getenv("ARRIVAL_POLL_INTERVAL", "30"))
+DEFAULT_NODE_IDS = [
+    node_id.strip()
+    for node_id in os.getenv("ARRIVAL_POLL_NODE_IDS", bus_arrive_time.KIOSK_NODE_ID).split(",")
+    if node_id.strip()
+]
+
+
+class ArrivalPoller:
+    """설정된 정류장의 버스 도착 정보를 주기적으로 조회해 공유 스냅샷에 저장하는 클래스"""
+
+    def __init__(self, node_ids=None, interval=DEFAULT_INTERVAL, max_age=None,
+                 fetcher=bus_arrive_time.get_bus_arrival_info):
+        """폴러 초기화 (start()를 호출해야 백그라운드 갱신이 시작됨)"""
+        self.node_ids = list(node_ids or DEFAULT_NODE_IDS)
+        self.interval = interval
+        # 스냅샷이 이보다 오래되면 (폴러가 멈춘 경우 등) 요청 시점에 직접 조회
+        self.max_age = max_age if max_age is not None else interval * 3
+        self.fetcher = fetcher
+
+        self.snapshots = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._refresh_locks = {node_id: threading.Lock() for node_id in self.node_ids}
+
+    def start(self):
+        """백그라운드 갱신 스레드를 시작합니다."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="arrival-poller", daemon=True)
+        self._thread.start()
+        print(f"✅ 버스 도착 정보 폴러 시작: 정류장 {self.node_ids}, {self.interval}초 주기")
+
+    def stop(self):
+        """백그라운드 갱신 스레드를 멈춥니다."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        """정해진 주기마다 모든 정류장의 도착 정보를 갱신합니다."""
+        while not self._stop_event.is_set():
+            for node_id in self.node_ids:
+                self.refresh(node_id)
+            self._stop_event.wait(self.interval)
+
+    def refresh(self, node_id):
+        """정류장 하나의 도착 정보를 외부 API로 조회해 스냅샷을 교체합니다."""
+        lock = self._refresh_locks.setdefault(node_id, threading.Lock())
+        with lock:
+            # 다른 스레드가 방금 갱신했으면 다시 조회하지 않음
+            snapshot = self.snapshots.get(node_id)
+            if snapshot is not None and time.time() - snapshot.fetched_at < 1:
+                return snapshot
+
+            try:
+                arrivals = self.fetcher(node_id=node_id)
+            except Exception as e:
+                # 조회에 실패하면 이전 스냅샷을 그대로 유지
+                print(f"⚠️ 버스 도착 정보 갱신 실패 ({node_id}): {str(e)}")
+                return snapshot
+
+            snapshot = ArrivalSnapshot(arrivals, time.time())
+            self.snapshots[node_id] = snapshot
+            return snapshot
+
+    def get(self, node_id=None):
+        """
+        정류장의 최신 스냅샷을 반환합니다. 스냅샷이 없거나 너무 오래되었으면 직접 조회합니다.
+        요청 처리 시간이 부족하면 직접 조회하지 않고 (오래된) 스냅샷을 그대로 반환합니다.
+        """
+        node_id = node_id or bus_arrive_time.KIOSK_NODE_ID
+        snapshot = self.snapshots.get(node_id)
+        if snapshot is None or time.time() - snapshot.fetched_at > self.max_age:
+            if has_budget():
+                snapshot = self.refresh(node_id) or snapshot
+            else:
+                skip_stage("arrival.live")
+        return snapshot or ArrivalSnapshot([], None)
+
+    @staticmethod
+    def age_seconds(snapshot):
+        """스냅샷이 조회된 지 몇 초 지났는지 반환합니다. (조회 기록이 없으면 None)"""
+        if snapshot is None or snapshot.fetched_at is None:
+            return None
+        return int(time.time() - snapshot.fetched_at)
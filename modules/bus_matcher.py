@@ -1,37 +1,72 @@
 # 버스 노선 정보 관리 모듈
-import external_apis.kakao_places as kakao_places  # 기존 모듈 재사용
 import external_apis.nearby_busstop_match as nearby_busstop_match  # 기존 모듈 재사용
 import external_apis.bus_arrive_time as bus_arrive_time  # 기존 모듈 재사용
+from modules.deadline import has_budget, skip_stage
+from modules.reachability import ReachabilityIndex
 
 class BusRouteManager:
     """버스 노선 정보를 관리하는 클래스"""
     
-    def __init__(self, path_finder):
-        """BusRouteManager 초기화"""
+    def __init__(self, path_finder, catalog=None, arrival_poller=None):
+        """BusRouteManager 초기화 (catalog가 있으면 주변 정류장과 버스 번호를 메모리에서 조회, arrival_poller가 있으면 도착 정보 스냅샷 사용)"""
         self.path_finder = path_finder
+        self.catalog = catalog
+        self.arrival_poller = arrival_poller
+    
+    def get_arrival_info(self):
+        """
+        키오스크 정류장 도착 정보와 조회된 지 몇 초 지났는지를 (도착 정보, 경과 초)로 반환합니다.
+        폴러가 있으면 공유 스냅샷을 사용하며, 조회 기록이 없으면 경과 초는 None입니다.
+        (여러 요청이 같은 인스턴스를 함께 쓰므로 경과 초를 인스턴스에 저장하지 않음)
+        """
+        if self.arrival_poller is None:
+            if not has_budget():
+                # 처리 시간이 부족하면 도착 정보 없이 버스 번호만 안내
+                skip_stage("arrival.live")
+                return [], None
+            return bus_arrive_time.get_bus_arrival_info(), 0
+        snapshot = self.arrival_poller.get()
+        return snapshot.arrivals, self.arrival_poller.age_seconds(snapshot)
+    
+    def get_reachable_buses(self, station_ids):
+        """키오스크 정류장에서 출발해 노선 방향대로 station_ids에 도착하는 {버스 번호: 이동 정류장 수}를 반환합니다."""
+        reachability = self.catalog.get_derived(
+            "reachability",
+            lambda rows: ReachabilityIndex(rows, [bus_arrive_time.KIOSK_NODE_ID])
+        )
+        return reachability.lookup(station_ids)
     
     def match_buses(self, destination):
-        """목적지 주변의 버스 정류장 및 버스 정보를 찾습니다."""
+        """목적지 주변의 버스 정류장 및 버스 정보를 찾습니다. (버스 번호, 도착 정보, 버스별 이동 정류장 수, 도착 정보 경과 초)를 반환합니다."""
         try:
-            _, x, y = kakao_places.search_keyword_top1(destination)
-            nearby_bus_info = nearby_busstop_match.get_nearby_bus_info(y, x)
+            # 길찾기로 넘어가더라도 같은 요청 안에서는 이 조회 결과를 재사용
+            place = self.path_finder.resolver.resolve(destination)
+            x, y = place.x, place.y
+            nearby_bus_info = nearby_busstop_match.get_nearby_bus_info(y, x, catalog=self.catalog)
             
             # 주변 정류장이 없을 경우 처리
             if nearby_bus_info.get("status") == "주변_정류장_없음":
                 print("🚫 주변 정류장이 없습니다. 길찾기 수행.")
-                return [], []  # 항상 두 개의 값 반환
+                return [], [], {}, None  # 항상 네 개의 값 반환
             
             match_bus_numbers = []
+            stops_to_ride = {}
             
-            # 정류장 리스트를 순회하면서 버스 번호 추출
-            for station in nearby_bus_info.get("bus_stations", []):
-                bus_numbers = station.get("bus_numbers", [])
-                if isinstance(bus_numbers, list):
-                    match_bus_numbers.extend(bus_numbers)
-            
-            match_bus_numbers = [str(num) for num in match_bus_numbers]
+            if self.catalog is not None and self.catalog.is_loaded():
+                # 키오스크 정류장을 지나 목적지 주변 정류장에 (같은 노선 진행 방향으로) 도착하는 버스만 선택
+                station_ids = [station["station_id"] for station in nearby_bus_info.get("bus_stations", [])]
+                stops_to_ride = {str(bus): hops for bus, hops in self.get_reachable_buses(station_ids).items()}
+                match_bus_numbers = sorted(stops_to_ride, key=lambda bus: (stops_to_ride[bus], bus))
+            else:
+                # 정류장 리스트를 순회하면서 버스 번호 추출
+                for station in nearby_bus_info.get("bus_stations", []):
+                    bus_numbers = station.get("bus_numbers", [])
+                    if isinstance(bus_numbers, list):
+                        match_bus_numbers.extend(bus_numbers)
+                
+                match_bus_numbers = [str(num) for num in match_bus_numbers]
             
-            arrival_info = bus_arrive_time.get_bus_arrival_info()
+            arrival_info, arrival_age = self.get_arrival_info()
             
             # 두 리스트를 비교하여 일치하는 버스만 필터링
             matching_arrivals = []
@@ -48,40 +83,55 @@ class BusRouteManager:
                         "도착예정시간": f"{arrival_time}분 후",
                         "도착시간(분)": arrival_time
                     }
+                    if bus_number in stops_to_ride:
+                        bus_arrival_info["이동정류장수"] = stops_to_ride[bus_number]
                     matching_arrivals.append(bus_arrival_info)
             
             matching_arrivals.sort(key=lambda x: x["도착시간(분)"])
             
-            return match_bus_numbers, matching_arrivals
+            return match_bus_numbers, matching_arrivals, stops_to_ride, arrival_age
         
         except Exception as e:
             print(f"❌ 버스 매칭 중 오류 발생: {str(e)}")
-            return [], []
+            return [], [], {}, None
     
     def process_bus_route(self, destination):
         """버스 노선 정보를 처리합니다."""
         try:
             print(f"🚌 '버스 노선' 의도 처리 시작")
-            match_bus_numbers, matching_arrivals = self.match_buses(destination)
+            match_bus_numbers, matching_arrivals, stops_to_ride, arrival_age = self.match_buses(destination)
             
             if matching_arrivals:
                 result = {
                     "status": "버스_도착정보_있음",
                     "match_buses": match_bus_numbers,
-                    "arrival_info": matching_arrivals
+                    "arrival_info": matching_arrivals,
+                    "stops_to_ride": stops_to_ride,
+                    "arrival_age_seconds": arrival_age
                 }
                 return result
             elif match_bus_numbers:
                 result = {
                     "status": "버스_도착정보_없음",
-                    "match_buses": match_bus_numbers
+                    "match_buses": match_bus_numbers,
+                    "stops_to_ride": stops_to_ride
+                }
+                return result
+            elif not has_budget():
+                # 처리 시간이 부족하면 대체 길찾기(SK API 등)를 건너뜀
+                skip_stage("path.fallback")
+                result = {
+                    "status": "길찾기_수행",
+                    "route": None,
+                    "place_name": destination
                 }
                 return result
             else:
-                route, place_name = self.path_finder.find_path(destination)
+                route, place = self.path_finder.find_path(destination)
                 result = {
                     "status": "길찾기_수행",
                     "route": route,
+                    "place": place,
                     "place_name": destination
                 }
                 return result
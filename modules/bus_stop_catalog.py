@@ -0,0 +1,96 @@
+# 버스 정류장 카탈로그 모듈 (bus_stops 테이블 메모리 캐시)
+import threading
+import time
+from collections import namedtuple
+
+import external_apis.nearby_busstop_match as nearby_busstop_match
+from modules.stop_index import BusStopIndex
+
+# bus_stops 테이블의 한 행
+BusStopRow = namedtuple(
+    "BusStopRow",
+    ["bus_number", "route_id", "node_id", "node_name", "latitude", "longitude", "node_order"],
+)
+
+# 테이블 변경 여부를 확인하는 주기(초)
+DEFAULT_REFRESH_INTERVAL = 60
+
+
+class BusStopCatalog:
+    """bus_stops 테이블을 메모리에 올려 정류장 → 버스 번호 조회와 공간 색인을 제공하는 클래스"""
+
+    def __init__(self, refresh_interval=DEFAULT_REFRESH_INTERVAL,
+                 row_loader=nearby_busstop_match.get_all_bus_stop_rows,
+                 signature_loader=nearby_busstop_match.get_bus_stops_signature):
+        """카탈로그 초기화 (load()를 호출해야 데이터가 채워짐)"""
+        self.refresh_interval = refresh_interval
+        self.row_loader = row_loader
+        self.signature_loader = signature_loader
+
+        self.rows = []
+        self.node_buses = {}
+        self.stop_index = None
+        self.signature = None
+        self.version = 0
+        self._derived = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_loaded(self):
+        """데이터가 한 번이라도 로드되었는지 확인하고, 주기가 지났으면 변경 여부를 확인합니다."""
+        self.refresh_if_changed()
+        return self.stop_index is not None
+
+    def load(self):
+        """테이블 전체를 읽어 정류장 → 버스 번호 맵과 공간 색인을 새로 만듭니다."""
+        signature = self.signature_loader()
+        rows = [BusStopRow(*row) for row in self.row_loader()]
+
+        node_buses = {}
+        for row in rows:
+            buses = node_buses.setdefault(row.node_id, [])
+            if row.bus_number not in buses:
+                buses.append(row.bus_number)
+
+        stop_index = BusStopIndex((row.node_id, row.node_name, row.latitude, row.longitude) for row in rows)
+
+        # 요청 처리 중인 스레드가 중간 상태를 보지 않도록 한 번에 교체
+        self.rows, self.node_buses, self.stop_index = rows, node_buses, stop_index
+        self.signature = signature
+        self.version += 1
+        self._checked_at = time.time()
+        print(f"✅ 정류장 카탈로그 로드 완료: 행 {len(rows)}개, 정류장 {len(stop_index)}개 (버전 {self.version})")
+
+    def refresh_if_changed(self):
+        """주기마다 테이블 체크섬을 확인하고, 바뀌었으면 다시 로드합니다."""
+        if time.time() - self._checked_at < self.refresh_interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # 다른 스레드가 이미 확인 중
+
+        try:
+            self._checked_at = time.time()
+            signature = self.signature_loader()
+            if signature != self.signature:
+                print("🔄 bus_stops 테이블 변경 감지, 카탈로그를 다시 로드합니다.")
+                self.load()
+        except Exception as e:
+            # 확인에 실패하면 기존 데이터를 계속 사용
+            print(f"⚠️ 정류장 카탈로그 갱신 확인 실패: {str(e)}")
+        finally:
+            self._lock.release()
+
+    def get_derived(self, key, builder):
+        """카탈로그 버전마다 한 번만 만드는 파생 데이터(경로 그래프 등)를 반환합니다. builder는 행 목록을 받습니다."""
+        self.refresh_if_changed()
+        version, rows = self.version, self.rows
+        cached = self._derived.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, builder(rows))
+            self._derived[key] = cached
+        return cached[1]
+
+    def get_bus_numbers(self, node_ids):
+        """정류장 ID 목록에 대해 {정류장 ID: [버스 번호 리스트]}를 반환합니다."""
+        node_buses = self.node_buses
+        return {node_id: list(node_buses.get(node_id, [])) for node_id in node_ids}
@@ -1,21 +1,211 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
 from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain_core.chat_history import BaseChatMessageHistory
+from pydantic import PrivateAttr
+
+from modules.history_backend import WriteBehindWriter, serialize_messages
+
+# 🔹 세션 저장소 한도 (환경 변수로 조정 가능)
+SESSION_IDLE_SECONDS = float(os.getenv("CHAT_SESSION_IDLE_SECONDS", "600"))  # 이 시간 동안 대화가 없으면 기록 초기화
+MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "1000"))                   # 동시에 보관할 최대 세션 수
+MAX_MESSAGES = int(os.getenv("CHAT_SESSION_MAX_MESSAGES", "20"))             # 세션별로 보관할 최근 메시지 수
+
+
+def turn_trim_index(messages, max_messages):
+    """
+    최근 max_messages개 이하만 남길 때 잘라낼 앞부분의 길이를 반환합니다.
+    질문/답변 쌍이 갈라지지 않도록 남는 메시지가 사람 메시지로 시작하게 합니다.
+    """
+    overflow = len(messages) - max_messages
+    start = max(overflow, 0)
+    while start < len(messages) and messages[start].type != "human":
+        start += 1
+    if start == len(messages):
+        # 사람 메시지가 하나도 남지 않으면 개수 기준으로만 자름
+        start = max(overflow, 0)
+    return start
+
+
+class BoundedChatMessageHistory(ChatMessageHistory):
+    """최근 max_messages개의 메시지만 (질문/답변 쌍 단위로) 보관하는 대화 기록"""
+
+    max_messages: int = MAX_MESSAGES
+    # 메시지가 추가될 때 호출 (공유 저장소에 쓰기 예약)
+    _on_add = PrivateAttr(default=None)
+
+    def add_message(self, message):
+        """메시지를 추가하고, 한도를 넘은 오래된 메시지를 버립니다."""
+        self.add_messages([message])
+
+    def add_messages(self, messages):
+        """여러 메시지를 추가하고, 한도를 넘은 오래된 메시지를 버립니다."""
+        messages = list(messages)
+        self.messages.extend(messages)
+        self._trim()
+        if self._on_add is not None:
+            self._on_add(messages)
+
+    def _trim(self):
+        """오래된 메시지부터 한도까지 잘라냅니다."""
+        if len(self.messages) > self.max_messages:
+            del self.messages[:turn_trim_index(self.messages, self.max_messages)]
+
 
 class ChatHistoryManager:
-    """대화 기록을 관리하는 클래스"""
-    
-    def __init__(self):
-        """채팅 기록 저장소 초기화"""
-        self.store = {}
-    
+    """대화 기록을 관리하는 클래스 (오래 쉰 세션과 오래된 세션은 자동으로 정리)"""
+
+    def __init__(self, idle_seconds=SESSION_IDLE_SECONDS, max_sessions=MAX_SESSIONS,
+                 max_messages=MAX_MESSAGES, on_evict=None, backend=None):
+        """
+        채팅 기록 저장소 초기화 (on_evict는 세션이 정리될 때 세션 ID로 호출됨)
+        
+        backend가 있으면 여러 워커가 공유하는 저장소에서 기록을 읽고, 쓰기는 모아서 백그라운드로 저장합니다.
+        """
+        # 최근에 사용한 세션이 뒤쪽에 오도록 유지 (LRU)
+        self.store = OrderedDict()
+        self.last_used = {}
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.on_evict = on_evict
+        self.evicted = {"idle": 0, "lru": 0}
+        self.backend = backend
+        self.writer = WriteBehindWriter(backend) if backend is not None else None
+        # 여러 요청이 동시에 같은 저장소에 접근하므로 잠금으로 보호
+        self._lock = threading.Lock()
+
+    def _expire_idle_locked(self, now):
+        """오래 쉰 세션을 앞쪽(가장 오래 쓰지 않은 세션)부터 정리합니다. 잠금을 잡은 상태에서 호출합니다."""
+        expired = []
+        while self.store:
+            session_id = next(iter(self.store))
+            if now - self.last_used[session_id] <= self.idle_seconds:
+                break
+            self.store.popitem(last=False)
+            del self.last_used[session_id]
+            self.evicted["idle"] += 1
+            expired.append(session_id)
+        return expired
+
+    def _notify_evicted(self, session_ids):
+        """정리된 세션을 알립니다."""
+        if self.on_evict is None:
+            return
+        for session_id in session_ids:
+            self.on_evict(session_id)
+
+    def _use_locked(self, session_id, history, now):
+        """세션을 가장 최근에 사용한 세션으로 기록하고, 한도를 넘은 세션을 정리합니다. 잠금을 잡은 상태에서 호출합니다."""
+        evicted = self._expire_idle_locked(now)
+        if history is None:
+            history = self.store.get(session_id) or BoundedChatMessageHistory(max_messages=self.max_messages)
+        self.store[session_id] = history
+        self.store.move_to_end(session_id)
+        self.last_used[session_id] = now
+
+        # 세션 수가 한도를 넘으면 가장 오래 쓰지 않은 세션부터 정리
+        while len(self.store) > self.max_sessions:
+            old_session_id, _ = self.store.popitem(last=False)
+            del self.last_used[old_session_id]
+            self.evicted["lru"] += 1
+            evicted.append(old_session_id)
+        return history, evicted
+
     def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
-        """세션 ID에 해당하는 대화 기록을 반환하거나 새로 생성합니다."""
-        if session_id not in self.store:
-            self.store[session_id] = ChatMessageHistory()
-        return self.store[session_id]
-    
+        """세션 ID에 해당하는 대화 기록을 반환하거나 새로 생성합니다. (오래 쉰 세션은 새 기록으로 시작)"""
+        now = time.time()
+        # 공유 저장소를 쓰면 다른 워커가 추가한 메시지도 보이도록 매번 새로 읽음 (DB 조회는 잠금 밖에서)
+        loaded = self._load_history(session_id) if self.backend is not None else None
+        with self._lock:
+            history, evicted = self._use_locked(session_id, loaded, now)
+
+        self._notify_evicted(evicted)
+        return history
+
+    def _load_history(self, session_id):
+        """공유 저장소에 저장된 최근 메시지로 대화 기록을 만들고, 이후 추가되는 메시지는 저장을 예약합니다."""
+        # 이 워커에서 아직 저장하지 않은 메시지 추가/삭제가 있으면 먼저 저장 (사용 시각 갱신만 남았으면 바로 읽음)
+        if self.writer.has_pending(session_id):
+            self.writer.flush()
+        # 저장소는 개수 기준으로 잘라 두므로 답변으로 시작하면 앞의 답변을 버림
+        messages = self.backend.load(session_id, self.idle_seconds)
+        history = BoundedChatMessageHistory(
+            max_messages=self.max_messages, messages=messages[turn_trim_index(messages, self.max_messages):]
+        )
+        history._on_add = lambda messages: self.writer.enqueue("append", session_id, serialize_messages(messages))
+        self.writer.enqueue("touch", session_id)
+        return history
+
+    def touch(self, session_id: str):
+        """세션의 마지막 사용 시각을 갱신합니다. (공유 저장소의 기록은 읽지 않고 사용 시각만 저장 예약)"""
+        with self._lock:
+            _, evicted = self._use_locked(session_id, None, time.time())
+        if self.writer is not None:
+            self.writer.enqueue("touch", session_id)
+        self._notify_evicted(evicted)
+
+    def expire_idle(self):
+        """오래 쉰 세션을 정리하고, 정리된 세션 ID 목록을 반환합니다."""
+        with self._lock:
+            expired = self._expire_idle_locked(time.time())
+        if self.backend is not None:
+            self.writer.flush()
+            expired = sorted(set(expired) | set(self.backend.expire(self.idle_seconds)))
+        self._notify_evicted(expired)
+        if expired:
+            print(f"🔄 대화가 없던 세션 {len(expired)}개의 기록이 초기화되었습니다.")
+        return expired
+
     def reset_session(self, session_id: str):
         """특정 세션의 대화 기록을 초기화합니다."""
-        if session_id in self.store:
-            del self.store[session_id]
-            print("🔄 대화 기록이 초기화되었습니다.")
\ No newline at end of file
+        with self._lock:
+            removed = self.store.pop(session_id, None)
+            self.last_used.pop(session_id, None)
+        if self.writer is not None:
+            self.writer.enqueue("delete", session_id)
+        if removed is not None:
+            print("🔄 대화 기록이 초기화되었습니다.")
+
+    def active_session_ids(self):
+        """최근 CHAT_SESSION_IDLE_SECONDS 안에 사용된 세션 ID 목록을 반환합니다. (공유 저장소가 있으면 모든 워커 기준)"""
+        if self.backend is not None:
+            self.writer.flush()
+            return self.backend.active_sessions(self.idle_seconds)
+        now = time.time()
+        with self._lock:
+            return [session_id for session_id, used in self.last_used.items() if now - used <= self.idle_seconds]
+
+    def close(self):
+        """남은 대화 기록을 저장하고 공유 저장소 연결을 닫습니다."""
+        if self.writer is not None:
+            self.writer.close()
+            self.backend.close()
+
+    def stats(self):
+        """세션 수, 메시지 수, 대략적인 메모리 사용량(메시지 글자 수 기준)과 정리 횟수를 반환합니다."""
+        with self._lock:
+            histories = list(self.store.values())
+            evicted = dict(self.evicted)
+
+        message_count = 0
+        content_bytes = 0
+        for history in histories:
+            messages = list(history.messages)
+            message_count += len(messages)
+            content_bytes += sum(len(str(message.content).encode("utf-8")) for message in messages)
+
+        return {
+            "sessions": len(histories),
+            "messages": message_count,
+            "content_bytes": content_bytes,
+            "max_sessions": self.max_sessions,
+            "idle_seconds": self.idle_seconds,
+            "evicted_idle": evicted["idle"],
+            "evicted_lru": evicted["lru"],
+            "backend": type(self.backend).__name__ if self.backend is not None else "memory",
+            "writer": self.writer.stats() if self.writer is not None else None,
+        }
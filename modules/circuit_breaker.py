@@ -0,0 +1,5 @@
+# 외부 서비스 장애 차단(circuit breaker) 모듈 (external_apis와 함께 쓰도록 common.circuit_breaker로 옮기고 기존 경로 유지)
+from common.circuit_breaker import (
+    CLOSED, FAILURE_THRESHOLD, HALF_OPEN, OPEN, RECOVERY_SECONDS,
+    CircuitBreaker, CircuitOpenError, get_breaker, snapshot_breakers,
+)
@@ -1,17 +1,44 @@
 # config.py (환경 설정 파일)
+import os
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_pinecone import PineconeVectorStore
 from dotenv import load_dotenv
+from modules.circuit_breaker import get_breaker
+from modules.embedding_cache import with_embedding_cache
+from modules.local_vector_store import LocalVectorStore, LOCAL_INDEX_DIR
 
 # 환경 변수 로드
 load_dotenv()
 
 # 🔹 LLM 인스턴스 (오픈AI 모델 사용)
-LLM = ChatOpenAI(model="gpt-4o")
+# 응답이 멈춘 호출이 단계 실행 슬롯을 오래 붙잡지 않도록 호출마다 최대 대기 시간을 둠
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+LLM = ChatOpenAI(model="gpt-4o", timeout=LLM_TIMEOUT_SECONDS, max_retries=1)
 
-# 🔹 임베딩 모델 (오픈AI 임베딩 사용)
-EMBEDDING = OpenAIEmbeddings(model="text-embedding-3-large")
+# 🔹 의도 감지용 LLM (요청 deadline 안에서 남은 시간을 timeout으로 전달하므로 재시도하지 않음)
+# (재시도하면 시도마다 timeout이 적용되어 남은 시간의 두 배까지 기다릴 수 있음)
+INTENT_LLM = ChatOpenAI(model="gpt-4o", timeout=LLM_TIMEOUT_SECONDS, max_retries=0)
 
-# 🔹 Pinecone 벡터 DB 인덱스
+# 🔹 LLM 장애 차단기 (열려 있으면 LLM을 호출하지 않고 로컬 분류/준비된 답변 사용)
+LLM_BREAKER = get_breaker("openai")
+
+# 🔹 임베딩 모델 (오픈AI 임베딩 사용, 같은 문장은 디스크 캐시에서 읽음)
+EMBEDDING_MODEL = "text-embedding-3-large"
+# (답변 캐시 조회와 공지 검색에서 질문마다 호출하므로 LLM보다 짧은 대기 시간 적용)
+EMBEDDING_TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_TIMEOUT_SECONDS", "5"))
+RAW_EMBEDDING = OpenAIEmbeddings(model=EMBEDDING_MODEL, timeout=EMBEDDING_TIMEOUT_SECONDS, max_retries=1)
+EMBEDDING = with_embedding_cache(RAW_EMBEDDING, EMBEDDING_MODEL)
+
+# 🔹 공지 벡터 DB (VECTOR_BACKEND=pinecone: Pinecone 인덱스, local: 디스크에 저장한 로컬 인덱스)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
 INDEX_NAME = "hj-goheung-notice"
-DATABASE = PineconeVectorStore.from_existing_index(index_name=INDEX_NAME, embedding=EMBEDDING)
+
+
+def load_vector_store(backend=VECTOR_BACKEND, embedding=EMBEDDING):
+    """설정에 맞는 공지 벡터 DB를 생성합니다. (공지 적재처럼 캐시가 필요 없는 작업은 embedding=RAW_EMBEDDING)"""
+    if backend == "local":
+        return LocalVectorStore.load(LOCAL_INDEX_DIR, embedding)
+    from langchain_pinecone import PineconeVectorStore
+    return PineconeVectorStore.from_existing_index(index_name=INDEX_NAME, embedding=embedding)
+
+
+DATABASE = load_vector_store()
@@ -0,0 +1,5 @@
+# 요청 단위 처리 시간 예산(deadline) 모듈 (external_apis와 함께 쓰도록 common.deadline으로 옮기고 기존 경로 유지)
+from common.deadline import (
+    DEFAULT_BUDGET_SECONDS, MIN_STAGE_SECONDS,
+    Deadline, current_deadline, deadline_scope, has_budget, remaining_time, skip_stage,
+)
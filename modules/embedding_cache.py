@@ -0,0 +1,202 @@
+# 임베딩 캐시 모듈 (같은 문장의 임베딩은 API 대신 디스크 캐시에서 읽음)
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# 🔹 임베딩 캐시 설정 (환경 변수로 조정 가능)
+CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "cache/embeddings")
+MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "5000"))  # 3072차원 기준 약 60MB
+
+
+def normalize_text(text):
+    """유니코드 형태와 공백을 정리해 캐시 키로 쓸 문자열을 만듭니다."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingStore:
+    """
+    임베딩을 고정 크기 float32 memmap 파일에 저장하고, 위치(slot)는 SQLite 색인으로 찾는 저장소
+
+    가득 차면 가장 먼저 저장한 slot부터 덮어씁니다. 여러 워커 프로세스가 같은 파일을 함께 사용할 수 있으며,
+    slot마다 키 해시를 같이 기록해 다른 프로세스가 덮어쓴 slot을 잘못 읽지 않도록 확인합니다.
+    """
+
+    def __init__(self, directory, max_entries=MAX_ENTRIES):
+        """색인을 열고, 벡터 파일은 차원을 알게 되면(첫 저장 시) 엽니다."""
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS slots (key TEXT PRIMARY KEY, slot INTEGER NOT NULL UNIQUE)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.vectors = None
+        self.key_hashes = None
+        dim = self._meta("dim")
+        if dim is not None:
+            self._open_arrays(dim)
+
+    def _meta(self, name):
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _open_arrays(self, dim):
+        """벡터 파일과 slot별 키 해시 파일을 memmap으로 엽니다. (없으면 최대 크기로 생성)"""
+        vector_path = os.path.join(self.directory, "vectors.f32")
+        hash_path = os.path.join(self.directory, "keys.u64")
+        vector_mode = "r+" if os.path.exists(vector_path) else "w+"
+        hash_mode = "r+" if os.path.exists(hash_path) else "w+"
+        self.vectors = np.memmap(vector_path, dtype=np.float32, mode=vector_mode, shape=(self.max_entries, dim))
+        self.key_hashes = np.memmap(hash_path, dtype=np.uint64, mode=hash_mode, shape=(self.max_entries,))
+
+    @staticmethod
+    def _key_hash(key):
+        return np.uint64(int(key[:16], 16))
+
+    def get_many(self, keys):
+        """키 목록에 해당하는 벡터를 반환합니다. (없는 키는 None)"""
+        results = [None] * len(keys)
+        with self._lock:
+            if self.vectors is None:
+                # 다른 워커가 먼저 벡터 파일을 만들었을 수 있음
+                dim = self._meta("dim")
+                if dim is None:
+                    return results
+                self._open_arrays(dim)
+            for i, key in enumerate(keys):
+                row = self._conn.execute("SELECT slot FROM slots WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    continue
+                slot = row[0]
+                vector = np.array(self.vectors[slot])
+                # 읽는 사이 다른 프로세스가 slot을 덮어썼으면 없는 것으로 처리
+                if self.key_hashes[slot] == self._key_hash(key):
+                    results[i] = vector
+        return results
+
+    def put_many(self, items):
+        """(키, 벡터) 목록을 저장합니다."""
+        if not items:
+            return
+        with self._lock, self._conn:
+            # 여러 프로세스가 동시에 slot을 배정하지 않도록 쓰기 잠금을 먼저 잡음
+            self._conn.execute("BEGIN IMMEDIATE")
+            if self.vectors is None:
+                dim = self._meta("dim") or len(items[0][1])
+                self._conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('dim', ?)", (dim,))
+                self._open_arrays(dim)
+            next_slot = self._meta("next_slot") or 0
+            for key, vector in items:
+                if self._conn.execute("SELECT 1 FROM slots WHERE key = ?", (key,)).fetchone():
+                    continue
+                slot = next_slot % self.max_entries
+                next_slot += 1
+                self._conn.execute("DELETE FROM slots WHERE slot = ?", (slot,))
+                self.key_hashes[slot] = self._key_hash(key)
+                self.vectors[slot] = vector
+                self._conn.execute("INSERT INTO slots (key, slot) VALUES (?, ?)", (key, slot))
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('next_slot', ?)", (next_slot,))
+            # 색인이 커밋되기 전에 벡터가 파일에 반영되도록 함
+            self.vectors.flush()
+            self.key_hashes.flush()
+
+    def count(self):
+        """저장된 임베딩 수를 반환합니다."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM slots").fetchone()[0]
+
+    def close(self):
+        """색인 연결을 닫고 벡터 파일을 디스크에 반영합니다."""
+        with self._lock:
+            if self.vectors is not None:
+                self.vectors.flush()
+                self.key_hashes.flush()
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 모델 앞에 디스크 캐시를 두는 래퍼 (캐시에 없는 문장만 API로 임베딩)"""
+
+    def __init__(self, embeddings, model_name, store=None):
+        """임베딩 캐시 초기화 (store가 없으면 EMBEDDING_CACHE_DIR/모델명 에 저장)"""
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.store = store or EmbeddingStore(os.path.join(CACHE_DIR, model_name))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, text):
+        """모델명과 정규화된 문장으로 캐시 키를 만듭니다."""
+        return hashlib.sha256(f"{self.model_name}\n{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts):
+        """여러 문장을 임베딩합니다. 캐시에 없는 문장만 한 번에 API로 요청합니다."""
+        keys = [self._key(text) for text in texts]
+        vectors = self.store.get_many(keys)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            items = []
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+                items.append((keys[i], np.asarray(vector, dtype=np.float32)))
+            try:
+                self.store.put_many(items)
+            except Exception as e:
+                # 캐시 저장에 실패해도 임베딩 결과는 그대로 사용
+                print(f"⚠️ 임베딩 캐시 저장 실패: {str(e)}")
+        return [vector.tolist() if isinstance(vector, np.ndarray) else list(vector) for vector in vectors]
+
+    def embed_query(self, text):
+        """질문 하나를 임베딩합니다. (캐시에 있으면 API를 호출하지 않음)"""
+        key = self._key(text)
+        cached = self.store.get_many([key])[0]
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached.tolist()
+
+        with self._lock:
+            self.misses += 1
+        vector = self.embeddings.embed_query(text)
+        try:
+            self.store.put_many([(key, np.asarray(vector, dtype=np.float32))])
+        except Exception as e:
+            print(f"⚠️ 임베딩 캐시 저장 실패: {str(e)}")
+        return vector
+
+    def stats(self):
+        """캐시 적중/실패 수와 저장된 임베딩 수를 반환합니다."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "model": self.model_name,
+            "entries": self.store.count(),
+            "max_entries": self.store.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        }
+
+
+def with_embedding_cache(embeddings, model_name):
+    """임베딩 모델에 디스크 캐시를 붙여 반환합니다. (USE_EMBEDDING_CACHE=false거나 캐시를 열 수 없으면 그대로 반환)"""
+    if os.getenv("USE_EMBEDDING_CACHE", "true").lower() != "true":
+        return embeddings
+    try:
+        return CachedEmbeddings(embeddings, model_name)
+    except Exception as e:
+        print(f"⚠️ 임베딩 캐시를 열 수 없어 API를 직접 사용합니다: {str(e)}")
+        return embeddings
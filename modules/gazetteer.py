@@ -0,0 +1,199 @@
+# 장소 검색 결과 영구 캐시 모듈 (SQLite gazetteer)
+import difflib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import external_apis.kakao_places as kakao_places  # 기존 모듈 재사용
+
+# 🔹 캐시 유효 기간 (초)
+PLACE_TTL = int(os.getenv("GAZETTEER_TTL", str(30 * 24 * 60 * 60)))          # 검색 결과: 30일
+NEGATIVE_TTL = int(os.getenv("GAZETTEER_NEGATIVE_TTL", str(24 * 60 * 60)))   # 검색 결과 없음: 1일
+FUZZY_CUTOFF = float(os.getenv("GAZETTEER_FUZZY_CUTOFF", "0.85"))          # 유사 이름 매칭 기준 (0~1)
+
+NON_WORD_PATTERN = re.compile(r"[^\w]", re.UNICODE)
+
+
+def normalize_place_query(query):
+    """대소문자, 공백, 문장 부호를 정리해 검색어 키를 만듭니다."""
+    return NON_WORD_PATTERN.sub("", unicodedata.normalize("NFC", query).lower())
+
+
+class PlaceGazetteer:
+    """카카오 키워드 검색 결과와 정류장 이름을 SQLite에 저장해 같은 검색을 다시 보내지 않는 클래스"""
+
+    def __init__(self, path=os.getenv("GAZETTEER_PATH", "cache/gazetteer.sqlite3"),
+                 ttl=PLACE_TTL, negative_ttl=NEGATIVE_TTL, fuzzy_cutoff=FUZZY_CUTOFF,
+                 searcher=kakao_places.search_keyword):
+        """gazetteer 초기화 (searcher는 (query, size, sort)를 받아 [(place_name, x, y)]를 반환하고, 실패 시 예외 발생)"""
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.searcher = searcher
+        self.stats_counter = {"hits": 0, "negative_hits": 0, "place_hits": 0, "fuzzy_hits": 0, "misses": 0, "errors": 0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            # queries: 검색어별 API 결과 (results가 빈 리스트면 검색 결과 없음)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                " kind TEXT NOT NULL, query_key TEXT NOT NULL, query TEXT NOT NULL,"
+                " results TEXT NOT NULL, fetched_at REAL NOT NULL,"
+                " PRIMARY KEY (kind, query_key))"
+            )
+            # places: 이름으로 바로 찾을 수 있는 장소 (정류장 이름, 검색으로 확인된 장소 이름)
+            # fetched_at은 검색으로 확인된 장소만 기록하며 ttl이 지나면 사용하지 않음 (정류장은 NULL)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS places ("
+                " name_key TEXT PRIMARY KEY, name TEXT NOT NULL, x TEXT NOT NULL, y TEXT NOT NULL,"
+                " source TEXT NOT NULL, fetched_at REAL)"
+            )
+
+            # 유사 이름 매칭은 메모리의 이름 목록으로 수행
+            self._place_keys = set(row[0] for row in self._conn.execute("SELECT name_key FROM places"))
+
+    def seed_from_rows(self, rows):
+        """bus_stops 행(BusStopRow) 목록의 정류장 이름과 좌표를 장소로 등록합니다. (이미 있는 정류장 이름은 유지)"""
+        places = {}
+        for row in rows:
+            key = normalize_place_query(row.node_name)
+            if key and key not in places:
+                places[key] = (key, row.node_name, str(row.longitude), str(row.latitude), "bus_stops")
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                # 검색으로 등록된 같은 이름은 만료될 수 있으므로 정류장 좌표로 교체
+                "INSERT INTO places (name_key, name, x, y, source) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(name_key) DO UPDATE SET name = excluded.name, x = excluded.x, y = excluded.y,"
+                " source = excluded.source, fetched_at = NULL WHERE places.source = 'kakao'",
+                places.values()
+            )
+            self._place_keys.update(places)
+        print(f"✅ 장소 gazetteer에 정류장 이름 {len(places)}개 등록")
+
+    def _count(self, name):
+        """적중 현황 카운터를 1 증가시킵니다. (여러 스레드에서 호출)"""
+        with self._lock:
+            self.stats_counter[name] += 1
+
+    def _get_query(self, kind, key, allow_stale=False):
+        """만료되지 않은 검색어 캐시를 반환합니다. 없으면 None을 반환합니다. (allow_stale이면 만료된 결과도 반환)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, fetched_at FROM queries WHERE kind = ? AND query_key = ?", (kind, key)
+            ).fetchone()
+        if row is None:
+            return None
+
+        results = [tuple(result) for result in json.loads(row[0])]
+        ttl = self.ttl if results else self.negative_ttl
+        if time.time() - row[1] > ttl and not allow_stale:
+            return None
+        return results
+
+    def _get_place(self, key):
+        """이름이 정확히 일치하는 장소를 반환합니다. (검색으로 확인된 장소는 ttl이 지나면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, x, y, fetched_at FROM places WHERE name_key = ?", (key,)
+            ).fetchone()
+        if row is None or (row[3] is not None and time.time() - row[3] > self.ttl):
+            return None
+        return tuple(row[:3])
+
+    def _fuzzy_place(self, key):
+        """이름이 비슷한 장소를 찾습니다. (오타, 띄어쓰기, 조사 차이 등)"""
+        with self._lock:
+            names = list(self._place_keys)
+        matches = difflib.get_close_matches(key, names, n=1, cutoff=self.fuzzy_cutoff)
+        return self._get_place(matches[0]) if matches else None
+
+    def _fetch(self, kind, query, key, size, sort=None):
+        """API로 검색해 결과를 저장합니다. 요청이 실패하면 저장하지 않고 None을 반환합니다."""
+        try:
+            results = self.searcher(query, size=size, sort=sort)
+        except Exception as e:
+            print(f"❌ 장소 검색 API 요청 실패: {str(e)}")
+            self._count("errors")
+            return None
+
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (kind, query_key, query, results, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, key, query, json.dumps(results, ensure_ascii=False), now)
+            )
+            # 검색으로 확인된 장소 이름도 등록해 다음 검색에 사용 (정류장 이름은 덮어쓰지 않음)
+            for place_name, x, y in results:
+                name_key = normalize_place_query(place_name or "")
+                if name_key and x is not None and y is not None:
+                    self._conn.execute(
+                        "INSERT INTO places (name_key, name, x, y, source, fetched_at) VALUES (?, ?, ?, ?, 'kakao', ?)"
+                        " ON CONFLICT(name_key) DO UPDATE SET name = excluded.name, x = excluded.x, y = excluded.y,"
+                        " fetched_at = excluded.fetched_at WHERE places.source = 'kakao'",
+                        (name_key, place_name, x, y, now)
+                    )
+                    self._place_keys.add(name_key)
+        return results
+
+    def search_top1(self, query):
+        """search_keyword_top1과 같은 형식으로 (place_name, x, y)를 반환합니다. 결과가 없으면 (None, None, None)입니다."""
+        key = normalize_place_query(query)
+        results = self._get_query("top1", key)
+        if results is not None:
+            self._count("hits" if results else "negative_hits")
+        else:
+            place = self._get_place(key)
+            if place is not None:
+                self._count("place_hits")
+                return place
+
+            self._count("misses")
+            results = self._fetch("top1", query, key, size=1)
+            if results is None:
+                # API 장애(차단기 열림 포함) 시 만료된 캐시라도 사용
+                results = self._get_query("top1", key, allow_stale=True)
+        if results:
+            return results[0]
+
+        # 정확한 이름도, 검색 결과도 없을 때만 비슷한 이름의 장소를 사용 (비슷한 이름이 다른 장소일 수 있음)
+        place = self._fuzzy_place(key)
+        if place is not None:
+            self._count("fuzzy_hits")
+            return place
+        return (None, None, None)
+
+    def search_top3(self, query):
+        """search_keyword_top3과 같은 형식으로 거리순 상위 3개의 [(place_name, x, y)]를 반환합니다."""
+        key = normalize_place_query(query)
+        results = self._get_query("top3", key)
+        if results is not None:
+            self._count("hits" if results else "negative_hits")
+            return results
+
+        self._count("misses")
+        results = self._fetch("top3", query, key, size=3, sort="distance")
+        if results is None:
+            # API 장애 시 만료된 캐시라도 사용
+            results = self._get_query("top3", key, allow_stale=True)
+        return results or []
+
+    def stats(self):
+        """캐시 적중 현황과 저장된 장소 수를 반환합니다."""
+        with self._lock:
+            stats = dict(self.stats_counter)
+            stats["places"] = len(self._place_keys)
+        return stats
+
+    def close(self):
+        """SQLite 연결을 닫습니다."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,278 @@
+# 대화 기록 공유 저장소 모듈 (여러 API 워커/노드가 같은 대화 기록을 사용)
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from langchain_core.messages import messages_from_dict, messages_to_dict
+
+# 🔹 저장소 선택과 쓰기 지연 설정 (환경 변수로 조정 가능)
+HISTORY_BACKEND = os.getenv("CHAT_HISTORY_BACKEND", "memory")  # memory | sqlite | mysql
+SQLITE_PATH = os.getenv("CHAT_HISTORY_SQLITE_PATH", "cache/chat_history.sqlite3")
+FLUSH_SECONDS = float(os.getenv("CHAT_HISTORY_FLUSH_SECONDS", "0.2"))  # 모아서 쓰는 주기
+MAX_BATCH = int(os.getenv("CHAT_HISTORY_MAX_BATCH", "200"))            # 한 번에 쓸 최대 작업 수
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS chat_sessions ("
+    " session_id VARCHAR(64) NOT NULL PRIMARY KEY, last_used DOUBLE NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS chat_messages ("
+    " id {autoincrement}, session_id VARCHAR(64) NOT NULL,"
+    " message TEXT NOT NULL, created_at DOUBLE NOT NULL)",
+)
+
+
+class SQLHistoryBackend:
+    """chat_sessions / chat_messages 테이블에 대화 기록을 저장하는 공통 구현"""
+
+    # 하위 클래스에서 DB 방언에 맞게 지정
+    placeholder = "?"
+    autoincrement = "INTEGER PRIMARY KEY AUTOINCREMENT"
+    upsert_session = ""
+
+    def __init__(self, max_messages):
+        """저장소 초기화 (세션별로 최근 max_messages개만 보관)"""
+        self.max_messages = max_messages
+
+    def _transaction(self, work):
+        """work(cursor)를 하나의 트랜잭션으로 실행하고 결과를 반환합니다."""
+        raise NotImplementedError
+
+    def _sql(self, query):
+        """? 자리 표시자를 DB 방언에 맞게 바꿉니다."""
+        return query.replace("?", self.placeholder)
+
+    def ensure_schema(self):
+        """테이블이 없으면 생성합니다."""
+        def work(cursor):
+            for statement in SCHEMA:
+                cursor.execute(statement.format(autoincrement=self.autoincrement))
+        self._transaction(work)
+
+    def apply(self, operations):
+        """쓰기 작업 묶음을 한 트랜잭션으로 반영합니다. 작업: ("append", 세션, [메시지]) / ("touch", 세션) / ("delete", 세션)"""
+        def work(cursor):
+            appended = set()
+            for operation, session_id, payload, at in operations:
+                if operation == "delete":
+                    cursor.execute(self._sql("DELETE FROM chat_messages WHERE session_id = ?"), (session_id,))
+                    cursor.execute(self._sql("DELETE FROM chat_sessions WHERE session_id = ?"), (session_id,))
+                    appended.discard(session_id)
+                    continue
+                if operation == "append":
+                    cursor.executemany(
+                        self._sql("INSERT INTO chat_messages (session_id, message, created_at) VALUES (?, ?, ?)"),
+                        [(session_id, json.dumps(message, ensure_ascii=False), at) for message in payload]
+                    )
+                    appended.add(session_id)
+                cursor.execute(self._sql(self.upsert_session), (session_id, at))
+
+            # 세션별로 최근 메시지만 남기고 정리
+            for session_id in appended:
+                cursor.execute(
+                    self._sql("SELECT id FROM chat_messages WHERE session_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?"),
+                    (session_id, self.max_messages - 1)
+                )
+                row = cursor.fetchone()
+                if row is not None:
+                    cursor.execute(
+                        self._sql("DELETE FROM chat_messages WHERE session_id = ? AND id < ?"), (session_id, row[0])
+                    )
+        self._transaction(work)
+
+    def load(self, session_id, idle_seconds):
+        """세션의 최근 메시지를 반환합니다. 오래 쉰 세션이면 기록을 지우고 빈 목록을 반환합니다."""
+        def work(cursor):
+            cursor.execute(self._sql("SELECT last_used FROM chat_sessions WHERE session_id = ?"), (session_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return []
+            if time.time() - row[0] > idle_seconds:
+                cursor.execute(self._sql("DELETE FROM chat_messages WHERE session_id = ?"), (session_id,))
+                cursor.execute(self._sql("DELETE FROM chat_sessions WHERE session_id = ?"), (session_id,))
+                return []
+            cursor.execute(
+                self._sql("SELECT message FROM chat_messages WHERE session_id = ? ORDER BY id DESC LIMIT ?"),
+                (session_id, self.max_messages)
+            )
+            return [json.loads(message) for (message,) in reversed(cursor.fetchall())]
+        return messages_from_dict(self._transaction(work))
+
+    def active_sessions(self, idle_seconds):
+        """최근 idle_seconds 안에 사용된 세션 ID 목록을 반환합니다."""
+        def work(cursor):
+            cursor.execute(
+                self._sql("SELECT session_id FROM chat_sessions WHERE last_used >= ?"), (time.time() - idle_seconds,)
+            )
+            return [session_id for (session_id,) in cursor.fetchall()]
+        return self._transaction(work)
+
+    def expire(self, idle_seconds):
+        """idle_seconds 동안 사용되지 않은 세션을 지우고, 지운 세션 ID 목록을 반환합니다."""
+        def work(cursor):
+            cutoff = time.time() - idle_seconds
+            cursor.execute(self._sql("SELECT session_id FROM chat_sessions WHERE last_used < ?"), (cutoff,))
+            expired = [session_id for (session_id,) in cursor.fetchall()]
+            for session_id in expired:
+                cursor.execute(self._sql("DELETE FROM chat_messages WHERE session_id = ?"), (session_id,))
+            cursor.execute(self._sql("DELETE FROM chat_sessions WHERE last_used < ?"), (cutoff,))
+            return expired
+        return self._transaction(work)
+
+    def close(self):
+        """연결을 정리합니다."""
+
+
+class SQLiteHistoryBackend(SQLHistoryBackend):
+    """SQLite 파일에 대화 기록을 저장하는 구현 (같은 호스트의 여러 워커가 공유)"""
+
+    upsert_session = (
+        "INSERT INTO chat_sessions (session_id, last_used) VALUES (?, ?) "
+        "ON CONFLICT(session_id) DO UPDATE SET last_used = excluded.last_used"
+    )
+
+    def __init__(self, max_messages, path=SQLITE_PATH):
+        """SQLite 파일을 열고 테이블을 준비합니다."""
+        super().__init__(max_messages)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # 여러 워커 프로세스가 같은 파일을 쓰므로 잠금 대기 시간을 둠
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.Lock()
+        self.ensure_schema()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages (session_id, id)")
+
+    def _transaction(self, work):
+        with self._lock, self._conn:
+            return work(self._conn.cursor())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MySQLHistoryBackend(SQLHistoryBackend):
+    """MySQL(bus_stops와 같은 DB)에 대화 기록을 저장하는 구현 (여러 노드가 공유)"""
+
+    placeholder = "%s"
+    autoincrement = "BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY"
+    upsert_session = (
+        "INSERT INTO chat_sessions (session_id, last_used) VALUES (?, ?) "
+        "ON DUPLICATE KEY UPDATE last_used = VALUES(last_used)"
+    )
+
+    def __init__(self, max_messages, pool=None):
+        """연결 풀을 받아 테이블을 준비합니다. (없으면 external_apis.db_pool.POOL 사용)"""
+        super().__init__(max_messages)
+        if pool is None:
+            from external_apis.db_pool import POOL as pool
+        self.pool = pool
+        self.ensure_schema()
+
+    def _transaction(self, work):
+        with self.pool.connection() as conn:
+            conn.begin()
+            try:
+                with conn.cursor() as cursor:
+                    result = work(cursor)
+                conn.commit()
+                return result
+            except Exception:
+                conn.rollback()
+                raise
+
+
+class WriteBehindWriter:
+    """대화 기록 쓰기를 큐에 모아 백그라운드 스레드에서 묶어서 저장하는 클래스 (응답 지연에 영향 없음)"""
+
+    def __init__(self, backend, flush_seconds=FLUSH_SECONDS, max_batch=MAX_BATCH):
+        """쓰기 스레드를 시작합니다."""
+        self.backend = backend
+        self.flush_seconds = flush_seconds
+        self.max_batch = max_batch
+        self.flushed_batches = 0
+        self.failed_batches = 0
+        self._queue = queue.Queue()
+        self._pending = {}  # 세션 ID → 아직 저장되지 않은 메시지 추가/삭제 작업 수 (사용 시각 갱신은 세지 않음)
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, operation, session_id, payload=None):
+        """쓰기 작업을 큐에 넣습니다."""
+        if operation != "touch":
+            with self._pending_lock:
+                self._pending[session_id] = self._pending.get(session_id, 0) + 1
+        self._queue.put((operation, session_id, payload, time.time()))
+
+    def has_pending(self, session_id):
+        """세션에 아직 저장되지 않은 메시지 추가/삭제가 있는지 확인합니다. (읽기 전에 먼저 저장해야 하는 작업)"""
+        with self._pending_lock:
+            return self._pending.get(session_id, 0) > 0
+
+    def flush(self):
+        """큐에 쌓인 작업을 지금 저장합니다."""
+        with self._flush_lock:
+            while True:
+                batch = []
+                try:
+                    while len(batch) < self.max_batch:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                if not batch:
+                    return
+                try:
+                    self.backend.apply(batch)
+                    self.flushed_batches += 1
+                except Exception as e:
+                    # 저장에 실패한 대화 기록은 버림 (응답은 이미 전달됨)
+                    self.failed_batches += 1
+                    print(f"⚠️ 대화 기록 저장 실패 ({len(batch)}건): {str(e)}")
+                finally:
+                    with self._pending_lock:
+                        for operation, session_id, _, _ in batch:
+                            if operation == "touch":
+                                continue
+                            self._pending[session_id] -= 1
+                            if self._pending[session_id] <= 0:
+                                del self._pending[session_id]
+
+    def _run(self):
+        """주기마다 큐를 비웁니다."""
+        while not self._stop_event.wait(self.flush_seconds):
+            self.flush()
+
+    def close(self):
+        """남은 작업을 저장하고 쓰기 스레드를 멈춥니다."""
+        self._stop_event.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self):
+        """대기 중인 작업 수와 저장 횟수를 반환합니다."""
+        return {
+            "queued": self._queue.qsize(),
+            "flushed_batches": self.flushed_batches,
+            "failed_batches": self.failed_batches,
+        }
+
+
+def create_history_backend(name=HISTORY_BACKEND, max_messages=20):
+    """환경 변수에 맞는 공유 저장소를 생성합니다. memory면 None (프로세스 메모리만 사용)"""
+    if name == "sqlite":
+        return SQLiteHistoryBackend(max_messages)
+    if name == "mysql":
+        return MySQLHistoryBackend(max_messages)
+    if name != "memory":
+        print(f"⚠️ 알 수 없는 대화 기록 저장소 '{name}', 메모리를 사용합니다.")
+    return None
+
+
+def serialize_messages(messages):
+    """langchain 메시지를 저장 가능한 딕셔너리 목록으로 변환합니다."""
+    return messages_to_dict(messages)
@@ -0,0 +1,119 @@
+# 대화 기록 윈도우 모듈 (프롬프트에 넣는 대화 기록을 토큰 예산 안으로 제한)
+import os
+
+from langchain_core.messages import SystemMessage
+
+# 🔹 체인 단계별 대화 기록 토큰 예산 (환경 변수로 조정 가능, 0 이하면 제한 없음)
+CONTEXTUALIZE_HISTORY_TOKENS = int(os.getenv("RAG_CONTEXTUALIZE_HISTORY_TOKENS", "300"))  # 질문 재구성 단계
+QA_HISTORY_TOKENS = int(os.getenv("RAG_QA_HISTORY_TOKENS", "800"))                        # 답변 생성 단계
+USE_HISTORY_SUMMARY = os.getenv("RAG_HISTORY_SUMMARY", "true").lower() == "true"          # 잘린 대화를 요약으로 남길지
+SUMMARY_TOKENS = int(os.getenv("RAG_HISTORY_SUMMARY_TOKENS", "120"))                      # 요약에 쓸 최대 토큰 수
+
+# 메시지 하나에 붙는 역할/구분자 토큰 (OpenAI 채팅 형식 기준 근사값)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def _load_encoder():
+    """tiktoken이 설치되어 있으면 토크나이저를, 없으면 None을 반환합니다."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+_ENCODER = _load_encoder()
+
+
+def count_tokens(text):
+    """텍스트의 토큰 수를 셉니다. (tiktoken이 없으면 한글 1자 ≈ 1토큰, 그 외 4바이트 ≈ 1토큰으로 추정)"""
+    text = str(text)
+    if _ENCODER is not None:
+        return len(_ENCODER.encode(text))
+    hangul = sum(1 for char in text if "가" <= char <= "힣")
+    others = len(text.encode("utf-8")) - hangul * 3
+    return hangul + (others + 3) // 4
+
+
+def count_message_tokens(messages):
+    """메시지 목록의 토큰 수를 셉니다."""
+    return sum(count_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def summarize_turns(messages, max_tokens=SUMMARY_TOKENS):
+    """잘려 나간 대화에서 사용자가 물어본 내용만 모아 짧은 요약을 만듭니다. (LLM 호출 없음)"""
+    questions = [str(message.content).strip() for message in messages if message.type == "human"]
+    if not questions:
+        return ""
+
+    # 최근 질문부터 예산 안에 들어가는 만큼만 남김
+    kept = []
+    used = count_tokens("이전 대화 요약: 사용자가 앞서 물어본 내용 - ")
+    for question in reversed(questions):
+        cost = count_tokens(question) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(question)
+        used += cost
+    if not kept:
+        return ""
+    return "이전 대화 요약: 사용자가 앞서 물어본 내용 - " + " / ".join(reversed(kept))
+
+
+class HistoryWindow:
+    """최근 대화만 토큰 예산 안에서 남기고, 잘린 앞부분은 (선택적으로) 요약 메시지 하나로 대체하는 클래스"""
+
+    def __init__(self, max_tokens, use_summary=USE_HISTORY_SUMMARY, summary_tokens=SUMMARY_TOKENS,
+                 summarizer=None):
+        """
+        대화 기록 윈도우 초기화
+
+        summarizer(messages, max_tokens)를 주면 기본 요약(사용자 질문 모음) 대신 사용합니다. (예: LLM 요약)
+        요약은 캐시하지 않습니다. 잘려 나가는 구간이 턴마다 길어져 같은 구간이 다시 오지 않기 때문입니다.
+        비용이 큰 summarizer라면 summarizer 쪽에서 세션별로 이어서 요약해야 합니다.
+        """
+        self.max_tokens = max_tokens
+        self.use_summary = use_summary
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer or summarize_turns
+
+    def apply(self, messages):
+        """토큰 예산 안에 들어가는 최근 메시지 목록을 반환합니다."""
+        messages = list(messages)
+        if self.max_tokens <= 0 or not messages:
+            return messages
+
+        budget = self.max_tokens
+        if self.use_summary:
+            # 요약이 들어갈 자리를 미리 남겨 둠
+            budget -= self.summary_tokens + MESSAGE_OVERHEAD_TOKENS
+
+        # 뒤에서부터(최근 메시지부터) 예산이 허락하는 만큼 남김
+        start = len(messages)
+        used = 0
+        while start > 0:
+            cost = count_message_tokens(messages[start - 1:start])
+            if used + cost > budget:
+                break
+            used += cost
+            start -= 1
+        if start == 0:
+            return messages
+
+        window = messages[start:]
+        if self.use_summary:
+            summary = self.summarizer(messages[:start], self.summary_tokens)
+            if summary:
+                window.insert(0, SystemMessage(summary))
+        return window
+
+    def as_input(self, inputs):
+        """체인 입력의 chat_history를 윈도우로 자른 값을 반환합니다. (RunnablePassthrough.assign용)"""
+        return self.apply(inputs.get("chat_history", []))
+
+    def stats(self):
+        """토큰 예산과 요약 사용 여부를 반환합니다."""
+        return {
+            "max_tokens": self.max_tokens,
+            "use_summary": self.use_summary,
+        }
@@ -0,0 +1,147 @@
+# 하이브리드 검색 모듈 (한국어 글자 n-gram BM25 + 벡터 검색을 합치고, 로컬 재정렬로 상위 몇 개만 남김)
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+from langchain_core.retrievers import BaseRetriever
+from pydantic import Field, PrivateAttr
+
+# 🔹 하이브리드 검색 설정 (환경 변수로 조정 가능)
+FETCH_K = int(os.getenv("HYBRID_FETCH_K", "10"))  # 벡터/BM25 각각에서 가져올 후보 수
+RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))      # Reciprocal Rank Fusion 상수
+
+TOKEN_PATTERN = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def char_ngrams(text, sizes=(2, 3)):
+    """띄어쓰기 단위로 나눈 뒤 글자 n-gram을 만듭니다. (조사가 붙어도 '녹동항' ↔ '녹동항에서'가 겹치도록)"""
+    text = unicodedata.normalize("NFC", text).lower()
+    grams = []
+    for token in TOKEN_PATTERN.split(text):
+        if not token:
+            continue
+        if len(token) < min(sizes):
+            grams.append(token)
+            continue
+        for size in sizes:
+            grams.extend(token[i:i + size] for i in range(len(token) - size + 1))
+    return grams
+
+
+class BM25Index:
+    """글자 n-gram을 단어로 쓰는 BM25 역색인"""
+
+    def __init__(self, documents, k1=1.2, b=0.75):
+        """문서 목록으로 색인을 만듭니다."""
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # n-gram → [(문서 번호, 빈도)]
+        self.doc_grams = []
+        self.positions = {document.id: position for position, document in enumerate(documents)}
+        lengths = []
+        for position, document in enumerate(documents):
+            counts = Counter(char_ngrams(document.page_content))
+            self.doc_grams.append(counts)
+            lengths.append(sum(counts.values()))
+            for gram, count in counts.items():
+                self.postings[gram].append((position, count))
+        self.lengths = lengths
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        total = len(documents)
+        self.idf = {
+            gram: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for gram, postings in self.postings.items()
+        }
+
+    def search(self, query, k):
+        """BM25 점수가 높은 k개 문서를 (문서 번호, 점수)로 반환합니다."""
+        scores = defaultdict(float)
+        for gram in set(char_ngrams(query)):
+            idf = self.idf.get(gram)
+            if idf is None:
+                continue
+            for position, count in self.postings[gram]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[position] / self.average_length)
+                scores[position] += idf * count * (self.k1 + 1) / (count + norm)
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+
+class NgramReranker:
+    """
+    후보 문서를 질문 n-gram이 얼마나 덮이는지로 다시 정렬하는 가벼운 로컬 재정렬기 (모델 호출 없음)
+
+    질문의 희귀한 n-gram(장소 이름, 날짜 등)이 제목과 본문에 많이 들어 있을수록 점수가 높습니다.
+    """
+
+    def __init__(self, title_weight=0.5, fusion_weight=0.3):
+        self.title_weight = title_weight
+        self.fusion_weight = fusion_weight
+
+    def rerank(self, query, candidates, index, k):
+        """(문서, 합친 점수) 후보 목록을 다시 정렬해 상위 k개 문서를 반환합니다."""
+        query_grams = set(char_ngrams(query))
+        total_idf = sum(index.idf.get(gram, 0.0) for gram in query_grams)
+        if not candidates or total_idf == 0:
+            return [document for document, _ in candidates[:k]]
+
+        best_fused = max(score for _, score in candidates) or 1.0
+        scored = []
+        for document, fused in candidates:
+            position = index.positions.get(document.id)
+            body = index.doc_grams[position].keys() if position is not None else set(char_ngrams(document.page_content))
+            title = set(char_ngrams(document.metadata.get("title", "")))
+            coverage = sum(index.idf.get(gram, 0.0) for gram in query_grams & body) / total_idf
+            title_coverage = sum(index.idf.get(gram, 0.0) for gram in query_grams & title) / total_idf
+            score = coverage + self.title_weight * title_coverage + self.fusion_weight * fused / best_fused
+            scored.append((score, document))
+        scored.sort(key=lambda item: -item[0])
+        return [document for _, document in scored[:k]]
+
+
+class HybridRetriever(BaseRetriever):
+    """벡터 검색과 BM25 결과를 RRF로 합치고 재정렬해 상위 k개만 LLM에 넘기는 검색기 (LocalVectorStore 필요)"""
+
+    vector_store: object
+    k: int = 2
+    fetch_k: int = FETCH_K
+    rrf_k: int = RRF_K
+    reranker: object = Field(default_factory=NgramReranker)
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    # (문서 버전, BM25 색인) - 공지가 바뀌면 다시 만듦
+    _index: tuple = PrivateAttr(default=(None, None))
+    _index_lock: object = PrivateAttr(default_factory=threading.Lock)
+
+    def bm25_index(self):
+        """현재 문서로 만든 BM25 색인을 반환합니다."""
+        version, documents = self.vector_store.snapshot()
+        with self._index_lock:
+            if self._index[0] != version:
+                self._index = (version, BM25Index(documents))
+            return self._index[1]
+
+    def fuse(self, query):
+        """벡터/BM25 후보를 RRF 점수로 합쳐 (문서, 점수) 목록으로 반환합니다."""
+        index = self.bm25_index()
+        fused = defaultdict(float)
+        by_id = {}
+        vector_hits = self.vector_store.similarity_search_with_score(query, k=self.fetch_k)
+        for rank, (document, _) in enumerate(vector_hits):
+            by_id[document.id] = document
+            fused[document.id] += 1 / (self.rrf_k + rank + 1)
+        for rank, (position, _) in enumerate(index.search(query, self.fetch_k)):
+            document = index.documents[position]
+            by_id[document.id] = document
+            fused[document.id] += 1 / (self.rrf_k + rank + 1)
+
+        ranked = sorted(fused.items(), key=lambda item: -item[1])[:self.fetch_k]
+        return [(by_id[doc_id], score) for doc_id, score in ranked], index
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        candidates, index = self.fuse(query)
+        return self.reranker.rerank(query, candidates, index, self.k)
@@ -0,0 +1,140 @@
+# 의도 감지 결과 캐시 모듈
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# 정규화 시 문장 끝에서 제거할 어미/종결 표현 (긴 것부터 검사하도록 길이순 정렬)
+SENTENCE_ENDINGS = tuple(sorted((
+    "입니까", "습니까", "인가요", "이에요", "주세요", "해주세요", "해줘요", "알려줘", "해줘",
+    "나요", "까요", "에요", "예요", "세요", "어요", "아요", "지요", "줘요",
+    "줘", "죠", "요", "야", "니", "냐",
+), key=len, reverse=True))
+PUNCTUATION_PATTERN = re.compile(r"[^\w]", re.UNICODE)
+
+
+def normalize_utterance(utterance):
+    """공백, 문장 부호, 문장 끝 어미를 정리해 캐시 키로 쓸 문자열을 만듭니다."""
+    text = unicodedata.normalize("NFC", utterance).lower()
+    # 띄어쓰기는 사람마다 달라서 모두 제거
+    text = PUNCTUATION_PATTERN.sub("", text)
+
+    # 어미를 최대 두 번까지 제거 (예: "알려줘요" → "알려" )
+    for _ in range(2):
+        for ending in SENTENCE_ENDINGS:
+            if text.endswith(ending) and len(text) > len(ending) + 1:
+                text = text[:-len(ending)]
+                break
+    return text
+
+
+class IntentCache:
+    """정규화된 발화를 키로 (의도, 목적지)를 저장하는 LRU + TTL 캐시"""
+
+    def __init__(self, max_size=1024, ttl=24 * 60 * 60, path=None, autosave_every=50):
+        """캐시 초기화 (path가 있으면 파일에서 이전 캐시를 불러옴)"""
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.autosave_every = autosave_every
+        self.entries = OrderedDict()  # key → (intent, destination, 저장 시각)
+        self.hits = 0
+        self.misses = 0
+        self._dirty = 0
+        self._lock = threading.Lock()
+
+        if self.path:
+            self.load()
+
+    def get(self, utterance):
+        """캐시된 (의도, 목적지)를 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        key = normalize_utterance(utterance)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or time.time() - entry[2] > self.ttl:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, utterance, intent, destination):
+        """(의도, 목적지)를 캐시에 저장합니다."""
+        key = normalize_utterance(utterance)
+        if not key:
+            return
+
+        with self._lock:
+            self.entries[key] = (intent, destination, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            self._dirty += 1
+            should_save = self.path and self.autosave_every and self._dirty >= self.autosave_every
+
+        if should_save:
+            self.save()
+
+    def stats(self):
+        """캐시 적중/미적중 통계를 반환합니다."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+    def save(self):
+        """캐시를 파일에 저장합니다. (재시작 후에도 재사용)"""
+        if not self.path:
+            return
+
+        with self._lock:
+            data = [[key, intent, destination, saved_at]
+                    for key, (intent, destination, saved_at) in self.entries.items()]
+            self._dirty = 0
+
+        tmp_path = None
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 동시에 저장하는 스레드/워커가 같은 임시 파일에 쓰지 않도록 저장마다 새 임시 파일 사용
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory or ".",
+                                             prefix=os.path.basename(self.path) + ".", suffix=".tmp",
+                                             delete=False) as f:
+                tmp_path = f.name
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ 의도 캐시 저장 실패: {str(e)}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load(self):
+        """파일에 저장된 캐시 중 만료되지 않은 항목을 불러옵니다."""
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 의도 캐시 불러오기 실패: {str(e)}")
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, intent, destination, saved_at in data[-self.max_size:]:
+                if now - saved_at <= self.ttl:
+                    self.entries[key] = (intent, destination, saved_at)
+        print(f"✅ 의도 캐시 {len(self.entries)}개를 불러왔습니다.")
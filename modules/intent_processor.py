@@ -1,13 +1,65 @@
 # 의도 감지 및 목적지 추출 모듈
+import os
+
+from modules.deadline import has_budget, remaining_time, skip_stage
+
+# 로컬 분류 결과를 LLM 없이 그대로 사용할 최소 신뢰도
+LOCAL_CONFIDENCE_THRESHOLD = 0.8
+
+# LLM 의도 감지를 시도할 최소 남은 처리 시간(초) - 부족하면 로컬 분류 결과를 그대로 사용
+LLM_MIN_BUDGET_SECONDS = float(os.getenv("INTENT_LLM_MIN_BUDGET_SECONDS", "1.0"))
+
+# LLM 없이 로컬 분류 결과를 쓸 때 필요한 최소 신뢰도 (이보다 낮으면 장소 의도로 보지 않고 일반 대화로 처리)
+DEGRADED_MIN_CONFIDENCE = float(os.getenv("INTENT_DEGRADED_MIN_CONFIDENCE", "0.5"))
+
 class IntentProcessor:
     """사용자 메시지에서 의도와 목적지를 감지하는 클래스"""
     
-    def __init__(self, llm):
-        """LLM을 사용하여 IntentProcessor 초기화"""
+    def __init__(self, llm, local_classifier=None, confidence_threshold=LOCAL_CONFIDENCE_THRESHOLD, intent_cache=None,
+                 llm_breaker=None):
+        """LLM을 사용하여 IntentProcessor 초기화 (local_classifier가 있으면 확실한 문장은 로컬에서 처리)"""
         self.llm = llm
+        self.llm_breaker = llm_breaker
+        self.local_classifier = local_classifier
+        self.intent_cache = intent_cache
+        self.confidence_threshold = confidence_threshold
+        self.local_count = 0
+        self.llm_count = 0
     
     def detect_intent_and_extract_destination(self, user_message):
         """사용자 메시지를 분석하여 의도와 목적지를 추출합니다."""
+        # 0) 같은 질문을 이전에 LLM으로 판단한 적이 있으면 캐시 결과 사용
+        if self.intent_cache is not None:
+            cached = self.intent_cache.get(user_message)
+            if cached is not None:
+                print(f"💾 의도 캐시 적중: {cached[0]}, 목적지: {cached[1]}")
+                return cached
+        
+        # 1) 규칙 기반 빠른 경로: 신뢰도가 충분하면 LLM 호출 생략
+        local_result = None
+        if self.local_classifier is not None:
+            local_result = self.local_classifier.classify(user_message)
+            if local_result.intent and local_result.confidence >= self.confidence_threshold:
+                self.local_count += 1
+                print(f"⚡ 로컬 의도 분류: {local_result.intent}, 목적지: {local_result.destination} "
+                      f"(신뢰도 {local_result.confidence:.2f}, 규칙 {local_result.rule})")
+                return local_result.intent, local_result.destination
+        
+        # 처리 시간이 부족하거나 LLM이 장애로 차단되었으면 신뢰도가 조금 낮더라도 로컬 분류 결과 사용
+        # (목적지를 믿기 어려운 결과는 엉뚱한 장소로 안내하지 않도록 일반 대화로 처리)
+        if not has_budget(LLM_MIN_BUDGET_SECONDS) or (self.llm_breaker is not None and not self.llm_breaker.allow()):
+            skip_stage("intent.llm")
+            self.local_count += 1
+            if local_result is not None and local_result.intent and local_result.confidence >= DEGRADED_MIN_CONFIDENCE:
+                return local_result.intent, local_result.destination
+            return None, None
+        
+        # 2) 애매한 문장은 LLM으로 판단
+        self.llm_count += 1
+        return self.detect_with_llm(user_message)
+    
+    def detect_with_llm(self, user_message):
+        """LLM을 사용하여 의도와 목적지를 추출합니다."""
         prompt = f"""
         사용자의 메시지를 분석하여 의도와 목적지를 파악하세요.
         
@@ -20,8 +72,20 @@ class IntentProcessor:
         사용자 입력: "{user_message}"
         """
         
+        # 요청 deadline 안에서는 남은 시간만큼만 응답을 기다림 (self.llm은 재시도하지 않는 클라이언트)
+        remaining = remaining_time()
+        llm_kwargs = {"timeout": remaining} if remaining is not None else {}
+        
         try:
-            result = self.llm.invoke(prompt).content
+            try:
+                result = self.llm.invoke(prompt, **llm_kwargs).content
+            except Exception:
+                # 요청 예산을 다 써서 끊긴 호출은 OpenAI 장애가 아니므로 차단기에 세지 않음
+                if self.llm_breaker is not None and (remaining is None or has_budget(0)):
+                    self.llm_breaker.record_failure()
+                raise
+            if self.llm_breaker is not None:
+                self.llm_breaker.record_success()
             
             intent = None
             destination = None
@@ -38,6 +102,10 @@ class IntentProcessor:
                 destination = destination.replace('"', '').replace("'", "")
                 destination = destination.rstrip('".\',:;')
             
+            # 정상 응답만 캐시 (오류로 인한 None 결과는 저장하지 않음)
+            if self.intent_cache is not None:
+                self.intent_cache.put(user_message, intent, destination)
+            
             return intent, destination
         
         except Exception as e:
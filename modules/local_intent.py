@@ -0,0 +1,190 @@
+# 규칙 기반 의도 분류 모듈 (LLM 호출 전 빠른 경로)
+import re
+from collections import namedtuple
+
+# 분류 결과: 의도, 목적지, 신뢰도(0~1), 적용된 규칙 이름
+LocalIntentResult = namedtuple("LocalIntentResult", ["intent", "destination", "confidence", "rule"])
+
+# 목적지 앞에 붙는 수식어 (근처 편의점 → 편의점)
+LEADING_WORDS = ("여기서", "여기", "지금", "혹시", "근처에", "근처", "주변에", "주변", "가까운", "제일", "가장")
+
+# 사람 뒤에 붙는 조사 (엄마한테 가는 길 → 목적지가 아니라 사람이므로 LLM에 맡김)
+PERSON_PARTICLES = ("한테서", "에게서", "한테", "에게", "께")
+
+# 목적지 뒤에 붙는 조사 (긴 것부터 제거)
+TRAILING_PARTICLES = PERSON_PARTICLES + (
+    "에서부터", "까지는", "으로는", "에서", "까지", "으로", "에는", "은", "는", "이", "가", "을", "를", "로", "에"
+)
+
+# 목적지로 보기 어려운 단어
+STOPWORDS = {"여기", "거기", "저기", "어디", "집", "버스", "길", "위치", "근처", "주변", "가까운", "곳", "데"}
+
+# 목적지 안에 있으면 장소 이름이 아니라 시간/사람/지시어가 잘려 들어온 것으로 보고 LLM에 맡기는 단어
+# (예: "내일 몇 번 버스", "마지막 버스", "그거 어떻게 가요", "나 지금 집에 가는 버스", "오늘 축제 어디야")
+DEFER_WORDS = {
+    "오늘", "내일", "모레", "어제", "지금", "이따", "아까", "나중", "이번", "다음", "마지막", "첫", "막차", "첫차",
+    "아침", "점심", "저녁", "밤", "새벽", "오전", "오후", "주말", "평일",
+    "나", "내", "저", "제", "우리", "저희", "너", "그거", "이거", "저거", "그것", "이것", "저것", "그곳", "이곳", "저곳",
+    "그", "이", "몇", "무슨", "어느", "아무",
+}
+
+# 목적지 끝에 오면 장소 이름이 아니라 '밥 먹을 데', '쉴 곳' 같은 설명(절)으로 보는 의존 명사
+CLAUSE_NOUNS = {"데", "곳", "거", "것", "쪽"}
+
+# 목적지가 이 단어로 끝나면 지도에서 찾을 장소가 아니라 화면/웹의 정보로 보는 단어 (공지사항 어디에 있어?)
+NON_PLACE_SUFFIXES = ("공지사항", "공지", "홈페이지", "사이트", "게시판", "메뉴", "화면", "버튼", "정보", "시간표", "번호", "연락처")
+
+# 의도별 규칙: (규칙 이름, 의도, 정규식, 기본 신뢰도)
+# 정규식의 dest 그룹이 목적지 후보입니다.
+RULES = [
+    ("bus_goes_to", "버스 노선",
+     re.compile(r"^(?P<dest>.+?)\s*(?:까지|으로|로|에)?\s*(?:가는|가려면|갈\s*때|갈려면|가요|가나요)\s*.*?(?:몇\s*번\s*)?버스"), 0.92),
+    ("bus_number", "버스 노선",
+     re.compile(r"^(?P<dest>.+?)\s*(?:까지|으로|로|에)?\s*(?:는|은)?\s*몇\s*번\s*(?:버스)?\s*(?:타|가|이|이에요|인가요|야)"), 0.9),
+    ("bus_route", "버스 노선",
+     re.compile(r"^(?P<dest>.+?)\s*(?:까지|으로|로|에)?\s*(?:가는\s*)?버스\s*(?:노선|번호|있|뭐|알려|어떤)"), 0.85),
+    ("path_how_to_go", "길찾기",
+     re.compile(r"^(?P<dest>.+?)\s*(?:까지|으로|로|에)?\s*(?:어떻게\s*(?:가|갈|가야|가나요|가요))"), 0.9),
+    ("path_way", "길찾기",
+     re.compile(r"^(?P<dest>.+?)\s*(?:(?:까지|으로|로|에)\s*(?:가는\s*)?|가는\s*)(?:길|경로|방법)\s*(?:좀\s*)?(?:알려|안내|찾아|가르쳐|보여|어떻게|뭐)"), 0.9),
+    ("path_guide", "길찾기",
+     re.compile(r"^(?P<dest>.+?)\s*(?:까지|으로|로)\s*(?:길\s*)?(?:안내|길찾기)"), 0.85),
+    ("location_where", "위치 찾기",
+     re.compile(r"^(?P<dest>.+?)\s*(?:은|는|이|가)?\s*어디\s*(?:야|에요|예요|인가|인지|죠|지)"), 0.9),
+    # "어디 있어"는 물건/사람에도 쓰므로 목적지가 장소처럼 보일 때만 LLM 없이 처리
+    ("location_where_exists", "위치 찾기",
+     re.compile(r"^(?P<dest>.+?)\s*(?:은|는|이|가)?\s*어디\s*(?:에\s*)?있"), 0.75),
+    ("location_nearby", "위치 찾기",
+     re.compile(r"^(?:근처|주변|가까운)\s*(?:에\s*)?(?:있는\s*)?(?P<dest>.+?)\s*(?:좀\s*)?(?:알려|찾아|보여|어디|있)"), 0.88),
+    ("location_find", "위치 찾기",
+     re.compile(r"^(?P<dest>.+?)\s*(?:위치|어디에\s*있는지)\s*(?:좀\s*)?(?:알려|찾아|보여|어디)"), 0.88),
+]
+
+# 목적지가 이 말로 끝나면 장소 이름으로 보고 신뢰도를 올림 (location_where_exists 규칙용)
+PLACE_SUFFIXES = (
+    "터미널", "정류장", "역", "항", "공원", "센터", "병원", "의원", "약국", "은행", "우체국", "마트", "시장", "편의점",
+    "카페", "식당", "학교", "청", "소", "관", "원", "실", "점", "장", "당", "회관", "사무소",
+)
+PLACE_SUFFIX_BONUS = 0.15
+
+# 문장 끝 부호
+TRAILING_PUNCTUATION = "?!.~ "
+
+
+class LocalIntentClassifier:
+    """정규식 규칙과 (가능하면) spaCy 품사 정보로 의도와 목적지를 빠르게 추출하는 클래스"""
+
+    def __init__(self, use_spacy=True, spacy_model="ko_core_news_sm"):
+        """규칙 분류기 초기화 (spaCy 모델은 설치되어 있을 때만 사용)"""
+        self.nlp = None
+        if use_spacy:
+            try:
+                import spacy
+                self.nlp = spacy.load(spacy_model, disable=["parser", "ner"])
+            except Exception as e:
+                print(f"⚠️ spaCy 모델을 불러오지 못해 규칙만 사용합니다: {str(e)}")
+
+    def clean_destination(self, text):
+        """목적지 후보에서 수식어, 조사, 부호를 제거합니다."""
+        destination = text.strip().strip("\"'")
+
+        for word in LEADING_WORDS:
+            if destination.startswith(word + " "):
+                destination = destination[len(word):].strip()
+
+        for particle in TRAILING_PARTICLES:
+            if destination.endswith(particle) and len(destination) - len(particle) >= 2:
+                destination = destination[:-len(particle)].strip()
+                break
+
+        return destination.strip(TRAILING_PUNCTUATION)
+
+    def strip_particle(self, word):
+        """단어 끝의 조사를 하나 제거합니다. (내일은 → 내일)"""
+        for particle in TRAILING_PARTICLES:
+            if word.endswith(particle) and len(word) > len(particle):
+                return word[:-len(particle)]
+        return word
+
+    def noun_ratio(self, destination):
+        """spaCy 품사 태깅으로 목적지 중 명사 토큰의 비율을 계산합니다."""
+        if self.nlp is None:
+            return None
+        doc = self.nlp(destination)
+        tokens = [token for token in doc if not token.is_punct]
+        if not tokens:
+            return 0.0
+        nouns = [token for token in tokens if token.pos_ in ("NOUN", "PROPN", "NUM")]
+        return len(nouns) / len(tokens)
+
+    def is_clause(self, words):
+        """목적지가 장소 이름이 아니라 설명하는 절(밥 먹을 데, 표 파는 곳)인지 확인합니다."""
+        if len(words) > 1 and words[-1] in CLAUSE_NOUNS:
+            return True
+        # 마지막 단어 앞에 관형형(가는, 하던)이 있으면 동사가 섞인 절
+        return any(word.endswith(("는", "던")) for word in words[:-1])
+
+    def score_destination(self, destination, base_confidence, raw_destination=None):
+        """목적지의 형태를 보고 신뢰도를 조정합니다. (raw_destination은 조사를 떼기 전의 후보)"""
+        if not destination or destination in STOPWORDS:
+            return 0.0
+
+        # 시간/사람/지시어가 섞인 목적지는 규칙이 문장을 잘못 자른 경우가 대부분이라 LLM에 맡김
+        if any(self.strip_particle(word) in DEFER_WORDS for word in destination.split()):
+            return 0.0
+
+        words = destination.split()
+
+        # 사람(엄마한테), 설명하는 절(밥 먹을 데), 화면/웹 정보(공지사항)는 장소 검색 대상이 아님
+        if raw_destination and any(word.endswith(PERSON_PARTICLES) for word in raw_destination.split()):
+            return 0.0
+        if self.is_clause(words) or destination.endswith(NON_PLACE_SUFFIXES):
+            return 0.0
+
+        confidence = base_confidence
+
+        # 목적지가 너무 짧거나 길면 규칙이 잘못 잘랐을 가능성이 큼
+        if len(destination) < 2:
+            confidence -= 0.4
+        if len(words) > 3 or len(destination) > 20:
+            confidence -= 0.3
+
+        # 목적지 안에 동사/의문 표현이 섞여 있으면 감점
+        if re.search(r"(어떻게|뭐|왜|언제|하고|해서|했|싶|주세요|줘)", destination):
+            confidence -= 0.4
+
+        ratio = self.noun_ratio(destination)
+        if ratio is not None and ratio < 0.5:
+            confidence -= 0.2
+
+        if destination.endswith(PLACE_SUFFIXES):
+            confidence += PLACE_SUFFIX_BONUS
+
+        return max(0.0, min(1.0, confidence))
+
+    def classify(self, message):
+        """메시지를 분류하고 LocalIntentResult를 반환합니다. (해당 규칙이 없으면 신뢰도 0)"""
+        text = re.sub(r"\s+", " ", message).strip().rstrip(TRAILING_PUNCTUATION)
+        if not text:
+            return LocalIntentResult(None, None, 0.0, None)
+
+        candidates = []
+        for rule_name, intent, pattern, base_confidence in RULES:
+            match = pattern.search(text)
+            if not match:
+                continue
+            destination = self.clean_destination(match.group("dest"))
+            confidence = self.score_destination(destination, base_confidence, match.group("dest"))
+            candidates.append(LocalIntentResult(intent, destination, confidence, rule_name))
+
+        if not candidates:
+            return LocalIntentResult(None, None, 0.0, None)
+
+        best = max(candidates, key=lambda result: result.confidence)
+
+        # 서로 다른 의도의 규칙이 동시에 맞으면 애매한 문장으로 보고 감점
+        other_intents = {result.intent for result in candidates if result.confidence > 0} - {best.intent}
+        if other_intents:
+            best = best._replace(confidence=max(0.0, best.confidence - 0.3))
+
+        return best
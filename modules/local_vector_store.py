@@ -0,0 +1,240 @@
+# 로컬 벡터 DB 모듈 (공지 임베딩을 디스크의 float32 행렬로 저장하고 프로세스 안에서 검색)
+import json
+import os
+import threading
+import uuid
+import zlib
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+# 🔹 로컬 인덱스 저장 위치 (환경 변수로 조정 가능)
+LOCAL_INDEX_DIR = os.getenv("LOCAL_VECTOR_DIR", "cache/notice_index")
+
+VECTORS_FILE = "vectors.f32"
+DOCUMENTS_FILE = "documents.json"
+
+
+def _normalize_rows(matrix):
+    """행마다 길이 1로 정규화합니다. (내적 = 코사인 유사도)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LocalVectorStore(VectorStore):
+    """
+    공지 문서 임베딩을 정규화된 float32 행렬 하나로 들고 있다가 내적 한 번으로 검색하는 벡터 DB
+
+    고흥군 공지 정도의 문서 수(수천 개 이하)는 전수 비교가 가장 빠르고 정확합니다.
+    저장된 인덱스는 memmap으로 열어 여러 워커가 같은 파일을 메모리에 한 번만 올립니다.
+    """
+
+    def __init__(self, embedding, directory=None):
+        """빈 인덱스 생성 (directory가 있으면 save() 시 그곳에 저장)"""
+        self.embedding = embedding
+        self.directory = directory
+        self.ids = []
+        self.documents = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self._positions = {}
+        self._buffer = None  # 행 추가용 여유 공간 (matrix는 이 버퍼의 앞부분)
+        self.version = 0  # 문서가 바뀔 때마다 증가 (검색 보조 색인 갱신용)
+        self._loaded_mtime = None
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self):
+        return self.embedding
+
+    @classmethod
+    def load(cls, directory, embedding):
+        """저장된 인덱스를 불러옵니다. (없으면 빈 인덱스)"""
+        store = cls(embedding, directory)
+        store.reload_if_changed()
+        return store
+
+    def _documents_mtime(self):
+        try:
+            return os.stat(os.path.join(self.directory, DOCUMENTS_FILE)).st_mtime_ns
+        except (FileNotFoundError, TypeError):
+            return None
+
+    def reload_if_changed(self):
+        """다른 프로세스(공지 적재 작업)가 디스크의 인덱스를 바꿨으면 다시 불러옵니다."""
+        mtime = self._documents_mtime()
+        if mtime is None or mtime == self._loaded_mtime:
+            return False
+
+        try:
+            with open(os.path.join(self.directory, DOCUMENTS_FILE), "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            ids = [item["id"] for item in saved["documents"]]
+            documents = [
+                Document(id=item["id"], page_content=item["page_content"], metadata=item["metadata"])
+                for item in saved["documents"]
+            ]
+            matrix = np.zeros((0, saved["dim"]), dtype=np.float32)
+            if ids:
+                matrix = np.memmap(
+                    os.path.join(self.directory, VECTORS_FILE), dtype=np.float32, mode="r",
+                    shape=(len(ids), saved["dim"])
+                )
+                # 벡터 파일과 문서 목록은 따로 교체되므로, 같은 저장에서 나온 짝인지 확인 (이전 버전 파일은 확인 생략)
+                checksum = zlib.crc32(matrix)
+                if saved.get("checksum", checksum) != checksum:
+                    raise ValueError("벡터 파일이 문서 목록과 맞지 않습니다")
+        except (OSError, ValueError, KeyError) as e:
+            # 저장 도중이면 이전 인덱스를 계속 쓰고 다음 검색 때 다시 시도
+            print(f"⚠️ 로컬 벡터 인덱스를 다시 불러오지 못했습니다: {str(e)}")
+            return False
+        with self._lock:
+            self.ids, self.documents, self.matrix = ids, documents, matrix
+            self._buffer = None
+            self._positions = {doc_id: i for i, doc_id in enumerate(ids)}
+            self._loaded_mtime = mtime
+            self.version += 1
+        return True
+
+    def save(self, directory=None):
+        """
+        인덱스를 디스크에 저장합니다. (임시 파일에 쓰고 교체하므로 읽는 워커는 이전 파일을 계속 사용)
+
+        벡터 파일을 먼저, 문서 목록을 나중에 교체하며 문서 목록에 벡터의 체크섬을 기록합니다.
+        두 파일 교체 사이에 읽은 워커는 체크섬이 맞지 않으면 이전 인덱스를 유지하고 다음 검색 때 다시 읽습니다.
+        """
+        directory = directory or self.directory
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            ids, documents, matrix = list(self.ids), list(self.documents), self.matrix
+
+        vectors = np.ascontiguousarray(matrix, dtype=np.float32)
+        vectors_path = os.path.join(directory, VECTORS_FILE)
+        vectors.tofile(vectors_path + ".tmp")
+        os.replace(vectors_path + ".tmp", vectors_path)
+
+        documents_path = os.path.join(directory, DOCUMENTS_FILE)
+        with open(documents_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": int(matrix.shape[1]) if matrix.size else 0,
+                "checksum": zlib.crc32(vectors),
+                "documents": [
+                    {"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata}
+                    for doc_id, doc in zip(ids, documents)
+                ],
+            }, f, ensure_ascii=False)
+        os.replace(documents_path + ".tmp", documents_path)
+        if directory == self.directory:
+            self._loaded_mtime = self._documents_mtime()
+
+    def add_embeddings(self, texts, vectors, metadatas=None, ids=None):
+        """이미 계산한 임베딩으로 문서를 추가합니다. 같은 ID가 있으면 교체합니다."""
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in texts]
+        vectors = _normalize_rows(np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1))
+
+        with self._lock:
+            new_count = sum(1 for doc_id in set(ids) if doc_id not in self._positions)
+            buffer = self._reserve(new_count, vectors.shape[1])
+            for doc_id, text, metadata, vector in zip(ids, texts, metadatas, vectors):
+                document = Document(id=doc_id, page_content=text, metadata=metadata)
+                position = self._positions.get(doc_id)
+                if position is None:
+                    position = len(self.ids)
+                    self._positions[doc_id] = position
+                    self.ids.append(doc_id)
+                    self.documents.append(document)
+                else:
+                    self.documents[position] = document
+                buffer[position] = vector
+            self.matrix = buffer[:len(self.ids)]
+            self.version += 1
+        return ids
+
+    def _reserve(self, rows, dim):
+        """rows개 행을 더 넣을 버퍼를 반환합니다. 잠금을 잡은 상태에서 호출합니다. (용량을 두 배씩 늘려 매번 복사하지 않음)"""
+        count = len(self.ids)
+        if self._buffer is None or self._buffer.shape[1] != dim or count + rows > len(self._buffer):
+            # 기존 행렬(읽기 전용 memmap일 수 있음)을 새 버퍼로 복사
+            buffer = np.zeros((max(count + rows, 2 * count, 64), dim), dtype=np.float32)
+            if count:
+                buffer[:count] = self.matrix[:count]
+            self._buffer = buffer
+        return self._buffer
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        """문서를 임베딩해 추가합니다."""
+        texts = list(texts)
+        if not texts:
+            return []
+        return self.add_embeddings(texts, self.embedding.embed_documents(texts), metadatas, ids)
+
+    def delete(self, ids=None, **kwargs):
+        """ID에 해당하는 문서를 지웁니다."""
+        if not ids:
+            return False
+        with self._lock:
+            remove = {self._positions[doc_id] for doc_id in ids if doc_id in self._positions}
+            if not remove:
+                return False
+            keep = [i for i in range(len(self.ids)) if i not in remove]
+            self.ids = [self.ids[i] for i in keep]
+            self.documents = [self.documents[i] for i in keep]
+            self.matrix = np.array(self.matrix[keep]) if keep else np.zeros((0, self.matrix.shape[1]), dtype=np.float32)
+            self._buffer = None
+            self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+            self.version += 1
+        return True
+
+    def snapshot(self):
+        """현재 (버전, 문서 목록)을 반환합니다."""
+        self.reload_if_changed()
+        with self._lock:
+            return self.version, list(self.documents)
+
+    def get_by_ids(self, ids):
+        """ID에 해당하는 문서를 반환합니다."""
+        with self._lock:
+            return [self.documents[self._positions[doc_id]] for doc_id in ids if doc_id in self._positions]
+
+    def similarity_search_with_score_by_vector(self, embedding, k=4, **kwargs):
+        """임베딩과 코사인 유사도가 가장 높은 k개 문서를 (문서, 점수)로 반환합니다."""
+        self.reload_if_changed()
+        with self._lock:
+            matrix, documents = self.matrix, self.documents
+        if not documents:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        scores = matrix @ (query / norm if norm > 0 else query)
+        k = min(k, len(documents))
+        # 전체 정렬 대신 상위 k개만 골라 정렬
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(documents[i], float(scores[i])) for i in top]
+
+    def similarity_search_by_vector(self, embedding, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        # 코사인 유사도(-1~1)를 0~1 관련도 점수로 변환
+        return lambda score: (score + 1) / 2
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, directory=None, **kwargs):
+        """문서 목록으로 인덱스를 생성합니다."""
+        store = cls(embedding, directory)
+        store.add_texts(texts, metadatas, ids)
+        return store
+
+    def __len__(self):
+        return len(self.ids)
@@ -0,0 +1,2 @@
+# 지연 시간 지표 수집 모듈 (external_apis와 함께 쓰도록 common.metrics로 옮기고 기존 경로 유지)
+from common.metrics import DEFAULT_WINDOW, LatencyStats, Timer, get_latency_stats, snapshot_all
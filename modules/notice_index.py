@@ -0,0 +1,27 @@
+# 공지 검색 인덱스 버전 모듈 (인덱스가 바뀌면 이전 답변 캐시를 버리기 위해 사용)
+import os
+import time
+
+# 🔹 인덱스 버전 파일 (공지 적재 작업과 API 워커가 함께 사용)
+INDEX_VERSION_PATH = os.getenv("NOTICE_INDEX_VERSION_PATH", "cache/notice_index_version")
+
+
+def read_index_version(path=INDEX_VERSION_PATH):
+    """현재 공지 인덱스 버전을 반환합니다. (파일이 없으면 "0")"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+
+def bump_index_version(path=INDEX_VERSION_PATH):
+    """공지 인덱스가 바뀌었음을 기록하고 새 버전을 반환합니다."""
+    version = str(time.time_ns())
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # 읽는 쪽에서 반쯤 쓰인 파일을 보지 않도록 임시 파일에 쓰고 교체
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(temp_path, path)
+    return version
@@ -0,0 +1,265 @@
+# 공지 적재 모듈 (바뀐 공지 조각만 임베딩해서 벡터 DB에 반영)
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from modules.notice_index import bump_index_version
+
+# 🔹 적재 설정 (환경 변수로 조정 가능)
+# 목록 파일은 벡터 DB마다 따로 둠 (로컬 인덱스는 인덱스 폴더 안, 그 외는 {index} 자리에 인덱스 이름)
+MANIFEST_PATH = os.getenv("NOTICE_MANIFEST_PATH", "cache/notice_manifest_{index}.sqlite3")
+MANIFEST_FILE = "manifest.sqlite3"
+CHUNK_SIZE = int(os.getenv("NOTICE_CHUNK_SIZE", "500"))        # 조각 하나의 최대 글자 수
+CHUNK_OVERLAP = int(os.getenv("NOTICE_CHUNK_OVERLAP", "50"))   # 이전 조각과 겹치는 글자 수
+EMBED_BATCH = int(os.getenv("NOTICE_EMBED_BATCH", "64"))       # 한 번에 임베딩/저장할 조각 수
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+class NoticeFile:
+    """JSON Lines 공지 파일 (한 줄씩 읽고, 읽지 못한 줄 수를 skipped에 기록)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.skipped = 0
+
+    def __iter__(self):
+        """공지를 한 줄씩 읽습니다. (파일 전체를 메모리에 올리지 않음)"""
+        self.skipped = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    self.skipped += 1
+                    print(f"⚠️ {line_number}번째 줄의 공지를 읽지 못했습니다: {str(e)}")
+
+
+def iter_notices(path):
+    """JSON Lines 파일의 공지를 읽는 NoticeFile을 반환합니다."""
+    return NoticeFile(path)
+
+
+def chunk_text(text, size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """본문을 문장 단위로 모아 size자 이하의 조각으로 나눕니다. (조각 사이는 overlap자만큼 겹침)"""
+    sentences = [sentence.strip() for sentence in SENTENCE_PATTERN.split(text) if sentence.strip()]
+    chunks = []
+    current = ""
+    for sentence in sentences:
+        # 한 문장이 너무 길면 글자 수로 자름
+        while len(sentence) > size:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:size])
+            sentence = sentence[size - overlap:]
+        if current and len(current) + 1 + len(sentence) > size:
+            chunks.append(current)
+            current = current[-overlap:] if overlap else ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_chunks(notice):
+    """공지 하나를 (조각 ID, 내용, 메타데이터) 목록으로 만듭니다."""
+    notice_id = str(notice.get("id") or notice.get("url") or notice["title"])
+    title = notice.get("title", "").strip()
+    url = notice.get("url", "")
+    chunks = []
+    for index, chunk in enumerate(chunk_text(notice.get("content", ""))):
+        content = f"{title}\n{chunk}" if title else chunk
+        if url:
+            content += f"\n링크: {url}"
+        metadata = {"notice_id": notice_id, "title": title, "url": url, "date": notice.get("date", ""), "chunk": index}
+        chunks.append((f"{notice_id}#{index}", content, metadata))
+    return chunks
+
+
+def content_hash(content, metadata):
+    """조각 내용과 메타데이터의 sha256 해시를 반환합니다."""
+    payload = content + "\n" + json.dumps(metadata, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def manifest_path(vector_store, index_name="default"):
+    """벡터 DB에 맞는 목록 파일 경로를 반환합니다. (인덱스를 지우거나 벡터 DB를 바꾸면 목록도 새로 시작)"""
+    directory = getattr(vector_store, "directory", None)
+    if directory:
+        return os.path.join(directory, MANIFEST_FILE)
+    return MANIFEST_PATH.format(index=index_name)
+
+
+class ChunkManifest:
+    """벡터 DB에 올라간 조각 ID와 내용 해시를 기록하는 SQLite 목록"""
+
+    def __init__(self, path):
+        """목록 파일을 열고 테이블을 준비합니다."""
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (chunk_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def hash_of(self, chunk_id):
+        """저장된 조각의 해시를 반환합니다. (없으면 None)"""
+        row = self._conn.execute("SELECT content_hash FROM chunks WHERE chunk_id = ?", (chunk_id,)).fetchone()
+        return row[0] if row else None
+
+    def apply(self, recorded=(), removed=()):
+        """(조각 ID, 해시) 목록을 기록하고 조각 ID 목록을 지웁니다. (한 트랜잭션)"""
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (chunk_id, content_hash, updated_at) VALUES (?, ?, ?)",
+                [(chunk_id, digest, now) for chunk_id, digest in recorded]
+            )
+            self._conn.executemany("DELETE FROM chunks WHERE chunk_id = ?", [(chunk_id,) for chunk_id in removed])
+
+    def record(self, items):
+        """(조각 ID, 해시) 목록을 기록합니다."""
+        self.apply(recorded=items)
+
+    def missing_from(self, seen_ids):
+        """이번 적재에서 보지 못한 조각 ID 목록을 반환합니다."""
+        return [chunk_id for (chunk_id,) in self._conn.execute("SELECT chunk_id FROM chunks") if chunk_id not in seen_ids]
+
+    def remove(self, chunk_ids):
+        """조각 ID를 목록에서 지웁니다."""
+        self.apply(removed=chunk_ids)
+
+    def close(self):
+        self._conn.close()
+
+
+class NoticeIngestor:
+    """
+    공지를 조각으로 나누고, 새로 생기거나 바뀐 조각만 묶어서 임베딩/저장하고, 사라진 조각은 지우는 클래스
+
+    목록(manifest)에는 벡터 DB에 실제로 남은 변경만 기록합니다. 로컬 벡터 DB는 save() 전까지 메모리에만 있으므로
+    마지막 저장 뒤에 한 번에 기록하고, 쓰는 즉시 반영되는 벡터 DB(Pinecone)는 묶음마다 기록합니다.
+    중간에 중단되면 기록되지 않은 조각은 다음 적재 때 다시 처리합니다.
+    """
+
+    def __init__(self, vector_store, embedding, manifest=None, batch_size=EMBED_BATCH):
+        """적재기 초기화 (vector_store는 LocalVectorStore 또는 PineconeVectorStore, manifest가 없으면 벡터 DB에 맞는 목록 사용)"""
+        self.vector_store = vector_store
+        self.embedding = embedding
+        self.manifest = manifest or ChunkManifest(manifest_path(vector_store))
+        self.batch_size = batch_size
+        # save()가 있는 벡터 DB는 저장해야 디스크에 반영됨
+        self.deferred = hasattr(vector_store, "save")
+
+    def is_unchanged(self, chunk_id, digest):
+        """목록의 해시가 같고 (로컬 벡터 DB면) 조각이 실제로 인덱스에 있는지 확인합니다."""
+        if self.manifest.hash_of(chunk_id) != digest:
+            return False
+        # 로컬 인덱스는 확인 비용이 작으므로 목록과 인덱스가 어긋났을 때(인덱스 파일 삭제 등) 다시 넣음
+        return not self.deferred or bool(self.vector_store.get_by_ids([chunk_id]))
+
+    def _upsert(self, batch, recorded):
+        """조각 묶음을 임베딩해 벡터 DB에 넣고, 목록에 기록할 (조각 ID, 해시)를 recorded에 추가합니다."""
+        ids = [chunk_id for chunk_id, _, _, _ in batch]
+        texts = [content for _, content, _, _ in batch]
+        metadatas = [metadata for _, _, metadata, _ in batch]
+        if hasattr(self.vector_store, "add_embeddings"):
+            self.vector_store.add_embeddings(texts, self.embedding.embed_documents(texts), metadatas, ids)
+        else:
+            self.vector_store.add_texts(texts, metadatas=metadatas, ids=ids)
+        items = [(chunk_id, digest) for chunk_id, _, _, digest in batch]
+        if self.deferred:
+            recorded.extend(items)
+        else:
+            self.manifest.record(items)
+
+    def _delete(self, chunk_ids, removed):
+        """사라진 조각을 벡터 DB에서 지우고, 목록에서 지울 조각 ID를 removed에 추가합니다."""
+        for start in range(0, len(chunk_ids), self.batch_size):
+            batch = chunk_ids[start:start + self.batch_size]
+            self.vector_store.delete(ids=batch)
+            if self.deferred:
+                removed.extend(batch)
+            else:
+                self.manifest.remove(batch)
+
+    def ingest(self, notices, delete_missing=True):
+        """
+        공지를 적재하고 처리 결과를 반환합니다.
+
+        notices는 공지 딕셔너리의 iterable(제너레이터 가능)이며, delete_missing이면 이번에 없던 조각을 지웁니다.
+        (일부 공지만 넘길 때는 delete_missing=False, 읽지 못한 줄이 있는 NoticeFile이면 지우지 않음)
+        """
+        started = time.perf_counter()
+        report = {"notices": 0, "chunks": 0, "unchanged": 0, "upserted": 0, "deleted": 0}
+        seen_ids = set()
+        batch = []
+        recorded, removed = [], []
+
+        for notice in notices:
+            report["notices"] += 1
+            for chunk_id, content, metadata in build_chunks(notice):
+                report["chunks"] += 1
+                seen_ids.add(chunk_id)
+                digest = content_hash(content, metadata)
+                if self.is_unchanged(chunk_id, digest):
+                    report["unchanged"] += 1
+                    continue
+                batch.append((chunk_id, content, metadata, digest))
+                if len(batch) >= self.batch_size:
+                    self._upsert(batch, recorded)
+                    report["upserted"] += len(batch)
+                    batch = []
+        if batch:
+            self._upsert(batch, recorded)
+            report["upserted"] += len(batch)
+
+        skipped = getattr(notices, "skipped", 0)
+        if delete_missing and skipped:
+            # 읽지 못한 줄의 공지가 사라진 것으로 보여 지워지지 않도록 이번에는 삭제하지 않음
+            print(f"⚠️ 읽지 못한 공지 {skipped}줄이 있어 사라진 조각을 지우지 않습니다.")
+            report["skipped_lines"] = skipped
+        elif delete_missing:
+            missing = self.manifest.missing_from(seen_ids)
+            self._delete(missing, removed)
+            report["deleted"] = len(missing)
+
+        if report["upserted"] or report["deleted"]:
+            if self.deferred:
+                self.vector_store.save()
+                self.manifest.apply(recorded, removed)
+            # 이전 인덱스로 만든 답변 캐시를 버리도록 버전 변경
+            report["index_version"] = bump_index_version()
+
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        report["chunks_per_second"] = round(report["chunks"] / report["seconds"], 1) if report["seconds"] else 0.0
+        return report
+
+
+if __name__ == "__main__":
+    # 사용법: python -m modules.notice_ingest notices.jsonl
+    # 한 줄에 공지 하나: {"id": ..., "title": ..., "content": ..., "url": ..., "date": ...}
+    if len(sys.argv) < 2:
+        print("사용법: python -m modules.notice_ingest <notices.jsonl>")
+        sys.exit(1)
+
+    from modules.config import INDEX_NAME, RAW_EMBEDDING, load_vector_store
+
+    # 공지 조각은 한 번만 임베딩하므로 질문용 임베딩 캐시를 거치지 않음 (캐시가 공지로 가득 차 질문 임베딩이 밀려나지 않도록)
+    vector_store = load_vector_store(embedding=RAW_EMBEDDING)
+    ingestor = NoticeIngestor(vector_store, RAW_EMBEDDING, ChunkManifest(manifest_path(vector_store, INDEX_NAME)))
+    result = ingestor.ingest(iter_notices(sys.argv[1]))
+    print(
+        f"✅ 공지 {result['notices']}개, 조각 {result['chunks']}개 처리 "
+        f"(변경 없음 {result['unchanged']}, 추가/수정 {result['upserted']}, 삭제 {result['deleted']}) "
+        f"- {result['seconds']}초, 초당 {result['chunks_per_second']}개"
+    )
@@ -1,48 +1,66 @@
 # 길찾기 모듈
-import external_apis.kakao_places as kakao_places  # 기존 모듈 재사용
 import external_apis.path_sk as path_sk  # 기존 모듈 재사용
+from modules.place_resolver import PlaceResolver, ResolvedPlace
+from modules.transit_planner import TransitPlanner
 import json
 import re
 
 class PathFinder:
     """경로를 검색하고 결과를 포맷팅하는 클래스"""
     
+    def __init__(self, catalog=None, resolver=None):
+        """PathFinder 초기화 (catalog가 있으면 bus_stops 노선 그래프로 먼저 경로를 찾음)"""
+        self.catalog = catalog
+        self.resolver = resolver or PlaceResolver()
+    
+    def find_local_route(self, x, y):
+        """키오스크 위치에서 (x, y)까지 로컬 노선 그래프로 경로를 찾습니다. 노선망 밖이면 None을 반환합니다."""
+        if self.catalog is None or not self.catalog.is_loaded():
+            return None
+        
+        planner = self.catalog.get_derived("transit_planner", TransitPlanner)
+        return planner.plan(float(path_sk.START_Y), float(path_sk.START_X), float(y), float(x))
+    
     def find_path(self, destination):
-        """목적지까지의 경로를 찾습니다."""
+        """목적지까지의 경로를 찾습니다. (경로 데이터, ResolvedPlace)를 반환합니다."""
         try:
-            result = kakao_places.search_keyword_top1(destination)
+            place = self.resolver.resolve(destination)
+            x, y = place.x, place.y
             
-            print(f"🔍 검색된 장소 결과: {result}")
-            place_name, x, y = result
-            
-            print(f"🔍 검색된 장소: {place_name}, 좌표: ({x}, {y})")
-            directions = path_sk.get_transit_route(x, y)
+            print(f"🔍 검색된 장소: {place.name}, 좌표: ({x}, {y})")
+            directions = self.find_local_route(x, y)
+            if directions is None:
+                # 로컬 노선망으로 갈 수 없는 곳은 SK Open API 사용
+                directions = path_sk.get_transit_route(x, y)
+            else:
+                print("⚡ 로컬 노선 그래프로 경로를 찾았습니다.")
             
             if isinstance(directions, dict) and "error" in directions:
-                return directions['error'], place_name
+                return directions['error'], place
             
-            return directions, place_name
+            return directions, place
         
         except Exception as e:
             print(f"❌ 경로 찾기 중 오류 발생: {str(e)}")
             return f"경로 찾기 중 오류 발생: {str(e)}", None
     
-    def format_path_result(self, route_data, place_name):
-        """경로 데이터를 사용자에게 친숙한 형식으로 변환합니다."""
+    def format_path_result(self, route_data, place):
+        """경로 데이터를 사용자에게 친숙한 형식으로 변환합니다. place는 find_path가 반환한 ResolvedPlace (또는 장소명)입니다."""
         print(f"🔍 경로 데이터: {route_data}")
         
         try:
-            # 장소명으로 좌표 검색
-            result = kakao_places.search_keyword_top1(place_name)
-            if result and len(result) == 3:
-                place_name, x, y = result
-                print(f"🔍 좌표 검색 결과: {place_name}, X: {x}, Y: {y}")
-                coordinates = [[float(x), float(y)]]  # 좌표를 2차원 배열로 변환
+            # find_path에서 찾은 좌표를 그대로 사용 (장소명만 받은 경우에만 조회)
+            if not isinstance(place, ResolvedPlace):
+                place = self.resolver.resolve(place)
+            place_name = place.display_name
+            if place.found:
+                coordinates = [[float(place.x), float(place.y)]]  # 좌표를 2차원 배열로 변환
             else:
                 print("⚠️ 좌표 검색 실패")
                 coordinates = []
         except Exception as e:
             print(f"❌ 좌표 검색 중 오류: {str(e)}")
+            place_name = getattr(place, "display_name", place)
             coordinates = []
         
         # 출발지와 도착지가 너무 가까운 경우
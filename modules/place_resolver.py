@@ -0,0 +1,60 @@
+# 장소 좌표 조회 모듈 (요청 단위 메모)
+import contextvars
+from collections import namedtuple
+from contextlib import contextmanager
+
+import external_apis.kakao_places as kakao_places  # 기존 모듈 재사용
+
+# 요청 하나 동안 유지되는 {검색어: ResolvedPlace} 메모 (요청 밖에서는 None)
+_place_memo = contextvars.ContextVar("place_memo", default=None)
+
+
+class ResolvedPlace(namedtuple("ResolvedPlace", ["query", "name", "x", "y"])):
+    """검색어로 찾은 장소 이름과 좌표 (x: 경도, y: 위도 문자열, 검색 결과가 없으면 None)"""
+    __slots__ = ()
+
+    @property
+    def found(self):
+        """검색 결과가 있는지 여부"""
+        return self.name is not None and self.x is not None and self.y is not None
+
+    @property
+    def display_name(self):
+        """응답에 보여줄 이름 (검색 결과가 없으면 검색어)"""
+        return self.name or self.query
+
+
+@contextmanager
+def place_lookup_scope():
+    """with 문 안에서 같은 검색어는 한 번만 외부 API로 조회합니다. (중첩되면 바깥 메모를 그대로 사용)"""
+    if _place_memo.get() is not None:
+        yield
+        return
+
+    token = _place_memo.set({})
+    try:
+        yield
+    finally:
+        _place_memo.reset(token)
+
+
+class PlaceResolver:
+    """검색어를 장소 좌표로 변환하고, 요청 범위 안에서는 결과를 재사용하는 클래스"""
+
+    def __init__(self, searcher=kakao_places.search_keyword_top1):
+        """PlaceResolver 초기화 (searcher는 검색어를 받아 (place_name, x, y)를 반환)"""
+        self.searcher = searcher
+
+    def resolve(self, query):
+        """검색어에 해당하는 ResolvedPlace를 반환합니다."""
+        memo = _place_memo.get()
+        if memo is not None and query in memo:
+            return memo[query]
+
+        place_name, x, y = self.searcher(query)
+        place = ResolvedPlace(query, place_name, x, y)
+
+        # 요청 범위 안에서만 저장 (StageRunner는 컨텍스트를 복사하므로 작업 스레드에서도 같은 메모를 공유)
+        if memo is not None:
+            memo[query] = place
+        return place
@@ -4,10 +4,17 @@ import external_apis.kakao_places as kakao_places  # 기존 모듈 재사용
 class PlaceSearcher:
     """장소를 검색하는 클래스"""
     
+    def __init__(self, gazetteer=None):
+        """PlaceSearcher 초기화 (gazetteer가 있으면 저장된 검색 결과를 먼저 사용)"""
+        self.gazetteer = gazetteer
+    
     def find_places(self, destination):
         """목적지를 검색하여 최대 3개의 장소를 반환합니다."""
         try:
-            results = kakao_places.search_keyword_top3(destination)
+            if self.gazetteer is not None:
+                results = self.gazetteer.search_top3(destination)
+            else:
+                results = kakao_places.search_keyword_top3(destination)
             
             if not results:
                 print("⚠️ 검색된 장소가 없습니다.")
@@ -1,25 +1,69 @@
 # RAG 체인 관리 모듈
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.chains import create_history_aware_retriever, create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
+from langchain_core.runnables import ConfigurableFieldSpec, RunnablePassthrough
 from langchain_core.runnables.history import RunnableWithMessageHistory
+from modules.history_window import HistoryWindow, CONTEXTUALIZE_HISTORY_TOKENS, QA_HISTORY_TOKENS
+from modules.hybrid_retriever import HybridRetriever
+from modules.local_vector_store import LocalVectorStore
+from modules.deadline import has_budget, skip_stage
+import os
 from datetime import datetime
 import pytz
 import time
 
+# 🔹 검색 방식 (hybrid: BM25 + 벡터 + 재정렬, vector: 벡터 유사도만) - hybrid는 로컬 벡터 DB에서만 사용 가능
+RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
+
+# LLM이 장애로 차단되었을 때 돌려줄 답변
+FALLBACK_ANSWER = (
+    "죄송해요, 지금은 답변을 준비하기 어려워요. 잠시 후 다시 말씀해 주세요. "
+    "버스 노선이나 길찾기 안내는 계속 도와드릴 수 있어요."
+)
+
+class LLMBreakerCallback(BaseCallbackHandler):
+    """체인 안의 LLM 호출 결과만 차단기에 기록하는 콜백 (검색기/벡터 DB 오류는 LLM 장애로 세지 않음)"""
+
+    def __init__(self, breaker):
+        self.breaker = breaker
+
+    def on_llm_end(self, response, **kwargs):
+        self.breaker.record_success()
+
+    def on_llm_error(self, error, **kwargs):
+        self.breaker.record_failure()
+
+
 class RAGChainManager:
     """RAG(Retrieval-Augmented Generation) 체인을 관리하는 클래스"""
     
-    def __init__(self, llm, database, get_session_history_func):
-        """RAGChainManager 초기화"""
+    def __init__(self, llm, database, get_session_history_func, llm_breaker=None,
+                 contextualize_window=None, qa_window=None, answer_cache=None):
+        """
+        RAGChainManager 초기화 (llm_breaker가 있으면 LLM 장애 시 준비된 답변으로 대체)
+        
+        contextualize_window / qa_window는 질문 재구성 / 답변 생성 단계에 넣을 대화 기록을 토큰 예산으로 자릅니다.
+        answer_cache(SemanticAnswerCache)가 있으면 대화 기록이 없는 질문은 이전 답변을 재사용합니다.
+        """
         self.llm = llm
+        self.llm_breaker = llm_breaker
+        self.llm_callbacks = [LLMBreakerCallback(llm_breaker)] if llm_breaker is not None else []
+        self.contextualize_window = contextualize_window or HistoryWindow(CONTEXTUALIZE_HISTORY_TOKENS)
+        self.qa_window = qa_window or HistoryWindow(QA_HISTORY_TOKENS)
+        self.answer_cache = answer_cache
         self.database = database
         self.get_session_history = get_session_history_func
         self.history_aware_retriever = self.get_history_retriever()
+        # 체인은 한 번만 생성하고, 현재 시간은 실행 시 current_date 변수로 주입
         self.rag_chain = self.create_rag_chain()
     
     def get_retriever(self):
-        """데이터베이스 검색기를 반환합니다."""
+        """데이터베이스 검색기를 반환합니다. (로컬 벡터 DB면 BM25와 합친 하이브리드 검색기)"""
+        if RETRIEVAL_MODE == "hybrid" and isinstance(self.database, LocalVectorStore):
+            return HybridRetriever(vector_store=self.database, k=2)
         search_kwargs = {"k": 2}
         return self.database.as_retriever(search_kwargs=search_kwargs)
     
@@ -42,20 +86,20 @@ class RAGChainManager:
             ]
         )
         
-        return create_history_aware_retriever(self.llm, retriever, contextualize_q_prompt)
+        # 질문 재구성에는 최근 대화만 사용
+        return RunnablePassthrough.assign(chat_history=self.contextualize_window.as_input) | create_history_aware_retriever(
+            self.llm, retriever, contextualize_q_prompt
+        )
     
     def get_current_kst_time(self):
         """한국 시간(KST)으로 현재 시간을 반환합니다."""
         kst = pytz.timezone('Asia/Seoul')
         return datetime.now(kst).strftime("%Y-%m-%d %H:%M:%S")
     
-    def get_system_prompt(self, current_date=None):
-        """시스템 프롬프트를 생성합니다."""
-        if current_date is None:
-            current_date = self.get_current_kst_time()
-            
+    def get_system_prompt(self):
+        """시스템 프롬프트 템플릿을 생성합니다. ({current_date}는 실행 시 채워집니다)"""
         return (
-            f"현재 시간은 정확히 {current_date}입니다. 시간 관련 질문이 있을 경우 반드시 이 시간을 기준으로 답변하세요.\n"
+            "현재 시간은 정확히 {current_date}입니다. 시간 관련 질문이 있을 경우 반드시 이 시간을 기준으로 답변하세요.\n"
             "당신은 고흥군 버스정류장에서 사람들과 대화하는 친근한 AI 챗봇입니다.\n"
             "필요에 따라 공지 정보를 활용하여 답변하세요\n"
             "답변 생성시 공지 정보를 포함했다면 반드시 마지막 문장에 한 줄 띄고 url 링크를 포함하세요.\n"
@@ -64,15 +108,12 @@ class RAGChainManager:
             "출력은 오디오로 제공되므로 마크다운 형식(예: `**강조**`, `- 리스트`, `[링크](url)`, ````코드````)을 사용하지 말고, 평범한 일상 대화처럼 부드럽고 자연스럽게 문장을 구성하세요.\n"
             "공지사항을 설명할 때는 반드시 중요한 내용만 짧게 한 문장으로 요약하세요.\n"
             "어려운 단어나 기술적인 표현을 피하고, 부드럽고 따뜻한 말투를 사용하세요.\n"
-            f"다시 한번 강조하지만, 현재 정확한 시간은 {current_date}입니다.\n"
+            "다시 한번 강조하지만, 현재 정확한 시간은 {current_date}입니다.\n"
         )
     
-    def create_rag_chain(self, current_date=None):
+    def create_rag_chain(self):
         """RAG 체인을 생성합니다."""
-        if current_date is None:
-            current_date = self.get_current_kst_time()
-            
-        system_prompt = self.get_system_prompt(current_date)
+        system_prompt = self.get_system_prompt()
         
         qa_prompt = ChatPromptTemplate.from_messages(
             [
@@ -83,28 +124,96 @@ class RAGChainManager:
             ]
         )
         
-        question_answer_chain = create_stuff_documents_chain(self.llm, qa_prompt)
+        # 답변 생성에는 토큰 예산 안의 대화 기록만 사용 (저장된 기록은 그대로 유지)
+        question_answer_chain = RunnablePassthrough.assign(chat_history=self.qa_window.as_input) | create_stuff_documents_chain(
+            self.llm, qa_prompt
+        )
         rag_chain = create_retrieval_chain(self.history_aware_retriever, question_answer_chain)
         
         return RunnableWithMessageHistory(
             rag_chain,
-            self.get_session_history,
+            self.resolve_session_history,
             input_messages_key="input",
             history_messages_key="chat_history",
             output_messages_key="answer",
+            # 요청에서 이미 읽은 대화 기록을 config로 넘겨 공유 저장소에서 다시 읽지 않도록 함
+            history_factory_config=[
+                ConfigurableFieldSpec(id="session_id", annotation=str, name="Session ID", default=""),
+                ConfigurableFieldSpec(id="session_history", annotation=object, name="Session history", default=None),
+            ],
         ).pick('answer')
     
+    def resolve_session_history(self, session_id, session_history):
+        """체인에 넘긴 대화 기록이 있으면 그대로 사용하고, 없으면 세션 ID로 읽습니다."""
+        return session_history if session_history is not None else self.get_session_history(session_id)
+    
     def get_ai_response(self, user_message, session_id):
         """RAG 체인을 사용하여 사용자 메시지에 대한 응답을 생성합니다."""
         # 현재 시간 정보 가져오기 (모든 질문에 대해 현재 시간 저장, 한국 시간 사용)
         current_date = self.get_current_kst_time()
         
-        # 모든 질문에 대해 항상 최신 시간 정보를 포함한 RAG 체인 생성
-        self.rag_chain = self.create_rag_chain(current_date)
+        # OpenAI가 장애로 차단되어 있으면 질문 임베딩(답변 캐시)과 LLM 모두 호출하지 않고 준비된 답변 반환
+        if self.llm_breaker is not None and self.llm_breaker.is_open():
+            return iter([FALLBACK_ANSWER])
+        
+        # 대화 기록은 요청마다 한 번만 읽어 답변 캐시와 체인에서 함께 사용
+        history = self.get_session_history(session_id)
+        
+        # 대화 기록이 없는 질문(첫 질문)만 답변 캐시 사용 (이전 대화에 따라 답이 달라질 수 있음)
+        vector = None
+        if self.answer_cache is not None:
+            if history.messages:
+                self.answer_cache.skip()
+            elif not has_budget():
+                # 처리 시간이 부족하면 질문 임베딩을 기다리지 않고 바로 답변 생성
+                skip_stage("answer_cache")
+                self.answer_cache.skip("low_budget")
+            else:
+                cached_answer, vector = self.answer_cache.lookup(user_message)
+                if cached_answer is not None:
+                    history.add_messages([HumanMessage(user_message), AIMessage(cached_answer)])
+                    return iter([cached_answer])
+        
+        # 미리 만들어 둔 체인에 최신 시간 정보를 입력 변수로 전달하여 응답 생성
+        # LLM이 장애로 차단되었으면 호출하지 않고 준비된 답변 반환
+        if self.llm_breaker is not None and not self.llm_breaker.allow():
+            return iter([FALLBACK_ANSWER])
         
-        # 시스템 프롬프트에 시간 정보가 포함되어 있으므로, 추가 처리 없이 바로 응답 생성
         ai_response_stream = self.rag_chain.stream(
-            {"input": user_message},
-            config={"configurable": {"session_id": session_id}},
+            {"input": user_message, "current_date": current_date},
+            config={
+                "configurable": {"session_id": session_id, "session_history": history},
+                "callbacks": self.llm_callbacks,
+            },
         )
-        return ai_response_stream
\ No newline at end of file
+        if self.llm_breaker is not None:
+            ai_response_stream = self.guard_stream(ai_response_stream)
+        if self.answer_cache is not None and vector is not None:
+            ai_response_stream = self.cache_stream(ai_response_stream, user_message, vector)
+        return ai_response_stream
+    
+    def cache_stream(self, ai_response_stream, user_message, vector):
+        """응답 스트림을 그대로 전달하고, 끝까지 생성된 답변은 답변 캐시에 저장합니다."""
+        chunks = []
+        for chunk in ai_response_stream:
+            chunks.append(chunk)
+            yield chunk
+        answer = "".join(chunks)
+        if answer and answer != FALLBACK_ANSWER:
+            self.answer_cache.store(user_message, answer, vector)
+    
+    def guard_stream(self, ai_response_stream):
+        """
+        첫 조각 전에 실패하면 준비된 답변으로 대체합니다.
+        (차단기 기록은 LLMBreakerCallback이 LLM 호출에 대해서만 수행)
+        """
+        started = False
+        try:
+            for chunk in ai_response_stream:
+                started = True
+                yield chunk
+        except Exception as e:
+            if started:
+                raise
+            print(f"❌ 응답 생성 실패, 준비된 답변으로 대체: {str(e)}")
+            yield FALLBACK_ANSWER
\ No newline at end of file
@@ -0,0 +1,35 @@
+# 키오스크 정류장 기준 도달 가능 정류장 색인 모듈
+class ReachabilityIndex:
+    """키오스크 정류장에서 노선 진행 방향(node_order)으로 갈 수 있는 정류장과 정류장 수를 미리 계산하는 클래스"""
+
+    def __init__(self, rows, origin_node_ids):
+        """bus_stops 행(BusStopRow) 목록과 출발 정류장 ID 목록으로 색인을 생성합니다."""
+        self.origin_node_ids = set(origin_node_ids)
+        # 도착 정류장 ID → {버스 번호: 최소 이동 정류장 수}
+        self.reachable = {}
+
+        routes = {}
+        for row in rows:
+            routes.setdefault(row.route_id, []).append((row.node_order, row.node_id, row.bus_number))
+
+        for stops in routes.values():
+            stops.sort()
+            for origin_pos, (_, node_id, _) in enumerate(stops):
+                if node_id not in self.origin_node_ids:
+                    continue
+                # 출발 정류장 다음부터 노선 끝까지는 같은 방향으로 갈 수 있음
+                for hops, (_, dest_id, bus_number) in enumerate(stops[origin_pos + 1:], start=1):
+                    if dest_id in self.origin_node_ids:
+                        continue
+                    buses = self.reachable.setdefault(dest_id, {})
+                    if hops < buses.get(bus_number, float("inf")):
+                        buses[bus_number] = hops
+
+    def lookup(self, node_ids):
+        """도착 정류장 후보들로 갈 수 있는 {버스 번호: 최소 이동 정류장 수}를 반환합니다."""
+        result = {}
+        for node_id in node_ids:
+            for bus_number, hops in self.reachable.get(node_id, {}).items():
+                if hops < result.get(bus_number, float("inf")):
+                    result[bus_number] = hops
+        return result
@@ -0,0 +1,104 @@
+# 파이프라인 단계 실행 모듈
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 🔹 단계별 동시 실행 한도 (환경 변수로 조정 가능)
+DEFAULT_STAGE_LIMITS = {
+    "intent": int(os.getenv("STAGE_LIMIT_INTENT", "16")),   # 의도 감지 (LLM)
+    "rag": int(os.getenv("STAGE_LIMIT_RAG", "16")),         # 일반 대화 (LLM + 벡터 DB)
+    "place": int(os.getenv("STAGE_LIMIT_PLACE", "16")),     # 장소 찾기 (카카오)
+    "path": int(os.getenv("STAGE_LIMIT_PATH", "8")),        # 길찾기 (카카오 + SK)
+    "bus": int(os.getenv("STAGE_LIMIT_BUS", "8")),          # 버스 노선 (카카오 + 공공데이터 + MySQL)
+    "arrival": int(os.getenv("STAGE_LIMIT_ARRIVAL", "4")),  # 버스 도착 정보 (공공데이터)
+    "session": int(os.getenv("STAGE_LIMIT_SESSION", "8")),  # 대화 기록 저장소 (SQLite/MySQL)
+}
+
+
+class StageRunner:
+    """블로킹 호출을 이벤트 루프 밖의 스레드 풀에서 실행하는 클래스"""
+
+    def __init__(self, max_workers=None, stage_limits=None):
+        """스레드 풀과 단계별 세마포어 설정을 초기화합니다."""
+        self.max_workers = max_workers or int(os.getenv("STAGE_MAX_WORKERS", "64"))
+        self.stage_limits = dict(DEFAULT_STAGE_LIMITS)
+        if stage_limits:
+            self.stage_limits.update(stage_limits)
+
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage")
+        self._semaphores = {}
+        # 단계별 실행 중인 작업 수 (이벤트 루프에서만 변경)
+        self._in_flight = {}
+
+    def _get_semaphore(self, stage):
+        """단계별 세마포어를 반환합니다. (이벤트 루프 안에서 생성)"""
+        if stage not in self._semaphores:
+            limit = self.stage_limits.get(stage, self.max_workers)
+            self._semaphores[stage] = asyncio.Semaphore(limit)
+        return self._semaphores[stage]
+
+    async def run(self, stage, func, *args, **kwargs):
+        """지정한 단계의 동시 실행 한도 안에서 블로킹 함수를 스레드 풀로 실행합니다."""
+        loop = asyncio.get_running_loop()
+        # 요청 컨텍스트(contextvars)를 작업 스레드로 그대로 전달
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+
+        async with self._get_semaphore(stage):
+            self._in_flight[stage] = self._in_flight.get(stage, 0) + 1
+            try:
+                return await loop.run_in_executor(self.executor, call)
+            finally:
+                self._in_flight[stage] -= 1
+
+    async def iterate(self, stage, iterable):
+        """
+        블로킹 이터레이터(예: LLM 토큰 스트림)를 스레드 풀에서 한 항목씩 꺼내 비동기로 전달합니다.
+
+        중간에 멈추면(SSE 연결 끊김 등) 이터레이터의 close()를 호출해 남은 HTTP 스트림을 정리한 뒤 슬롯을 반납합니다.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        iterator = iter(iterable)
+        done = object()
+        # 취소되어도 진행 중인 next()는 작업 스레드에서 계속 실행되므로, close()는 그 호출이 끝난 뒤에 실행
+        lock = threading.Lock()
+
+        def step():
+            with lock:
+                return context.run(next, iterator, done)
+
+        def close():
+            with lock:
+                context.run(iterator.close)
+
+        async with self._get_semaphore(stage):
+            self._in_flight[stage] = self._in_flight.get(stage, 0) + 1
+            try:
+                while True:
+                    item = await loop.run_in_executor(self.executor, step)
+                    if item is done:
+                        break
+                    yield item
+            finally:
+                try:
+                    if hasattr(iterator, "close"):
+                        await loop.run_in_executor(self.executor, close)
+                except Exception as e:
+                    print(f"⚠️ '{stage}' 스트림을 닫지 못했습니다: {str(e)}")
+                finally:
+                    self._in_flight[stage] -= 1
+
+    def stats(self):
+        """단계별 한도와 현재 사용 중인 슬롯 수를 반환합니다."""
+        return {
+            stage: {"limit": limit, "in_use": self._in_flight.get(stage, 0)}
+            for stage, limit in self.stage_limits.items()
+        }
+
+    def shutdown(self):
+        """스레드 풀을 종료합니다."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
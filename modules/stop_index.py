@@ -0,0 +1,119 @@
+# 버스 정류장 공간 색인 모듈
+import math
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+
+# 격자 한 칸의 크기 (위경도 기준 약 0.005도 ≒ 500m)
+DEFAULT_CELL_DEG = 0.005
+
+
+def haversine_m(lat, lon, lats, lons):
+    """한 지점과 여러 지점 사이의 거리(m)를 계산합니다."""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - np.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class BusStopIndex:
+    """bus_stops 테이블의 정류장 좌표를 격자로 나눠 반경/최근접 검색을 하는 클래스"""
+
+    def __init__(self, rows, cell_deg=DEFAULT_CELL_DEG):
+        """(node_id, node_name, latitude, longitude) 행 목록으로 색인을 생성합니다."""
+        stops = {}
+        for node_id, node_name, latitude, longitude in rows:
+            if node_id is None or latitude is None or longitude is None:
+                continue
+            # 같은 정류장이 노선마다 중복되어 있으므로 node_id 기준으로 하나만 저장
+            stops.setdefault(node_id, (node_name, float(latitude), float(longitude)))
+
+        self.node_ids = list(stops.keys())
+        self.node_names = [name for name, _, _ in stops.values()]
+        self.lats = np.array([lat for _, lat, _ in stops.values()], dtype=np.float64)
+        self.lons = np.array([lon for _, _, lon in stops.values()], dtype=np.float64)
+        self.cell_deg = cell_deg
+
+        # 격자 칸 → 정류장 번호 배열
+        cells = {}
+        for idx, (lat, lon) in enumerate(zip(self.lats, self.lons)):
+            cells.setdefault(self._cell(lat, lon), []).append(idx)
+        self.cells = {cell: np.array(indices, dtype=np.int32) for cell, indices in cells.items()}
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def _cell(self, lat, lon):
+        """좌표가 속한 격자 칸을 반환합니다."""
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def _candidates(self, lat, lon, ring):
+        """중심 칸에서 ring 칸 이내에 있는 정류장 번호를 모읍니다."""
+        center_row, center_col = self._cell(lat, lon)
+        if (2 * ring + 1) ** 2 >= len(self.cells):
+            # 살펴볼 칸이 실제 칸 수보다 많으면 실제 칸만 거리 조건으로 거름
+            keys = [
+                (row, col) for row, col in self.cells
+                if abs(row - center_row) <= ring and abs(col - center_col) <= ring
+            ]
+        else:
+            keys = [
+                (row, col)
+                for row in range(center_row - ring, center_row + ring + 1)
+                for col in range(center_col - ring, center_col + ring + 1)
+                if (row, col) in self.cells
+            ]
+        if not keys:
+            return np.empty(0, dtype=np.int32)
+        return np.concatenate([self.cells[key] for key in keys])
+
+    def _ring_for_radius(self, lat, radius_m):
+        """반경을 모두 덮는 데 필요한 격자 칸 수를 계산합니다."""
+        # 경도 방향 칸은 위도가 높을수록 좁아지므로 더 작은 쪽 기준으로 계산
+        cell_m = self.cell_deg * math.pi / 180 * EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 0.1)
+        return int(math.ceil(radius_m / cell_m))
+
+    def within_radius(self, lat, lon, radius_m):
+        """반경(m) 안의 정류장을 가까운 순서로 (node_id, node_name, 거리m) 목록으로 반환합니다."""
+        candidates = self._candidates(lat, lon, self._ring_for_radius(lat, radius_m))
+        if candidates.size == 0:
+            return []
+
+        distances = haversine_m(lat, lon, self.lats[candidates], self.lons[candidates])
+        mask = distances <= radius_m
+        order = np.argsort(distances[mask], kind="stable")
+        hits = candidates[mask][order]
+        return [(self.node_ids[i], self.node_names[i], float(d)) for i, d in zip(hits, distances[mask][order])]
+
+    def nearest(self, lat, lon, k=10, max_distance_m=None):
+        """가까운 정류장 k개를 (node_id, node_name, 거리m) 목록으로 반환합니다."""
+        if max_distance_m is not None:
+            return self.within_radius(lat, lon, max_distance_m)[:k]
+        if len(self) == 0 or k <= 0:
+            return []
+
+        # 후보가 k개 이상 모일 때까지 살펴볼 격자 범위를 넓힘
+        ring = 1
+        while True:
+            candidates = self._candidates(lat, lon, ring)
+            if candidates.size >= k or candidates.size == len(self):
+                break
+            ring *= 2
+
+        distances = haversine_m(lat, lon, self.lats[candidates], self.lons[candidates])
+        kth_distance = float(np.partition(distances, min(k, distances.size) - 1)[min(k, distances.size) - 1])
+
+        # k번째 거리보다 가까운 정류장이 바깥 칸에 있을 수 있으면 그 반경까지 다시 검색
+        needed_ring = self._ring_for_radius(lat, kth_distance)
+        if needed_ring > ring:
+            candidates = self._candidates(lat, lon, needed_ring)
+            distances = haversine_m(lat, lon, self.lats[candidates], self.lons[candidates])
+
+        order = np.argsort(distances, kind="stable")[:k]
+        return [(self.node_ids[candidates[i]], self.node_names[candidates[i]], float(distances[i])) for i in order]
+
+    def nearby_stations(self, lat, lon, radius_m, limit=10):
+        """반경 안의 정류장을 원격 API(getCrdntPrxmtSttnList)와 같은 (정류장 이름, 정류장 ID) 목록으로 반환합니다."""
+        return [(node_name, node_id) for node_id, node_name, _ in self.within_radius(lat, lon, radius_m)[:limit]]
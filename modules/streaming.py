@@ -0,0 +1,55 @@
+# 스트리밍 응답 처리 모듈
+import json
+import re
+
+# 문장 끝으로 볼 부호 (마침표, 물음표, 느낌표, 말줄임표) 뒤에 공백/줄바꿈이 오면 문장 경계로 판단
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?。…])\s+|\n+")
+
+# 너무 짧은 조각은 TTS 품질을 위해 다음 문장과 합쳐서 보냄
+MIN_SENTENCE_LENGTH = 5
+
+
+class SentenceBuffer:
+    """토큰 조각을 모아 완성된 문장 단위로 내보내는 클래스"""
+
+    def __init__(self, min_length=MIN_SENTENCE_LENGTH):
+        """버퍼 초기화"""
+        self.buffer = ""
+        self.min_length = min_length
+
+    def feed(self, chunk):
+        """토큰 조각을 추가하고, 완성된 문장 목록을 반환합니다."""
+        self.buffer += chunk
+        sentences = []
+
+        while True:
+            match = SENTENCE_END_PATTERN.search(self.buffer)
+            if not match:
+                break
+
+            sentence = self.buffer[:match.start()].strip()
+            if len(sentence) < self.min_length:
+                # 짧은 조각(예: "네.")은 다음 문장 경계까지 기다림
+                next_match = SENTENCE_END_PATTERN.search(self.buffer, match.end())
+                if not next_match:
+                    break
+                sentence = self.buffer[:next_match.start()].strip()
+                match = next_match
+
+            self.buffer = self.buffer[match.end():]
+            if sentence:
+                sentences.append(sentence)
+
+        return sentences
+
+    def flush(self):
+        """남아 있는 문장을 반환하고 버퍼를 비웁니다."""
+        sentence = self.buffer.strip()
+        self.buffer = ""
+        return [sentence] if sentence else []
+
+
+def format_sse(event, data):
+    """Server-Sent Events 형식의 메시지 문자열을 만듭니다."""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
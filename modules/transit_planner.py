@@ -0,0 +1,212 @@
+# 로컬 대중교통 경로 탐색 모듈 (bus_stops 노선 그래프 기반)
+import heapq
+import math
+import os
+from itertools import count
+
+from modules.stop_index import BusStopIndex
+
+# 🔹 경로 탐색 비용 설정 (초 단위로 환산)
+WALK_SPEED_MPS = 1.2          # 도보 속도 (m/s)
+WALK_DETOUR_FACTOR = 1.3      # 직선 거리 대비 실제 도보 거리 보정
+BUS_SPEED_MPS = 30 / 3.6      # 버스 평균 속도 (30km/h)
+BUS_DWELL_SECONDS = 20        # 정류장마다 정차 시간
+BOARD_PENALTY_SECONDS = 600   # 버스 탑승(환승) 시 평균 대기 시간
+
+# 🔹 도보 구간 반경 설정 (m)
+ACCESS_RADIUS_M = float(os.getenv("PLANNER_ACCESS_RADIUS_M", "800"))     # 출발지/도착지 ↔ 정류장
+TRANSFER_RADIUS_M = float(os.getenv("PLANNER_TRANSFER_RADIUS_M", "300"))  # 정류장 ↔ 정류장 환승
+TOO_CLOSE_M = float(os.getenv("PLANNER_TOO_CLOSE_M", "500"))              # 이보다 가까우면 도보 안내
+MIN_WALK_LEG_M = 20                                                         # 이보다 짧은 도보 구간은 생략
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """두 좌표 사이의 거리(m)를 계산합니다."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def walk_seconds(meters):
+    """직선 거리를 도보 소요 시간(초)으로 환산합니다."""
+    return meters * WALK_DETOUR_FACTOR / WALK_SPEED_MPS
+
+
+class TransitPlanner:
+    """bus_stops의 노선별 정류장 순서로 그래프를 만들어 출발지 → 목적지 경로를 찾는 클래스"""
+
+    def __init__(self, rows):
+        """bus_stops 행(BusStopRow) 목록으로 정류장/노선 그래프를 생성합니다."""
+        self.stops = {}         # node_id → (정류장 이름, 위도, 경도)
+        self.route_bus = {}     # route_id → 버스 번호
+        self.ride_edges = {}    # node_id → [(route_id, 다음 node_id, 소요 시간)]
+        self.walk_edges = {}    # node_id → [(근처 node_id, 소요 시간)]
+
+        routes = {}
+        for row in rows:
+            # 좌표가 없는 정류장은 건너뜀 (노선에서는 앞뒤 정류장이 바로 이어짐)
+            if row.node_id is None or row.latitude is None or row.longitude is None:
+                continue
+            self.stops.setdefault(row.node_id, (row.node_name, float(row.latitude), float(row.longitude)))
+            self.route_bus[row.route_id] = row.bus_number
+            routes.setdefault(row.route_id, []).append((row.node_order, row.node_id))
+
+        # 같은 노선에서 연속한 정류장 사이를 버스 구간으로 연결
+        for route_id, stops in routes.items():
+            stops.sort()
+            for (_, from_id), (_, to_id) in zip(stops, stops[1:]):
+                if from_id == to_id:
+                    continue
+                _, lat1, lon1 = self.stops[from_id]
+                _, lat2, lon2 = self.stops[to_id]
+                seconds = distance_m(lat1, lon1, lat2, lon2) / BUS_SPEED_MPS + BUS_DWELL_SECONDS
+                self.ride_edges.setdefault(from_id, []).append((route_id, to_id, seconds))
+
+        self.stop_index = BusStopIndex(
+            (node_id, name, lat, lon) for node_id, (name, lat, lon) in self.stops.items()
+        )
+
+        # 가까운 정류장끼리는 걸어서 환승할 수 있도록 연결
+        for node_id, (_, lat, lon) in self.stops.items():
+            for other_id, _, meters in self.stop_index.within_radius(lat, lon, TRANSFER_RADIUS_M):
+                if other_id != node_id:
+                    self.walk_edges.setdefault(node_id, []).append((other_id, walk_seconds(meters)))
+
+    def plan(self, start_lat, start_lon, end_lat, end_lon):
+        """
+        출발 좌표에서 도착 좌표까지의 경로를 찾습니다.
+
+        Returns:
+            list: (경로 설명, [(x, y), ...]) 튜플 목록 - path_sk.extract_route_text와 같은 형식
+            dict: {"error": "출발지와 도착지가 너무 가까움"} - 걸어갈 수 있는 거리인 경우
+            None: 노선망 밖이라 로컬에서 찾을 수 없는 경우 (외부 API로 대체)
+        """
+        if distance_m(start_lat, start_lon, end_lat, end_lon) < TOO_CLOSE_M:
+            return {"error": "출발지와 도착지가 너무 가까움"}
+
+        access = self.stop_index.within_radius(start_lat, start_lon, ACCESS_RADIUS_M)
+        egress = {
+            node_id: walk_seconds(meters)
+            for node_id, _, meters in self.stop_index.within_radius(end_lat, end_lon, ACCESS_RADIUS_M)
+        }
+        if not access or not egress:
+            return None
+
+        path = self._search(access, egress)
+        if path is None:
+            return None
+        return self._build_legs(path, (start_lat, start_lon), (end_lat, end_lon))
+
+    def _search(self, access, egress):
+        """다익스트라 탐색으로 가장 빠른 (정류장, 노선) 상태 경로를 찾습니다."""
+        # 상태: (node_id, 타고 있는 route_id) - 출발 직후는 None, 내려서 환승 중이면 "하차"
+        tie = count()
+        best = {}
+        previous = {}
+        heap = []
+
+        for node_id, _, meters in access:
+            state = (node_id, None)
+            seconds = walk_seconds(meters)
+            if seconds < best.get(state, math.inf):
+                best[state] = seconds
+                previous[state] = None
+                heapq.heappush(heap, (seconds, next(tie), state))
+
+        best_total = math.inf
+        best_final = None
+
+        while heap:
+            seconds, _, state = heapq.heappop(heap)
+            if seconds > best.get(state, math.inf) or seconds >= best_total:
+                continue
+            node_id, route_id = state
+
+            # 버스를 한 번 이상 탄 상태에서만 도착 처리 (도보만으로 가는 경로는 TOO_CLOSE에서 처리)
+            if route_id is not None and node_id in egress:
+                total = seconds + egress[node_id]
+                if total < best_total:
+                    best_total, best_final = total, state
+
+            transitions = []
+            for next_route, next_id, ride in self.ride_edges.get(node_id, []):
+                penalty = 0 if next_route == route_id else BOARD_PENALTY_SECONDS
+                transitions.append(((next_id, next_route), seconds + ride + penalty))
+            if route_id is not None:
+                # 내려서 근처 정류장으로 걸어가 환승
+                transitions.append(((node_id, "하차"), seconds))
+            if route_id == "하차":
+                for next_id, walk in self.walk_edges.get(node_id, []):
+                    transitions.append(((next_id, "하차"), seconds + walk))
+
+            for next_state, next_seconds in transitions:
+                if next_seconds < best.get(next_state, math.inf):
+                    best[next_state] = next_seconds
+                    previous[next_state] = state
+                    heapq.heappush(heap, (next_seconds, next(tie), next_state))
+
+        if best_final is None:
+            return None
+
+        path = []
+        state = best_final
+        while state is not None:
+            path.append(state)
+            state = previous[state]
+        path.reverse()
+        return path
+
+    def _stop_point(self, node_id):
+        """정류장의 (x, y) 좌표를 반환합니다."""
+        _, lat, lon = self.stops[node_id]
+        return (lon, lat)
+
+    def _build_legs(self, path, start, end):
+        """상태 경로를 (경로 설명, 좌표 목록) 구간으로 묶습니다."""
+        legs = []
+        first_stop = path[0][0]
+        _, first_lat, first_lon = self.stops[first_stop]
+        if distance_m(start[0], start[1], first_lat, first_lon) >= MIN_WALK_LEG_M:
+            legs.append((
+                f"출발지에서 {self.stops[first_stop][0]}까지 도보로 이동",
+                [(start[1], start[0]), self._stop_point(first_stop)],
+            ))
+
+        idx = 0
+        while idx < len(path) - 1:
+            node_id, _ = path[idx]
+            next_id, next_route = path[idx + 1]
+
+            if next_route not in (None, "하차"):
+                # 같은 노선을 연속으로 탄 구간은 하나의 버스 구간으로 묶음
+                stops = [node_id, next_id]
+                idx += 1
+                while idx < len(path) - 1 and path[idx + 1][1] == next_route:
+                    idx += 1
+                    stops.append(path[idx][0])
+                bus_number = self.route_bus[next_route]
+                legs.append((
+                    f"{self.stops[stops[0]][0]}에서 {self.stops[stops[-1]][0]}까지 {bus_number}번 버스 이용",
+                    [self._stop_point(stop) for stop in stops],
+                ))
+            elif next_id != node_id:
+                legs.append((
+                    f"{self.stops[node_id][0]}에서 {self.stops[next_id][0]}까지 도보로 이동",
+                    [self._stop_point(node_id), self._stop_point(next_id)],
+                ))
+                idx += 1
+            else:
+                idx += 1
+
+        last_stop = path[-1][0]
+        _, last_lat, last_lon = self.stops[last_stop]
+        if distance_m(last_lat, last_lon, end[0], end[1]) >= MIN_WALK_LEG_M:
+            legs.append((
+                f"{self.stops[last_stop][0]}에서 도착지까지 도보로 이동",
+                [self._stop_point(last_stop), (end[1], end[0])],
+            ))
+        return legs
@@ -0,0 +1,20 @@
+--
+-- Table structure for table `chat_sessions`, `chat_messages`
+-- (CHAT_HISTORY_BACKEND=mysql 일 때 여러 API 워커가 공유하는 대화 기록)
+--
+
+CREATE TABLE IF NOT EXISTS chat_sessions (
+  session_id varchar(64) NOT NULL,
+  last_used double NOT NULL,
+  PRIMARY KEY (session_id),
+  KEY idx_chat_sessions_last_used (last_used)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS chat_messages (
+  id bigint NOT NULL AUTO_INCREMENT,
+  session_id varchar(64) NOT NULL,
+  message text NOT NULL,
+  created_at double NOT NULL,
+  PRIMARY KEY (id),
+  KEY idx_chat_messages_session (session_id, id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import uuid
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 부하 테스트 대상 서버 (docker compose 기준 9000 포트)
+BASE_URL = os.getenv("CHATBOT_BASE_URL", "http://localhost:9000")
+CONCURRENCY_LEVELS = [1, 5, 10, 20, 40]
+REQUESTS_PER_CLIENT = 3
+
+# 의도별로 섞어서 전송 (LLM, 카카오, SK, 공공데이터, MySQL 경로를 모두 통과)
+MESSAGES = [
+    "고흥터미널 가는 버스 알려줘",
+    "고흥군청까지 가는 길 알려줘",
+    "근처 편의점 어디야",
+    "오늘 날씨 어때?",
+]
+
+def send_chat(client_idx):
+    """한 클라이언트(키오스크)가 순서대로 메시지를 보내고 요청별 지연 시간(초)을 반환합니다."""
+    session_id = str(uuid.uuid4())
+    latencies = []
+    errors = 0
+
+    for i in range(REQUESTS_PER_CLIENT):
+        message = MESSAGES[(client_idx + i) % len(MESSAGES)]
+        start = time.perf_counter()
+        try:
+            response = requests.post(
+                f"{BASE_URL}/chat",
+                json={"message": message, "session_id": session_id},
+                timeout=120,
+            )
+            if response.status_code != 200:
+                errors += 1
+        except requests.exceptions.RequestException:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    return latencies, errors
+
+def percentile(values, pct):
+    """정렬된 값 목록에서 백분위 값을 계산합니다."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    idx = min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))
+    return values[idx]
+
+def run_level(concurrency):
+    """주어진 동시 접속 수로 부하를 걸고 지연 시간 통계를 반환합니다."""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send_chat, range(concurrency)))
+
+    latencies = [lat for lats, _ in results for lat in lats]
+    errors = sum(err for _, err in results)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+if __name__ == "__main__":
+    levels = [int(arg) for arg in sys.argv[1:]] or CONCURRENCY_LEVELS
+
+    print(f"🚀 /chat 부하 테스트 시작: {BASE_URL}")
+    print(f"{'동시접속':>8} {'요청수':>6} {'오류':>4} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8}")
+
+    stats = []
+    for level in levels:
+        result = run_level(level)
+        stats.append(result)
+        print(f"{result['concurrency']:>8} {result['requests']:>6} {result['errors']:>4} "
+              f"{result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f}")
+
+    # 이벤트 루프가 막히지 않는다면 p99는 동시접속 수에 비례해 늘어나지 않아야 합니다
+    baseline = stats[0]["p99"]
+    worst = max(stats, key=lambda r: r["p99"])
+    ratio = worst["p99"] / baseline if baseline else 0.0
+    print(f"\n📈 p99 증가 배율 (최대/기준): {ratio:.2f}x (동시접속 {worst['concurrency']})")
+    if ratio > 2.0:
+        print("⚠️ 동시접속 증가에 따라 p99 지연이 크게 늘었습니다. 블로킹 호출이 남아 있는지 확인하세요.")
+    else:
+        print("✅ 동시접속이 늘어나도 p99 지연이 일정하게 유지됩니다.")
@@ -0,0 +1,99 @@
+import sys
+import time
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from modules.chat_history import ChatHistoryManager
+from modules.history_window import HistoryWindow, count_message_tokens
+from modules.rag_chain import RAGChainManager
+
+# 키오스크에서 길게 이어지는 대화를 흉내 낸 30턴 벤치마크 (외부 API 없음)
+NUM_TURNS = 30
+# 가짜 LLM은 입력 길이와 상관없이 즉시 답하므로, 프롬프트 1천 토큰당 지연(ms)을 더해 실제 API처럼 흉내 냄
+SIMULATED_MS_PER_1K_TOKENS = 80
+
+QUESTIONS = [
+    "유자축제 언제 열려요?", "거기까지 가는 버스 있어요?", "군청 민원실은 몇 시까지 해요?",
+    "주말에도 열어요?", "근처에 약국 있나요?", "오늘 날씨 어때요?",
+]
+ANSWER = (
+    "네, 고흥군 유자축제는 매년 11월에 고흥읍 일원에서 열려요. 축제 기간에는 임시 버스도 운행하니 "
+    "정류장 안내판을 함께 확인해 보세요. 더 궁금한 점이 있으면 편하게 물어봐 주세요."
+)
+
+
+class RecordingChatModel(FakeListChatModel):
+    """받은 프롬프트의 토큰 수를 단계별로 기록하는 가짜 LLM"""
+
+    records: list = []
+
+    def _record(self, messages):
+        tokens = count_message_tokens(messages)
+        stage = "contextualize" if "standalone question" in str(messages[0].content) else "qa"
+        self.records.append((stage, tokens))
+        time.sleep(tokens / 1000 * SIMULATED_MS_PER_1K_TOKENS / 1000)
+
+    def _call(self, messages, *args, **kwargs):
+        self._record(messages)
+        return super()._call(messages, *args, **kwargs)
+
+    def _stream(self, messages, *args, **kwargs):
+        self._record(messages)
+        return super()._stream(messages, *args, **kwargs)
+
+
+def run_conversation(label, contextualize_window, qa_window, turns):
+    """turns턴 대화를 진행하고 턴별 프롬프트 토큰 수와 응답 시간을 반환합니다."""
+    llm = RecordingChatModel(responses=[ANSWER], records=[])
+    database = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=64))
+    database.add_texts([
+        "고흥군 유자축제는 11월에 열립니다.",
+        "고흥군청 민원실 운영 시간은 평일 오전 9시부터 오후 6시까지입니다.",
+    ])
+    # 저장소 자체의 메시지 한도는 풀어 두고, 윈도우 효과만 비교
+    history_manager = ChatHistoryManager(max_messages=turns * 2)
+    manager = RAGChainManager(
+        llm, database, history_manager.get_session_history,
+        contextualize_window=contextualize_window, qa_window=qa_window,
+    )
+
+    rows = []
+    for turn in range(turns):
+        llm.records.clear()
+        start = time.perf_counter()
+        "".join(manager.get_ai_response(QUESTIONS[turn % len(QUESTIONS)], "bench"))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        tokens = dict.fromkeys(("contextualize", "qa"), 0)
+        for stage, count in llm.records:
+            tokens[stage] += count
+        rows.append((tokens["contextualize"], tokens["qa"], elapsed_ms))
+    return label, rows
+
+
+if __name__ == "__main__":
+    # 사용법: 저장소 루트에서 python -m tests.history_window_bench [턴 수]
+    # (modules 패키지를 불러오므로 python tests/history_window_bench.py로 실행하려면 PYTHONPATH=. 필요)
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_TURNS
+    results = [
+        run_conversation("전체 기록", HistoryWindow(0), HistoryWindow(0), turns),
+        run_conversation(
+            "윈도우 (요약 없음)",
+            HistoryWindow(300, use_summary=False), HistoryWindow(800, use_summary=False), turns,
+        ),
+        run_conversation("윈도우 + 요약", HistoryWindow(300), HistoryWindow(800), turns),
+    ]
+
+    print(f"📊 {turns}턴 대화의 턴별 프롬프트 토큰 수 (재구성 / 답변) 와 응답 시간")
+    print("턴  | " + " | ".join(f"{label:>22}" for label, _ in results))
+    for turn in range(turns):
+        if turn not in (0, 4, 9, 14, 19, 24, turns - 1):
+            continue
+        cells = [f"{rows[turn][0]:>5} / {rows[turn][1]:>5} {rows[turn][2]:>6.1f}ms" for _, rows in results]
+        print(f"{turn + 1:>3} | " + " | ".join(cells))
+
+    print("합계")
+    for label, rows in results:
+        total_tokens = sum(context + qa for context, qa, _ in rows)
+        total_ms = sum(elapsed for _, _, elapsed in rows)
+        print(f"   {label}: 프롬프트 {total_tokens} 토큰, 응답 시간 {total_ms:.1f} ms")
@@ -0,0 +1,158 @@
+import sys
+import time
+
+from modules.local_intent import LocalIntentClassifier
+
+# 신뢰도가 이 값 이상일 때만 LLM 없이 바로 응답 (IntentProcessor 기본값과 동일)
+CONFIDENCE_THRESHOLD = 0.8
+
+# (사용자 발화, 기대 의도, 기대 목적지) - 기타 의도는 (None, None)
+LABELED_SAMPLES = [
+    ("고흥터미널 가는 버스", "버스 노선", "고흥터미널"),
+    ("고흥터미널 가는 버스 알려줘", "버스 노선", "고흥터미널"),
+    ("연호체육공원 가려면 몇 번 버스 타야 돼?", "버스 노선", "연호체육공원"),
+    ("벌교터미널까지 가는 버스 있어?", "버스 노선", "벌교터미널"),
+    ("과역터미널은 몇 번 타요?", "버스 노선", "과역터미널"),
+    ("고흥군청 가는 버스 번호 알려줘", "버스 노선", "고흥군청"),
+    ("여기서 녹동항 가는 버스 뭐 있어요", "버스 노선", "녹동항"),
+    ("고흥의료원으로 가는 버스", "버스 노선", "고흥의료원"),
+    ("고흥군청까지 가는 길 알려줘", "길찾기", "고흥군청"),
+    ("고흥종합복지센터 어떻게 가요?", "길찾기", "고흥종합복지센터"),
+    ("울진고등학교까지 길 안내해 줘", "길찾기", "울진고등학교"),
+    ("고흥문화회관 가는 방법 알려주세요", "길찾기", "고흥문화회관"),
+    ("학림까지 어떻게 가야 해?", "길찾기", "학림"),
+    ("고흥읍사무소로 가는 경로 보여줘", "길찾기", "고흥읍사무소"),
+    ("편의점 어디야", "위치 찾기", "편의점"),
+    ("근처 편의점 어디야", "위치 찾기", "편의점"),
+    ("약국 어디에 있어요?", "위치 찾기", "약국"),
+    ("가까운 은행 알려줘", "위치 찾기", "은행"),
+    ("주변에 있는 카페 찾아줘", "위치 찾기", "카페"),
+    ("화장실 어디예요", "위치 찾기", "화장실"),
+    ("고흥우체국 위치 알려줘", "위치 찾기", "고흥우체국"),
+    ("근처 병원 어디 있어?", "위치 찾기", "병원"),
+    ("안녕하세요", None, None),
+    ("오늘 날씨 어때?", None, None),
+    ("유자축제 언제 해요?", None, None),
+    ("군청 공지사항 알려줘", None, None),
+    ("지금 몇 시야?", None, None),
+    ("심심해요", None, None),
+    ("버스 언제 와요?", None, None),
+    ("고맙습니다", None, None),
+    ("축제 어디서 해?", None, None),
+    ("나 오늘 너무 피곤해", None, None),
+    ("내일 몇 번 버스 타야 해?", None, None),
+    ("마지막 버스 몇 번이야", None, None),
+    ("그거 어떻게 가요", None, None),
+    ("나 지금 집에 가는 버스 탔어", None, None),
+    ("오늘 축제 어디야?", None, None),
+]
+
+# 검증용 발화 (여기 나온 단어는 DEFER_WORDS 같은 규칙의 단어 목록에 옮기지 말 것)
+# 단어 목록에 없는 문장에서도 규칙이 정확한지 확인하는 용도라, 일부는 로컬에서 틀릴 수 있음
+HELD_OUT_SAMPLES = [
+    ("고흥터미널 어디야", "위치 찾기", "고흥터미널"),
+    ("도양읍사무소 가는 길 알려줘", "길찾기", "도양읍사무소"),
+    ("녹동 가는 버스 있어?", "버스 노선", "녹동"),
+    ("고흥만 방조제 어떻게 가요", "길찾기", "고흥만 방조제"),
+    ("나로우주센터 가는 버스 알려줘", "버스 노선", "나로우주센터"),
+    ("보건소 어디예요", "위치 찾기", "보건소"),
+    ("가까운 주유소 알려줘", "위치 찾기", "주유소"),
+    ("할머니께 가려면 어떻게 가요", None, None),
+    ("아빠한테 가는 버스 뭐 있어", None, None),
+    ("선생님에게 가는 길 알려줘", None, None),
+    ("담배 피울 곳 어디야", None, None),
+    ("아이랑 놀 데 어디 있어요", None, None),
+    ("표 파는 곳 어디예요", None, None),
+    ("짐 맡길 데 어디야", None, None),
+    ("와이파이 비밀번호 어디 있어", None, None),
+    ("버스 시간표 어디 있어요", None, None),
+    ("민원 신청 방법 알려줘", None, None),
+    ("택시 부르는 방법 알려줘", None, None),
+    ("휴대폰 충전할 데 어디야", None, None),
+    ("영수증 어디 있어?", None, None),
+    ("내 지갑 어디 있지", None, None),
+    ("우리 딸 학교 가는 길 알려줘", None, None),
+    ("친구네 집 가는 버스", None, None),
+    ("언니가 어디 있어?", None, None),
+    ("고흥군 홈페이지 어디 있어", None, None),
+    ("다른 길 알려줘", None, None),
+    ("빠른 길 알려줘", None, None),
+    ("그 다음 버스 몇 번이야", None, None),
+]
+
+def evaluate(classifier, samples, threshold):
+    """로컬 분류기의 정확도, 처리율, 지연 시간을 계산합니다."""
+    latencies = []
+    handled = 0
+    handled_correct = 0
+    errors = []
+
+    for message, expected_intent, expected_destination in samples:
+        start = time.perf_counter()
+        result = classifier.classify(message)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if result.intent is not None and result.confidence >= threshold:
+            handled += 1
+            if result.intent == expected_intent and result.destination == expected_destination:
+                handled_correct += 1
+            else:
+                errors.append((message, expected_intent, expected_destination, result))
+
+    latencies.sort()
+    return {
+        "samples": len(samples),
+        "handled": handled,
+        "handled_correct": handled_correct,
+        "errors": errors,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+def evaluate_llm(samples):
+    """비교용으로 LLM 의도 감지의 정확도와 지연 시간을 측정합니다. (OpenAI API 키 필요)"""
+    from modules.config import LLM
+    from modules.intent_processor import IntentProcessor
+
+    processor = IntentProcessor(LLM, local_classifier=None)
+    correct = 0
+    latencies = []
+    for message, expected_intent, expected_destination in samples:
+        start = time.perf_counter()
+        intent, destination = processor.detect_intent_and_extract_destination(message)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if intent == expected_intent and (expected_intent is None or destination == expected_destination):
+            correct += 1
+
+    latencies.sort()
+    return correct, latencies[len(latencies) // 2], latencies[-1]
+
+def report(title, classifier, samples):
+    """로컬 분류기의 평가 결과를 출력합니다."""
+    stats = evaluate(classifier, samples, CONFIDENCE_THRESHOLD)
+    place_samples = sum(1 for _, intent, _ in samples if intent)
+
+    print(f"📊 {title} (신뢰도 임계값 {CONFIDENCE_THRESHOLD})")
+    print(f"   전체 발화: {stats['samples']}개 (장소 관련 {place_samples}개)")
+    print(f"   로컬 처리: {stats['handled']}개 ({stats['handled'] / stats['samples']:.0%}), "
+          f"나머지는 LLM으로 전달")
+    if stats["handled"]:
+        print(f"   로컬 처리 정확도: {stats['handled_correct'] / stats['handled']:.1%}")
+    print(f"   지연 시간: p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms")
+
+    for message, expected_intent, expected_destination, result in stats["errors"]:
+        print(f"   ❌ '{message}' → 기대 ({expected_intent}, {expected_destination}) / "
+              f"결과 ({result.intent}, {result.destination}, {result.confidence:.2f}, {result.rule})")
+
+if __name__ == "__main__":
+    classifier = LocalIntentClassifier()
+    classifier.classify("워밍업")  # spaCy 모델 첫 호출 비용 제외
+
+    report("로컬 의도 분류 벤치마크", classifier, LABELED_SAMPLES)
+    print()
+    report("검증용 발화 (단어 목록에 없는 문장)", classifier, HELD_OUT_SAMPLES)
+
+    if "--llm" in sys.argv:
+        correct, p50, worst = evaluate_llm(LABELED_SAMPLES)
+        print(f"\n📊 LLM 의도 감지 비교: 정확도 {correct / len(LABELED_SAMPLES):.1%}, "
+              f"p50 {p50:.0f} ms, 최대 {worst:.0f} ms")
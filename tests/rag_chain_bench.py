@@ -0,0 +1,55 @@
+import sys
+import time
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from modules.chat_history import ChatHistoryManager
+from modules.rag_chain import RAGChainManager
+
+# 외부 API 없이 체인 구성 비용만 측정하기 위한 가짜 LLM / 벡터 DB
+NUM_MESSAGES = 200
+
+def build_manager():
+    """가짜 LLM과 메모리 벡터 DB로 RAGChainManager를 생성합니다."""
+    llm = FakeListChatModel(responses=["네, 안녕하세요. 무엇을 도와드릴까요?"])
+    database = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=64))
+    database.add_texts([
+        "고흥군 유자축제는 11월에 열립니다.",
+        "고흥군청 민원실 운영 시간은 평일 오전 9시부터 오후 6시까지입니다.",
+    ])
+    history_manager = ChatHistoryManager()
+    return RAGChainManager(llm, database, history_manager.get_session_history)
+
+def time_per_call(func, repeat):
+    """함수를 repeat번 실행하고 1회 평균 실행 시간(ms)을 반환합니다."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_MESSAGES
+    manager = build_manager()
+
+    # 이전 방식: 메시지마다 create_rag_chain()으로 프롬프트/체인/히스토리 래퍼를 다시 생성
+    before_ms = time_per_call(manager.create_rag_chain, repeat)
+
+    # 현재 방식: 메시지마다 현재 시간 입력값만 만들고, 체인은 재사용
+    after_ms = time_per_call(
+        lambda: {"input": "유자축제 언제야?", "current_date": manager.get_current_kst_time()},
+        repeat,
+    )
+
+    # 재사용 체인으로 실제 응답까지 생성 (가짜 LLM이므로 네트워크 비용 없음)
+    end_to_end_ms = time_per_call(
+        lambda: "".join(manager.get_ai_response("유자축제 언제야?", "bench")),
+        max(1, repeat // 10),
+    )
+
+    print(f"📊 메시지당 체인 구성 오버헤드 ({repeat}회 평균)")
+    print(f"   이전 (매번 체인 생성): {before_ms:.3f} ms")
+    print(f"   현재 (체인 재사용):   {after_ms:.3f} ms")
+    if after_ms > 0:
+        print(f"   개선 배율: {before_ms / after_ms:.1f}x")
+    print(f"   참고: 가짜 LLM 기준 응답 생성 전체 시간 {end_to_end_ms:.3f} ms")
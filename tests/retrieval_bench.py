@@ -0,0 +1,131 @@
+import sys
+import time
+import zlib
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from modules.hybrid_retriever import HybridRetriever, NgramReranker, char_ngrams
+from modules.local_vector_store import LocalVectorStore
+
+# 공지 검색 품질/지연 벤치마크 (외부 API 없음)
+# 장소 이름과 날짜만 다른 비슷한 공지가 많을 때, 벡터 검색만으로 정확한 공지를 찾는지 비교
+PLACES = [
+    "고흥읍", "도양읍", "녹동항", "과역면", "풍양면", "도화면", "포두면", "봉래면",
+    "동강면", "대서면", "점암면", "금산면", "두원면", "남양면", "영남면", "나로도",
+]
+# 공지에 쓰인 장소 이름 대신 주민이 부르는 이름 (바꿔 말한 질문용, 원래 이름이 그대로 들어가지 않음)
+PLACE_ALIASES = {
+    "고흥읍": "고흥 읍내", "도양읍": "도양 쪽", "녹동항": "녹동 항구", "과역면": "과역 마을",
+    "풍양면": "풍양 동네", "도화면": "도화 쪽", "포두면": "포두 마을", "봉래면": "봉래 쪽",
+    "동강면": "동강 동네", "대서면": "대서 마을", "점암면": "점암 쪽", "금산면": "거금도",
+    "두원면": "두원 동네", "남양면": "남양 마을", "영남면": "영남 쪽", "나로도": "나로 섬",
+}
+# (제목, 본문, 질문 키워드, 바꿔 말한 키워드)
+TOPICS = [
+    ("상수도 공사로 단수", "수도관 교체 공사로 수돗물 공급이 일시 중단됩니다.", "단수", "물 안 나오는 날"),
+    ("도로 포장 공사", "도로 포장 공사로 차량 통행이 통제됩니다.", "도로 공사", "길 막히는 거"),
+    ("독감 예방접종", "어르신 대상 독감 예방접종을 보건지소에서 실시합니다.", "독감 예방접종", "독감 주사 맞는 날"),
+    ("버스 노선 임시 변경", "행사 기간 동안 군내버스 노선이 임시로 변경됩니다.", "버스 노선 변경", "버스 다니는 길 바뀌는 거"),
+    ("농기계 임대 사업", "농번기를 맞아 농기계 임대 신청을 받습니다.", "농기계 임대", "트랙터 빌리는 거"),
+    ("마을 문화 행사", "주민과 함께하는 작은 음악회가 열립니다.", "문화 행사", "음악회"),
+]
+K = 2
+
+
+class BagOfCharsEmbedding(Embeddings):
+    """
+    글자 단위 해시로 만든 거친 임베딩 (주제는 비슷하게 잡지만 장소 이름/날짜 구분은 약함)
+
+    실제 임베딩 API 없이 '의미는 비슷하지만 고유명사를 놓치는' 벡터 검색의 약점을 흉내 냅니다.
+    """
+
+    def __init__(self, size=64):
+        self.size = size
+
+    def _embed(self, text):
+        vector = np.zeros(self.size, dtype=np.float32)
+        for char in text:
+            if not char.isspace():
+                vector[zlib.crc32(char.encode("utf-8")) % self.size] += 1.0
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def build_corpus():
+    """
+    장소 × 주제 조합으로 공지를 만들고, 공지마다 정답 질문을 두 가지로 만듭니다.
+
+    queries는 공지의 장소 이름과 키워드를 그대로 쓴 질문, paraphrased는 둘 다 바꿔 말한 질문입니다.
+    """
+    texts, metadatas, ids, queries, paraphrased = [], [], [], [], []
+    for place_index, place in enumerate(PLACES):
+        for topic_index, (title, body, keyword, paraphrase) in enumerate(TOPICS):
+            month = 3 + (place_index + topic_index) % 9
+            day = 1 + (place_index * 7 + topic_index * 3) % 27
+            doc_id = f"{place}-{topic_index}"
+            full_title = f"{place} {title} 안내 ({month}월 {day}일)"
+            texts.append(f"{full_title}\n{month}월 {day}일 {place} 일대에서 {body} 주민 여러분의 양해 바랍니다.")
+            metadatas.append({"title": full_title})
+            ids.append(doc_id)
+            queries.append((f"{place} {keyword} 언제 해요?", doc_id))
+            paraphrased.append((f"{PLACE_ALIASES[place]} {paraphrase} 언제예요?", doc_id))
+    return texts, metadatas, ids, queries, paraphrased
+
+
+def evaluate(name, search, queries):
+    """질문마다 상위 K개 검색 결과에 정답이 있는지(recall@K)와 MRR, 평균 지연을 계산합니다."""
+    found = 0
+    reciprocal = 0.0
+    start = time.perf_counter()
+    for query, expected in queries:
+        result_ids = [document.id for document in search(query)]
+        if expected in result_ids:
+            found += 1
+            reciprocal += 1 / (result_ids.index(expected) + 1)
+    elapsed_ms = (time.perf_counter() - start) / len(queries) * 1000
+    print(f"   {name:<22} recall@{K} {found / len(queries):.2f}  MRR {reciprocal / len(queries):.2f}  {elapsed_ms:.3f} ms/질문")
+
+
+class NoRerank(NgramReranker):
+    """재정렬 없이 합친 점수 순서 그대로 사용 (비교용)"""
+
+    def rerank(self, query, candidates, index, k):
+        return [document for document, _ in candidates[:k]]
+
+
+if __name__ == "__main__":
+    # 사용법: 저장소 루트에서 python -m tests.retrieval_bench [반복 횟수] [--openai]
+    # (modules 패키지를 불러오므로 python tests/retrieval_bench.py로 실행하려면 PYTHONPATH=. 필요)
+    # --openai: 거친 임베딩 대신 실제 임베딩 모델로 비교 (OpenAI API 키 필요)
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    repeat = int(args[0]) if args else 1
+    texts, metadatas, ids, queries, paraphrased = build_corpus()
+    if "--openai" in sys.argv:
+        from modules.config import RAW_EMBEDDING
+        embedding = RAW_EMBEDDING
+    else:
+        embedding = BagOfCharsEmbedding()
+    store = LocalVectorStore(embedding)
+    store.add_texts(texts, metadatas, ids)
+
+    hybrid = HybridRetriever(vector_store=store, k=K)
+    fusion_only = HybridRetriever(vector_store=store, k=K, reranker=NoRerank())
+    # 색인을 미리 만들어 첫 질문에 색인 생성 시간이 섞이지 않도록 함
+    hybrid.bm25_index()
+    fusion_only.bm25_index()
+    index = hybrid.bm25_index()
+
+    for name, query_set in (("공지 표현 그대로", queries), ("바꿔 말한 질문", paraphrased)):
+        query_set = query_set * repeat
+        print(f"📊 {name}: 공지 {len(texts)}개, 질문 {len(query_set)}개 "
+              f"(질문 n-gram 평균 {np.mean([len(char_ngrams(q)) for q, _ in query_set]):.1f}개)")
+        evaluate("벡터만", lambda q: store.similarity_search(q, k=K), query_set)
+        evaluate("BM25만", lambda q: [index.documents[p] for p, _ in index.search(q, K)], query_set)
+        evaluate("벡터 + BM25 (RRF)", fusion_only.invoke, query_set)
+        evaluate("벡터 + BM25 + 재정렬", hybrid.invoke, query_set)
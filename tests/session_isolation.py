@@ -0,0 +1,63 @@
+import os
+import sys
+import uuid
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 세션 격리 스트레스 테스트 대상 서버 (docker compose 기준 9000 포트)
+BASE_URL = os.getenv("CHATBOT_BASE_URL", "http://localhost:9000")
+NUM_SESSIONS = 20
+
+# 세션마다 서로 다른 이름을 기억시키고, 다른 세션의 이름이 섞여 나오는지 확인
+NAMES = [
+    "가온", "나래", "다온", "라온", "마루", "바다", "사랑", "아라", "자람", "차미",
+    "하늘", "한결", "해솔", "새봄", "여름", "가람", "누리", "다솜", "미르", "보람",
+]
+
+def chat(session_id, message):
+    """/chat 엔드포인트에 메시지를 보내고 응답 텍스트를 반환합니다."""
+    response = requests.post(
+        f"{BASE_URL}/chat",
+        json={"message": message, "session_id": session_id},
+        timeout=120,
+    )
+    response.raise_for_status()
+    return response.json().get("response", "")
+
+def run_session(idx):
+    """한 세션에서 이름을 알려준 뒤 다시 물어보고, 응답에 포함된 이름들을 반환합니다."""
+    session_id = str(uuid.uuid4())
+    name = NAMES[idx % len(NAMES)]
+
+    chat(session_id, f"안녕하세요, 제 이름은 {name}입니다. 꼭 기억해 주세요.")
+    answer = chat(session_id, "제 이름이 뭐였죠? 이름만 말해 주세요.")
+
+    mentioned = [other for other in NAMES if other in answer]
+    return name, mentioned, answer
+
+if __name__ == "__main__":
+    num_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_SESSIONS
+
+    print(f"🚀 세션 격리 스트레스 테스트 시작: {BASE_URL} (동시 세션 {num_sessions}개)")
+    with ThreadPoolExecutor(max_workers=num_sessions) as pool:
+        results = list(pool.map(run_session, range(num_sessions)))
+
+    crossed = 0
+    forgotten = 0
+    for name, mentioned, answer in results:
+        leaked = [other for other in mentioned if other != name]
+        if leaked:
+            crossed += 1
+            print(f"❌ '{name}' 세션에 다른 세션의 이름이 섞였습니다: {leaked} / 응답: {answer}")
+        elif name not in mentioned:
+            forgotten += 1
+            print(f"⚠️ '{name}' 세션이 이름을 기억하지 못했습니다. / 응답: {answer}")
+
+    print(f"\n📊 세션 {len(results)}개 중 기록 섞임 {crossed}개, 기억 실패 {forgotten}개")
+    if crossed:
+        print("❌ 세션 간 대화 기록이 섞였습니다.")
+        sys.exit(1)
+    print("✅ 세션 간 대화 기록이 섞이지 않았습니다.")